@@ -0,0 +1,252 @@
+"""
+Mock provider speaking the streaming formats of OpenAI (`/openai`) and
+Anthropic (`/anthropic`). Replies consist of a fixed number of tokens, sent in
+events of a configurable number of tokens at a configurable rate after a
+configurable latency.
+
+The server records, per request, when it was received and when the first and
+last token were sent, using `time.monotonic()`. This clock is system-wide, so
+the timings can be compared with those taken by the benchmark in another
+process. `GET /timings` returns the timings recorded since the previous call.
+
+`GET /openai/models` and `GET /anthropic/models` return model listings, the
+latter paged with `limit` and `after_id` like the Anthropic API.
+
+Run standalone with `python -m benchmarks.mock_provider --port 8765`.
+
+"""
+
+import json
+import multiprocessing
+import threading
+import time
+from dataclasses import asdict, dataclass
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, List, Optional, Self, Tuple
+from urllib.parse import parse_qs, urlsplit
+
+import click
+
+MODELS = {
+    "openai": ["gpt-4o", "gpt-4o-mock", "text-embedding-3-small", "whisper-1"],
+    "anthropic": ["claude-3-5-haiku-20241022", "claude-mock-1", "claude-mock-2"],
+}
+
+
+@dataclass(frozen=True)
+class MockSettings:
+    tokens: int = 200
+    rate: float = 0.0
+    latency: float = 0.0
+    chunk_size: int = 1
+
+
+class MockProviderServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, address: Tuple[str, int], settings: MockSettings) -> None:
+        super().__init__(address, MockProviderHandler)
+        self.settings = settings
+        self.timings: List[Dict[str, Any]] = []
+        self.lock = threading.Lock()
+
+
+class MockProviderHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    server: MockProviderServer
+
+    # Events are small writes, which would otherwise wait for the delayed
+    # acknowledgement of the previous one and add ~40 ms to the measurements
+    disable_nagle_algorithm = True
+
+    def log_message(self, *args: Any) -> None:
+        pass
+
+    def _send_json(self, data: Any) -> None:
+        body = json.dumps(data).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _send_chunk(self, text: str) -> None:
+        body = text.encode()
+        self.wfile.write(b"%x\r\n%s\r\n" % (len(body), body))
+        self.wfile.flush()
+
+    def do_GET(self) -> None:
+        if self.path == "/timings":
+            with self.server.lock:
+                timings = self.server.timings
+                self.server.timings = []
+
+            self._send_json(timings)
+            return
+
+        url = urlsplit(self.path)
+        models = MODELS.get(url.path.strip("/").split("/")[0], [])
+
+        if url.path.startswith("/anthropic"):
+            query = parse_qs(url.query)
+            limit = int(query.get("limit", ["20"])[0])
+            after_id = query.get("after_id", [None])[0]
+            start = models.index(after_id) + 1 if after_id in models else 0
+            page = models[start : start + limit]
+            self._send_json(
+                {
+                    "data": [{"id": model} for model in page],
+                    "has_more": start + limit < len(models),
+                    "last_id": page[-1] if page else None,
+                }
+            )
+            return
+
+        self._send_json({"data": [{"id": model} for model in models]})
+
+    def do_POST(self) -> None:
+        received_at = time.monotonic()
+        length = int(self.headers.get("Content-Length", 0))
+        json.loads(self.rfile.read(length))
+
+        settings = self.server.settings
+        anthropic = self.path.startswith("/anthropic")
+
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.send_header("Transfer-Encoding", "chunked")
+        self.end_headers()
+
+        if anthropic:
+            self._send_chunk(
+                "event: message_start\n"
+                'data: {"type":"message_start","message":'
+                '{"usage":{"input_tokens":1,"output_tokens":1}}}\n\n'
+            )
+
+        if settings.latency:
+            time.sleep(settings.latency)
+
+        first_sent_at: Optional[float] = None
+        interval = settings.chunk_size / settings.rate if settings.rate else 0.0
+        sent = 0
+
+        while sent < settings.tokens:
+            count = min(settings.chunk_size, settings.tokens - sent)
+            text = "tok " * count
+
+            if anthropic:
+                delta = {"type": "content_block_delta", "delta": {"text": text}}
+                self._send_chunk(
+                    f"event: content_block_delta\ndata: {json.dumps(delta)}\n\n"
+                )
+
+            else:
+                delta = {"choices": [{"delta": {"content": text}}]}
+                self._send_chunk(f"data: {json.dumps(delta)}\n\n")
+
+            if first_sent_at is None:
+                first_sent_at = time.monotonic()
+
+            sent += count
+
+            if interval:
+                time.sleep(interval)
+
+        last_sent_at = time.monotonic()
+
+        if anthropic:
+            self._send_chunk(
+                "event: message_delta\n"
+                'data: {"type":"message_delta","delta":{"stop_reason":"end_turn"},'
+                f'"usage":{{"output_tokens":{settings.tokens}}}}}\n\n'
+                "event: message_stop\n"
+                'data: {"type":"message_stop"}\n\n'
+            )
+
+        else:
+            self._send_chunk(
+                'data: {"choices":[{"delta":{},"finish_reason":"stop"}]}\n\n'
+                "data: [DONE]\n\n"
+            )
+
+        self.wfile.write(b"0\r\n\r\n")
+        self.wfile.flush()
+
+        with self.server.lock:
+            self.server.timings.append(
+                {
+                    "received_at": received_at,
+                    "first_sent_at": first_sent_at or last_sent_at,
+                    "last_sent_at": last_sent_at,
+                    "tokens": settings.tokens,
+                }
+            )
+
+
+def serve(port: int, settings: MockSettings, ready: Any = None) -> None:
+    """
+    Serve mock provider until the process is terminated.
+
+    Params
+    ------
+    - port (int): Port to listen on, 0 to pick a free port.
+    - settings (MockSettings): Reply settings.
+    - ready (Any): Optional connection to send the bound port to.
+
+    """
+
+    server = MockProviderServer(("127.0.0.1", port), settings)
+
+    if ready is not None:
+        ready.send(server.server_address[1])
+
+    server.serve_forever()
+
+
+class MockProvider:
+    """
+    Mock provider running in a separate process, so serving the stream does
+    not compete with the benchmarked code for the GIL.
+
+    """
+
+    def __init__(self, settings: MockSettings) -> None:
+        self.settings = settings
+        self.port = 0
+        self._process: Optional[multiprocessing.Process] = None
+
+    def url(self, path: str) -> str:
+        return f"http://127.0.0.1:{self.port}/{path}"
+
+    def __enter__(self) -> Self:
+        receiver, sender = multiprocessing.Pipe(duplex=False)
+        self._process = multiprocessing.Process(
+            target=serve,
+            args=(0, self.settings, sender),
+            daemon=True,
+        )
+        self._process.start()
+        self.port = receiver.recv()
+        return self
+
+    def __exit__(self, *args: Any) -> None:
+        if self._process is not None:
+            self._process.terminate()
+            self._process.join()
+
+
+@click.command()
+@click.option("--port", type=int, default=8765, help="Port to listen on.")
+@click.option("--tokens", type=int, default=MockSettings.tokens)
+@click.option("--rate", type=float, default=MockSettings.rate, help="Tokens/s.")
+@click.option("--latency", type=float, default=MockSettings.latency)
+@click.option("--chunk-size", type=int, default=MockSettings.chunk_size)
+def main(port: int, tokens: int, rate: float, latency: float, chunk_size: int) -> None:
+    settings = MockSettings(tokens, rate, latency, chunk_size)
+    click.echo(f"Serving mock provider on port {port}: {asdict(settings)}")
+    serve(port, settings)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,133 @@
+"""
+Benchmark of reading messages and threads into schemas. Compares the bulk
+read path of `Commands`, selecting plain rows and validating them in a single
+call, with loading ORM records and validating them one at a time:
+
+    python -m benchmarks.reads --messages 50000 --threads 5000
+
+"""
+
+import os
+import tempfile
+from time import perf_counter
+from typing import Any, Callable, List
+
+import click
+
+
+def best_of(function: Callable[[], List[Any]], repeat: int) -> float:
+    durations = []
+
+    for _ in range(repeat):
+        started_at = perf_counter()
+        function()
+        durations.append(perf_counter() - started_at)
+
+    return min(durations)
+
+
+@click.command()
+@click.option("--messages", type=int, default=50000, help="Messages in thread.")
+@click.option("--threads", type=int, default=5000, help="Number of threads.")
+@click.option("--repeat", type=int, default=5, help="Runs per path, best is kept.")
+def main(messages: int, threads: int, repeat: int) -> None:
+    # The database is created on import of seeks, so the home directory has to
+    # be replaced before
+    os.environ["HOME"] = tempfile.mkdtemp(prefix="seeks-benchmark-")
+
+    from sqlalchemy import select, text
+    from sqlalchemy.orm import joinedload
+    from tabulate import tabulate
+
+    from seeks.core import models, schemas
+    from seeks.core.commands import Commands
+    from seeks.core.database import engine, get_session
+    from seeks.core.migrations import migrate
+
+    migrate(engine)
+
+    session = next(get_session())
+    commands = Commands(session)
+    commands.create_assistant(
+        schemas.AssistantCreate(
+            name="benchmark",
+            model_name="gpt-4o",
+            description="Benchmark assistant",
+        )
+    )
+
+    with engine.begin() as connection:
+        connection.execute(
+            text(
+                "WITH RECURSIVE n(i) AS "
+                "(SELECT 1 UNION ALL SELECT i + 1 FROM n WHERE i < :threads) "
+                "INSERT INTO thread (subject, assistant_id, summary_token_count) "
+                "SELECT 'Thread ' || i, 1, 0 FROM n"
+            ),
+            {"threads": threads},
+        )
+        connection.execute(
+            text(
+                "WITH RECURSIVE n(i) AS "
+                "(SELECT 1 UNION ALL SELECT i + 1 FROM n WHERE i < :messages) "
+                "INSERT INTO message "
+                "(role, content, partial, token_count, thread_id, created_at) "
+                "SELECT CASE i % 2 WHEN 1 THEN 'USER' ELSE 'ASSISTANT' END, "
+                "'Message ' || i, 0, 2, 1, CURRENT_TIMESTAMP FROM n"
+            ),
+            {"messages": messages},
+        )
+
+    def read_messages_per_record() -> List[Any]:
+        records = session.scalars(
+            select(models.Message).filter_by(thread_id=1).order_by(models.Message.id)
+        ).all()
+        result = [schemas.MessageResponse.model_validate(record) for record in records]
+        session.expunge_all()
+        return result
+
+    def read_threads_per_record() -> List[Any]:
+        records = session.scalars(
+            select(models.Thread).options(joinedload(models.Thread.assistant))
+        ).all()
+        result = [
+            schemas.ThreadVerboseResponse.model_validate(record) for record in records
+        ]
+        session.expunge_all()
+        return result
+
+    def read_messages_bulk() -> List[Any]:
+        return commands.read_messages(1, limit=messages)
+
+    def read_threads_bulk() -> List[Any]:
+        return commands.read_threads(verbose=True)
+
+    # Warm up caches of both paths, ie. compiled statements and type adapters
+    assert read_messages_per_record() == read_messages_bulk()
+    assert len(read_threads_per_record()) == len(read_threads_bulk())
+
+    rows = []
+
+    for name, count, per_record, bulk in (
+        ("messages", messages, read_messages_per_record, read_messages_bulk),
+        ("threads", threads, read_threads_per_record, read_threads_bulk),
+    ):
+        before = best_of(per_record, repeat)
+        after = best_of(bulk, repeat)
+        rows.append(
+            [
+                name,
+                count,
+                f"{before * 1000:.1f} ms",
+                f"{after * 1000:.1f} ms",
+                f"{before / after:.2f}x",
+            ]
+        )
+
+    click.echo(
+        tabulate(rows, headers=["read", "rows", "per record", "bulk", "speedup"])
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,378 @@
+"""
+End-to-end benchmark of a conversation turn. Drives `Shell.default` against
+the mock provider with a fresh database in a temporary home directory and
+reports, per provider:
+
+- overhead: time of the turn not spent waiting on the provider.
+- before_request: time from the prompt until the provider received the request.
+- ttft_added: time from the first token being sent until it was rendered.
+- after_stream: time from the last token being sent until the turn returned.
+- db_time: time spent executing database statements.
+- tokens_per_second: render throughput from first to last frame.
+
+Results can be written to JSON and compared with those of another commit:
+
+    python -m benchmarks.turns --output before.json
+    python -m benchmarks.turns --compare before.json
+
+"""
+
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import urllib.request
+from time import monotonic
+from typing import Any, Dict, List, Optional, TextIO, Tuple
+
+import click
+
+from benchmarks.mock_provider import MockProvider, MockSettings
+
+METRICS = (
+    "overhead",
+    "before_request",
+    "ttft_added",
+    "after_stream",
+    "db_time",
+    "db_statements",
+    "tokens_per_second",
+)
+
+MODELS = {
+    "openai": "gpt-4o",
+    "anthropic": "claude-3-5-haiku-20241022",
+}
+
+
+class TimingStream:
+    """
+    Stand-in for stdout recording when text is written, discarding the text
+    itself so terminal speed does not affect the results.
+
+    """
+
+    def __init__(self) -> None:
+        self.writes: List[float] = []
+
+    def write(self, text: str) -> int:
+        if text.strip():
+            self.writes.append(monotonic())
+
+        return len(text)
+
+    def flush(self) -> None:
+        pass
+
+    def isatty(self) -> bool:
+        return False
+
+
+class StatementTimer:
+    """
+    Accumulate time spent executing statements on a database engine.
+
+    """
+
+    def __init__(self, engine: Any) -> None:
+        from sqlalchemy import event
+
+        self.time = 0.0
+        self.statements = 0
+        event.listen(engine, "before_cursor_execute", self._before)
+        event.listen(engine, "after_cursor_execute", self._after)
+
+    def _before(self, connection: Any, *args: Any) -> None:
+        connection.info.setdefault("started_at", []).append(monotonic())
+
+    def _after(self, connection: Any, *args: Any) -> None:
+        self.time += monotonic() - connection.info["started_at"].pop()
+        self.statements += 1
+
+    def reset(self) -> Tuple[float, int]:
+        result = (self.time, self.statements)
+        self.time = 0.0
+        self.statements = 0
+        return result
+
+
+def percentile(values: List[float], percent: float) -> float:
+    ordered = sorted(values)
+    index = max(int(round(percent / 100 * len(ordered))) - 1, 0)
+    return ordered[index]
+
+
+def fetch_timings(mock: MockProvider) -> List[Dict[str, float]]:
+    with urllib.request.urlopen(mock.url("timings")) as response:
+        return json.loads(response.read())
+
+
+def run_provider(
+    name: str,
+    mock: MockProvider,
+    turns: int,
+    warmup: int,
+) -> List[Dict[str, float]]:
+    """
+    Run turns in a new thread of an assistant of provider.
+
+    Params
+    ------
+    - name (str): Provider name.
+    - mock (MockProvider): Running mock provider.
+    - turns (int): Number of measured turns.
+    - warmup (int): Number of turns to run before measuring.
+
+    Returns
+    -------
+    - List[Dict[str, float]]: Metrics per measured turn.
+
+    """
+
+    from seeks.common.config import Config
+    from seeks.core import schemas
+    from seeks.core.commands import Commands
+    from seeks.core.database import engine, get_session
+    from seeks.core.shell import Shell
+
+    config = Config()
+
+    for provider_profile in config.providers:
+        provider_profile.endpoint = mock.url(provider_profile.name.value)
+
+    commands = Commands(next(get_session()))
+
+    if name not in [provider.name for provider in commands.read_providers()]:
+        commands.create_provider(schemas.ProviderCreate(name=name, api_key="mock"))
+
+    commands.create_assistant(
+        schemas.AssistantCreate(
+            name=f"benchmark-{name}",
+            model_name=MODELS[name],
+            description="Benchmark assistant",
+        )
+    )
+    assistant = next(
+        assistant
+        for assistant in commands.read_assistants()
+        if assistant.name == f"benchmark-{name}"
+    )
+    commands.update_settings(assistant_id=assistant.id)
+    commands.delete_thread_setting()
+
+    shell = Shell(commands=commands, config=config)
+    timer = StatementTimer(engine)
+    results: List[Dict[str, float]] = []
+    stdout = sys.stdout
+
+    try:
+        for turn in range(warmup + turns):
+            stream = TimingStream()
+            fetch_timings(mock)
+            timer.reset()
+
+            sys.stdout = stream
+            started_at = monotonic()
+
+            try:
+                shell.default(f"Benchmark prompt {turn}")
+
+            finally:
+                finished_at = monotonic()
+                sys.stdout = stdout
+
+            db_time, db_statements = timer.reset()
+            (timing,) = fetch_timings(mock)
+
+            if turn < warmup or not stream.writes:
+                continue
+
+            provider_time = timing["last_sent_at"] - timing["received_at"]
+            render_time = stream.writes[-1] - stream.writes[0]
+
+            results.append(
+                {
+                    "overhead": finished_at - started_at - provider_time,
+                    "before_request": timing["received_at"] - started_at,
+                    "ttft_added": stream.writes[0] - timing["first_sent_at"],
+                    "after_stream": finished_at - timing["last_sent_at"],
+                    "db_time": db_time,
+                    "db_statements": db_statements,
+                    "tokens_per_second": (
+                        timing["tokens"] / render_time if render_time > 0 else 0.0
+                    ),
+                }
+            )
+
+    finally:
+        shell.close()
+
+    return results
+
+
+def summarize(results: List[Dict[str, float]]) -> Dict[str, Dict[str, float]]:
+    return {
+        metric: {
+            "median": percentile([result[metric] for result in results], 50),
+            "p95": percentile([result[metric] for result in results], 95),
+        }
+        for metric in METRICS
+    }
+
+
+def get_commit() -> str:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            capture_output=True,
+            check=True,
+            text=True,
+        ).stdout.strip()
+
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def format_value(metric: str, value: float) -> str:
+    if metric == "tokens_per_second":
+        return f"{value:,.0f}"
+
+    if metric == "db_statements":
+        return f"{value:.0f}"
+
+    return f"{value * 1000:.2f} ms"
+
+
+def print_report(
+    report: Dict[str, Any],
+    baseline: Optional[Dict[str, Any]],
+    output: TextIO,
+) -> None:
+    from tabulate import tabulate
+
+    headers = ["provider", "metric", "median", "p95"]
+
+    if baseline is not None:
+        headers += [f"median ({baseline['commit']})", "change"]
+
+    rows = []
+
+    for provider, metrics in report["results"].items():
+        for metric, values in metrics.items():
+            row = [
+                provider,
+                metric,
+                format_value(metric, values["median"]),
+                format_value(metric, values["p95"]),
+            ]
+
+            if baseline is not None:
+                before = baseline["results"].get(provider, {}).get(metric)
+
+                if before is None:
+                    row += ["", ""]
+
+                else:
+                    change = (
+                        (values["median"] - before["median"]) / before["median"] * 100
+                        if before["median"]
+                        else 0.0
+                    )
+                    row += [
+                        format_value(metric, before["median"]),
+                        f"{change:+.1f}%",
+                    ]
+
+            rows.append(row)
+
+    click.echo(f"\nCommit {report['commit']}, {report['settings']}\n", file=output)
+    click.echo(tabulate(rows, headers=headers), file=output)
+
+
+@click.command()
+@click.option("--turns", type=int, default=30, help="Number of measured turns.")
+@click.option("--warmup", type=int, default=3, help="Number of turns to discard.")
+@click.option("--tokens", type=int, default=200, help="Tokens per reply.")
+@click.option(
+    "--rate",
+    type=float,
+    default=0.0,
+    help="Tokens per second sent by the mock provider, 0 for unlimited.",
+)
+@click.option("--latency", type=float, default=0.0, help="Seconds to first token.")
+@click.option("--chunk-size", type=int, default=1, help="Tokens per event.")
+@click.option(
+    "--provider",
+    "providers",
+    type=click.Choice(list(MODELS)),
+    multiple=True,
+    default=list(MODELS),
+    help="Provider format(s) to benchmark.",
+)
+@click.option("--output", type=click.Path(dir_okay=False), help="Write JSON report.")
+@click.option(
+    "--compare",
+    type=click.Path(exists=True, dir_okay=False),
+    help="JSON report of a previous run to compare with.",
+)
+def main(
+    turns: int,
+    warmup: int,
+    tokens: int,
+    rate: float,
+    latency: float,
+    chunk_size: int,
+    providers: Tuple[str, ...],
+    output: Optional[str],
+    compare: Optional[str],
+) -> None:
+    settings = MockSettings(tokens, rate, latency, chunk_size)
+
+    # The database is created on import of seeks, so the home directory has to
+    # be replaced before. Caching and compaction would skew the results.
+    home = tempfile.mkdtemp(prefix="seeks-benchmark-")
+    os.environ["HOME"] = home
+    os.environ["SEEKS_RESPONSE_CACHE"] = "0"
+    os.environ["SEEKS_COMPACTION"] = "0"
+
+    from seeks.core.database import engine
+    from seeks.core.migrations import migrate
+
+    migrate(engine)
+
+    report: Dict[str, Any] = {
+        "commit": get_commit(),
+        "python": platform.python_version(),
+        "settings": {
+            "turns": turns,
+            "warmup": warmup,
+            "tokens": tokens,
+            "rate": rate,
+            "latency": latency,
+            "chunk_size": chunk_size,
+        },
+        "results": {},
+    }
+
+    with MockProvider(settings) as mock:
+        for provider in providers:
+            results = run_provider(provider, mock, turns, warmup)
+            report["results"][provider] = summarize(results)
+
+    baseline = None
+
+    if compare:
+        with open(compare) as file:
+            baseline = json.load(file)
+
+    print_report(report, baseline, sys.stdout)
+
+    if output:
+        with open(output, "w") as file:
+            json.dump(report, file, indent=2)
+
+
+if __name__ == "__main__":
+    main()
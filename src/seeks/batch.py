@@ -0,0 +1,349 @@
+import asyncio
+import sys
+from collections import defaultdict
+from typing import IO, TYPE_CHECKING, Dict, List, Optional, Tuple
+
+import click
+
+if TYPE_CHECKING:
+    from seeks.common.config import Config
+    from seeks.core import schemas
+    from seeks.core.commands import Commands
+    from seeks.core.engine import Engine
+
+
+class Batch:
+    """
+    Run prompts concurrently and persist every exchange through `Commands`.
+    All work happens on a single event loop: requests run concurrently up to
+    the worker count of their provider, while database access stays on the
+    loop's thread. Prompts addressed to the same thread run one after another
+    to keep its messages in order.
+
+    """
+
+    def __init__(
+        self,
+        commands: "Commands",
+        config: "Config",
+        engine: "Engine",
+        workers: Dict[str, int],
+        default_workers: int,
+    ) -> None:
+        self._commands = commands
+        self._config = config
+        self._engine = engine
+        self._semaphores: Dict[str, asyncio.Semaphore] = defaultdict(
+            lambda: asyncio.Semaphore(default_workers)
+        )
+        self._semaphores.update(
+            {name: asyncio.Semaphore(count) for name, count in workers.items()}
+        )
+        self._thread_locks: Dict[int, asyncio.Lock] = defaultdict(asyncio.Lock)
+
+    def _find_assistant(self, name: str) -> "schemas.AssistantResponse":
+        """
+        Find assistant by name or id.
+
+        Params
+        ------
+        - name (str): Assistant name or id.
+
+        Returns
+        -------
+        - AssistantResponse: Assistant.
+
+        """
+
+        for assistant in self._commands.read_assistants():
+            if assistant.name == name or str(assistant.id) == name:
+                return assistant
+
+        raise ValueError(f"Assistant {name} not found")
+
+    async def _process(
+        self,
+        index: int,
+        prompt: "schemas.BatchPrompt",
+    ) -> "schemas.BatchResult":
+        """
+        Process single prompt: store it, stream the reply and store the reply.
+
+        Params
+        ------
+        - index (int): Line number of prompt in input.
+        - prompt (BatchPrompt): Prompt.
+
+        Returns
+        -------
+        - BatchResult: Result.
+
+        """
+
+        from seeks.core import schemas
+        from seeks.core.buffers import MessageBuffer
+        from seeks.core.providers import TextChunk
+
+        assistant = self._find_assistant(prompt.assistant)
+        provider_profile = self._config.find_provider_by_model(assistant.model_name)
+
+        if provider_profile is None:
+            raise ValueError(f"No provider found for model {assistant.model_name}")
+
+        # Foreign keys are not enforced, so an unknown thread would silently
+        # collect orphaned messages
+        if prompt.thread:
+            thread = self._commands.read_thread_by_id(prompt.thread)
+
+            if thread is None:
+                raise ValueError(f"Thread {prompt.thread} not found")
+
+            if thread.assistant_id != assistant.id:
+                raise ValueError(
+                    f"Thread {prompt.thread} does not belong to assistant "
+                    f"{assistant.name}"
+                )
+
+        provider = self._commands.read_provider_by_name(provider_profile.name)
+        lock = self._thread_locks[prompt.thread] if prompt.thread else asyncio.Lock()
+
+        async with lock, self._semaphores[provider.name.value]:
+            if prompt.thread:
+                thread_id = prompt.thread
+
+            else:
+                thread_id = self._commands.create_thread(
+                    schemas.ThreadCreate(
+                        subject=prompt.content,
+                        assistant_id=assistant.id,
+                    )
+                ).id
+
+            self._commands.create_message(
+                schemas.MessageCreate(
+                    thread_id=thread_id,
+                    role=schemas.Role.USER,
+                    content=prompt.content,
+                )
+            )
+            messages = self._commands.read_context(
+                thread_id,
+                budget=self._config.context_budget(assistant.model_name),
+            )
+            headers, data = self._config.generate_payload(
+                provider=provider,
+                assistant=assistant,
+                messages=messages,
+            )
+
+            with MessageBuffer(self._commands, thread_id) as buffer:
+                async for chunk in self._engine.stream(
+                    provider_name=provider.name,
+                    endpoint=provider_profile.endpoint,
+                    headers=headers,
+                    data=data,
+                ):
+                    if isinstance(chunk, TextChunk):
+                        buffer.append(chunk.text)
+
+            message = buffer.close()
+
+        return schemas.BatchResult(
+            index=index,
+            assistant=assistant.name,
+            thread_id=thread_id,
+            message_id=message.id if message else None,
+            content=buffer.content,
+        )
+
+    async def run(
+        self,
+        prompts: List[Tuple[int, "schemas.BatchPrompt"]],
+        output: IO[str],
+    ) -> int:
+        """
+        Run prompts concurrently and write each result to the output as soon as
+        it is done.
+
+        Params
+        ------
+        - prompts (List[Tuple[int, BatchPrompt]]): Prompts with line numbers.
+        - output (IO[str]): Output to write JSON lines to.
+
+        Returns
+        -------
+        - int: Number of failed prompts.
+
+        """
+
+        from pydantic import ValidationError
+
+        from seeks.core import schemas
+        from seeks.core.providers import ProviderError
+
+        async def process(
+            index: int,
+            prompt: schemas.BatchPrompt,
+        ) -> schemas.BatchResult:
+            try:
+                return await self._process(index, prompt)
+
+            # Unknown assistants, threads and providers fail their own row only
+            except (ProviderError, ValidationError, ValueError) as error:
+                return schemas.BatchResult(
+                    index=index,
+                    assistant=prompt.assistant,
+                    thread_id=prompt.thread,
+                    error=str(error) or type(error).__name__,
+                )
+
+        failed = 0
+        tasks = [
+            asyncio.create_task(process(index, prompt)) for index, prompt in prompts
+        ]
+
+        for task in asyncio.as_completed(tasks):
+            result = await task
+            failed += result.error is not None
+            output.write(result.model_dump_json() + "\n")
+            output.flush()
+
+        return failed
+
+
+def parse_workers(values: Tuple[str, ...]) -> Dict[str, int]:
+    """
+    Parse worker counts per provider, ie. `openai=8`.
+
+    Params
+    ------
+    - values (Tuple[str, ...]): Worker counts as `provider=count`.
+
+    Returns
+    -------
+    - Dict[str, int]: Worker count by provider name.
+
+    """
+
+    workers: Dict[str, int] = {}
+
+    for value in values:
+        name, _, count = value.partition("=")
+
+        if not count.isdigit() or int(count) < 1:
+            raise click.BadParameter(f"Expected provider=count, got {value}")
+
+        workers[name.strip().lower()] = int(count)
+
+    return workers
+
+
+@click.command()
+@click.argument("input", type=click.File("r"))
+@click.option(
+    "--output",
+    "-o",
+    type=click.File("w"),
+    default="-",
+    help="File to write results to as JSON lines. Defaults to stdout.",
+)
+@click.option(
+    "--workers",
+    "-w",
+    type=click.IntRange(min=1),
+    default=4,
+    show_default=True,
+    help="Concurrent requests per provider.",
+)
+@click.option(
+    "--provider-workers",
+    multiple=True,
+    help="Concurrent requests for a single provider, ie. openai=8.",
+)
+@click.option(
+    "--cache/--no-cache",
+    default=None,
+    help="Replay identical requests from the response cache. Defaults to the "
+    "SEEKS_RESPONSE_CACHE setting.",
+)
+def batch(
+    input: IO[str],
+    output: IO[str],
+    workers: int,
+    provider_workers: Tuple[str, ...],
+    cache: Optional[bool],
+) -> None:
+    """
+    Run prompts from a JSONL file, one object per line with `assistant` (name
+    or id), optional `thread` (id) and `content`. Results are written as JSON
+    lines in order of completion.
+
+    """
+
+    from pydantic import ValidationError
+
+    from seeks.common.config import Config
+    from seeks.core import schemas
+    from seeks.core.cache import ResponseCache
+    from seeks.core.clients import Clients
+    from seeks.core.commands import Commands
+    from seeks.core.database import engine, get_session
+    from seeks.core.engine import Engine
+    from seeks.core.migrations import migrate
+    from seeks.utils.get_home_dir import get_home_dir
+
+    prompts: List[Tuple[int, schemas.BatchPrompt]] = []
+
+    for index, line in enumerate(input, start=1):
+        if not line.strip():
+            continue
+
+        try:
+            prompts.append((index, schemas.BatchPrompt.model_validate_json(line)))
+
+        except ValidationError as error:
+            raise click.BadParameter(f"Invalid prompt on line {index}: {error}")
+
+    migrate(engine)
+
+    config = Config()
+    commands = Commands(session=next(get_session()))
+    response_cache = None
+
+    if cache is None:
+        cache = config.cache.enabled
+
+    if cache:
+        response_cache = ResponseCache(
+            database_file=get_home_dir() / "cache.db",
+            settings=config.cache,
+        )
+
+    async def run() -> int:
+        clients = Clients(settings=config.client)
+
+        try:
+            return await Batch(
+                commands=commands,
+                config=config,
+                engine=Engine(clients=clients, cache=response_cache),
+                workers=parse_workers(provider_workers),
+                default_workers=workers,
+            ).run(prompts, output)
+
+        finally:
+            await clients.aclose()
+
+    try:
+        failed = asyncio.run(run())
+
+    finally:
+        if response_cache is not None:
+            response_cache.close()
+
+    # Summary goes to stderr, as stdout may carry the results
+    if failed:
+        click.echo(f"{failed} of {len(prompts)} prompts failed", err=True)
+        sys.exit(1)
+
+    click.echo(f"{len(prompts)} prompts processed", err=True)
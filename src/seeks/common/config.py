@@ -1,58 +1,188 @@
+from pathlib import Path
 from typing import Any, Dict, List, Optional, Tuple, Union
 
-from pydantic import BaseModel
+from pydantic import BaseModel, Field, PrivateAttr
 
 from seeks.core import schemas
+from seeks.core.catalog import ModelDetails, ProviderProfile, Registry, read_listings
+from seeks.core.providers import get_adapter
+from seeks.utils.get_env import get_env, to_bool, to_limits
+from seeks.utils.get_home_dir import get_home_dir
+from seeks.utils.print import print_alert
+
+
+class ClientSettings(BaseModel):
+    http2: bool = Field(default_factory=lambda: get_env("SEEKS_HTTP2", False, to_bool))
+    max_connections: int = Field(
+        default_factory=lambda: get_env("SEEKS_HTTP_MAX_CONNECTIONS", 10, int)
+    )
+    max_keepalive_connections: int = Field(
+        default_factory=lambda: get_env("SEEKS_HTTP_MAX_KEEPALIVE", 5, int)
+    )
+    keepalive_expiry: float = Field(
+        default_factory=lambda: get_env("SEEKS_HTTP_KEEPALIVE_EXPIRY", 120.0, float)
+    )
+    connect_timeout: float = 10.0
+    read_timeout: float = 120.0
+    max_retries: int = Field(
+        default_factory=lambda: get_env("SEEKS_HTTP_MAX_RETRIES", 4, int)
+    )
+    backoff_base: float = Field(
+        default_factory=lambda: get_env("SEEKS_HTTP_BACKOFF_BASE", 0.5, float)
+    )
+    backoff_max: float = Field(
+        default_factory=lambda: get_env("SEEKS_HTTP_BACKOFF_MAX", 30.0, float)
+    )
+    requests_per_minute: Dict[str, int] = Field(
+        default_factory=lambda: get_env(
+            "SEEKS_RATE_LIMIT_REQUESTS", dict[str, int](), to_limits
+        )
+    )
+    tokens_per_minute: Dict[str, int] = Field(
+        default_factory=lambda: get_env(
+            "SEEKS_RATE_LIMIT_TOKENS", dict[str, int](), to_limits
+        )
+    )
+    breaker_threshold: int = Field(
+        default_factory=lambda: get_env("SEEKS_BREAKER_THRESHOLD", 5, int)
+    )
+    breaker_reset: float = Field(
+        default_factory=lambda: get_env("SEEKS_BREAKER_RESET", 30.0, float)
+    )
+
+
+class ContextSettings(BaseModel):
+    max_tokens: int = Field(
+        default_factory=lambda: get_env("SEEKS_CONTEXT_MAX_TOKENS", 32000, int)
+    )
+
+
+class CompactionSettings(BaseModel):
+    enabled: bool = Field(
+        default_factory=lambda: get_env("SEEKS_COMPACTION", False, to_bool)
+    )
+    threshold: int = Field(
+        default_factory=lambda: get_env("SEEKS_COMPACTION_THRESHOLD", 16000, int)
+    )
+    keep_tokens: int = Field(
+        default_factory=lambda: get_env("SEEKS_COMPACTION_KEEP_TOKENS", 4000, int)
+    )
+
+
+class RenderSettings(BaseModel):
+    frame_interval: float = Field(
+        default_factory=lambda: get_env("SEEKS_RENDER_FRAME_INTERVAL", 0.03, float)
+    )
+    frame_size: int = Field(
+        default_factory=lambda: get_env("SEEKS_RENDER_FRAME_SIZE", 4096, int)
+    )
+    markdown: bool = Field(
+        default_factory=lambda: get_env("SEEKS_RENDER_MARKDOWN", False, to_bool)
+    )
+
+
+class TimingSettings(BaseModel):
+    enabled: bool = Field(
+        default_factory=lambda: get_env("SEEKS_TIMINGS", True, to_bool)
+    )
+    retention_days: int = Field(
+        default_factory=lambda: get_env("SEEKS_TIMINGS_RETENTION_DAYS", 30, int)
+    )
+    log: Optional[Path] = Field(
+        default_factory=lambda: get_env("SEEKS_TIMINGS_LOG", None, Path)
+    )
+
+
+class FallbackSettings(BaseModel):
+    # Seconds without a first token after which the next model of the fallback
+    # chain is raced against the pending request, disabled if not set
+    hedge_after: Optional[float] = Field(
+        default_factory=lambda: get_env("SEEKS_HEDGE_AFTER", None, float)
+    )
+
+
+class CatalogSettings(BaseModel):
+    path: Path = Field(
+        default_factory=lambda: get_env(
+            "SEEKS_CATALOG", get_home_dir() / "catalog.json", Path
+        )
+    )
+    plugins: bool = Field(
+        default_factory=lambda: get_env("SEEKS_CATALOG_PLUGINS", True, to_bool)
+    )
+    listings: Path = Field(
+        default_factory=lambda: get_env(
+            "SEEKS_MODELS_CACHE", get_home_dir() / "models.json", Path
+        )
+    )
+    listings_ttl: int = Field(
+        default_factory=lambda: get_env("SEEKS_MODELS_CACHE_TTL", 86400, int)
+    )
+
+
+class CacheSettings(BaseModel):
+    enabled: bool = Field(
+        default_factory=lambda: get_env("SEEKS_RESPONSE_CACHE", False, to_bool)
+    )
+    ttl: int = Field(
+        default_factory=lambda: get_env("SEEKS_RESPONSE_CACHE_TTL", 86400, int)
+    )
+    max_entries: int = Field(
+        default_factory=lambda: get_env("SEEKS_RESPONSE_CACHE_MAX_ENTRIES", 1000, int)
+    )
+    max_size: int = Field(
+        default_factory=lambda: get_env(
+            "SEEKS_RESPONSE_CACHE_MAX_SIZE", 64 * 1024 * 1024, int
+        )
+    )
 
 
-class ModelDetails(BaseModel):
-    name: str
-    description: Optional[str]
+class Config(BaseModel):
+    cache: CacheSettings = Field(default_factory=CacheSettings)
+    catalog: CatalogSettings = Field(default_factory=CatalogSettings)
+    client: ClientSettings = Field(default_factory=ClientSettings)
+    compaction: CompactionSettings = Field(default_factory=CompactionSettings)
+    context: ContextSettings = Field(default_factory=ContextSettings)
+    fallback: FallbackSettings = Field(default_factory=FallbackSettings)
+    render: RenderSettings = Field(default_factory=RenderSettings)
+    timing: TimingSettings = Field(default_factory=TimingSettings)
+
+    _registry: Optional[Registry] = PrivateAttr(default=None)
+
+    @property
+    def registry(self) -> Registry:
+        """
+        Registry of providers and models, loaded on first use so plugins are
+        not imported on startup. Invalid plugins or catalog files are reported
+        and skipped, so these never prevent using the built-in catalog.
 
+        """
 
-class ProviderProfile(BaseModel):
-    name: schemas.ProviderName
-    display_name: str
-    endpoint: str
-    description: Optional[str]
-    models: List[ModelDetails]
+        if self._registry is None:
+            self._registry = Registry.load(
+                path=self.catalog.path,
+                plugins=self.catalog.plugins,
+                listings=read_listings(self.catalog.listings),
+                on_error=lambda source, error: print_alert(
+                    f"Skipped invalid catalog {source}: {error}",
+                    "warning",
+                    clear=False,
+                ),
+            )
 
+        return self._registry
 
-class Config(BaseModel):
-    providers: List[ProviderProfile] = [
-        ProviderProfile(
-            name=schemas.ProviderName.ANTHROPIC.value,
-            display_name="Anthropic",
-            description="Anthropic API",
-            endpoint="https://api.anthropic.com/v1/messages",
-            models=[
-                ModelDetails(
-                    name=schemas.ModelName.CLAUDE_3_5_HAIKU_20241022.value,
-                    description="Claude 3.5 Haiku model",
-                ),
-                ModelDetails(
-                    name=schemas.ModelName.CLAUDE_3_5_SONNET_20241022.value,
-                    description="Claude 3.5 Sonnet model",
-                ),
-            ],
-        ),
-        ProviderProfile(
-            name=schemas.ProviderName.OPENAI.value,
-            display_name="OpenAI",
-            description="OpenAI API",
-            endpoint="https://api.openai.com/v1/chat/completions",
-            models=[
-                ModelDetails(
-                    name=schemas.ModelName.O3_MINI.value,
-                    description="OpenAI o1 model",
-                ),
-                ModelDetails(
-                    name=schemas.ModelName.GPT_4O.value,
-                    description="GPT-4o model",
-                ),
-            ],
-        ),
-    ]
+    def reload_registry(self) -> None:
+        """
+        Reload registry on next use, ie. after discovering models.
+
+        """
+
+        self._registry = None
+
+    @property
+    def providers(self) -> List[ProviderProfile]:
+        return self.registry.providers
 
     def find_provider_by_name(
         self, name: schemas.ProviderName
@@ -70,11 +200,24 @@ class Config(BaseModel):
 
         """
 
-        for provider in self.providers:
-            if provider.name == name:
-                return provider
+        return self.registry.find_provider(name)
 
-        return None
+    def find_display_name(self, name: schemas.ProviderName) -> str:
+        """
+        Find display name of provider by name.
+
+        Params
+        ------
+        - name (ProviderName): Provider name.
+
+        Returns
+        -------
+        - str: Display name, or provider name if not in the registry.
+
+        """
+
+        provider_profile = self.registry.find_provider(name)
+        return provider_profile.display_name if provider_profile else name.value
 
     def find_provider_by_model(self, model: str) -> Union[ProviderProfile, None]:
         """
@@ -90,12 +233,48 @@ class Config(BaseModel):
 
         """
 
-        for provider in self.providers:
-            for model_details in provider.models:
-                if model_details.name == model:
-                    return provider
+        return self.registry.find_provider_by_model(model)
+
+    def find_model(self, model: str) -> Union[ModelDetails, None]:
+        """
+        Find model details by model name.
+
+        Params
+        ------
+        - model (str): Model name.
+
+        Returns
+        -------
+        - Union[ModelDetails, None]: Model details.
+
+        """
+
+        return self.registry.find_model(model)
+
+    def context_budget(self, model: str) -> int:
+        """
+        Return token budget for the context sent to model. The budget is the
+        context window of the model minus the tokens reserved for its output,
+        capped by the configured maximum to bound request size and latency.
 
-        return None
+        Params
+        ------
+        - model (str): Model name.
+
+        Returns
+        -------
+        - int: Token budget.
+
+        """
+
+        model_details = self.find_model(model)
+
+        if model_details is None or model_details.context_window is None:
+            return self.context.max_tokens
+
+        context_window: int = model_details.context_window
+        max_output_tokens: int = model_details.max_output_tokens or 0
+        return min(context_window - max_output_tokens, self.context.max_tokens)
 
     def list_models(self, provider_names: List[schemas.ProviderName]) -> List[str]:
         """
@@ -126,9 +305,9 @@ class Config(BaseModel):
 
         Params
         ------
-        - provider (ProviderProfile): Provider profile.
-        - model (str): Model name.
-        - prompt (str): Prompt.
+        - provider (ProviderResponse): Provider.
+        - assistant (AssistantResponse): Assistant.
+        - messages (List[MessageResponse]): Messages.
 
         Returns
         -------
@@ -136,27 +315,9 @@ class Config(BaseModel):
 
         """
 
-        headers = {
-            "Content-Type": "application/json",
-        }
-
-        data: Dict[str, Any] = {
-            "model": assistant.model_name,
-            "messages": [
-                {
-                    "role": message.role.value,
-                    "content": message.content,
-                }
-                for message in messages
-            ],
-        }
-
-        if provider.name == schemas.ProviderName.ANTHROPIC:
-            headers["x-api-key"] = provider.api_key
-            data["max_tokens"] = 8192
-
-        if provider.name == schemas.ProviderName.OPENAI:
-            headers["Authorization"] = f"Bearer {provider.api_key}"
-            data["stream"] = True
-
+        headers, data = get_adapter(provider.name).build_payload(
+            provider=provider,
+            assistant=assistant,
+            messages=messages,
+        )
         return (headers, data)
@@ -0,0 +1,142 @@
+from time import monotonic
+from types import TracebackType
+from typing import List, Optional, Self, Type, Union
+
+from seeks.core import schemas
+from seeks.core.commands import Commands
+
+
+class MessageBuffer:
+    """
+    Write-behind buffer for a message that is being streamed. The message is
+    stored as soon as the first chunk arrives, after which chunks are collected
+    in memory and written to the database only when the buffer exceeds its
+    size or age threshold, and once more when the stream completes. Until then
+    the stored record is flagged as partial, so an interrupted stream still
+    leaves the content received so far in the database.
+
+    """
+
+    def __init__(
+        self,
+        commands: Commands,
+        thread_id: int,
+        role: schemas.Role = schemas.Role.ASSISTANT,
+        flush_size: int = 4096,
+        flush_interval: float = 2.0,
+    ) -> None:
+        self._commands = commands
+        self._thread_id = thread_id
+        self._role = role
+        self._flush_size = flush_size
+        self._flush_interval = flush_interval
+        self._message: Optional[schemas.MessageResponse] = None
+        self._parts: List[str] = []
+        self._pending = 0
+        self._flushed_at = monotonic()
+        self._closed = False
+
+    @property
+    def content(self) -> str:
+        """
+        Return content received so far.
+
+        """
+
+        if len(self._parts) > 1:
+            self._parts = ["".join(self._parts)]
+
+        return self._parts[0] if self._parts else ""
+
+    def append(self, text: str) -> None:
+        """
+        Append chunk to buffer and flush if it is the first content received
+        or a threshold is exceeded.
+
+        Params
+        ------
+        - text (str): Chunk of message content.
+
+        """
+
+        self._parts.append(text)
+        self._pending += len(text)
+
+        if (
+            (self._message is None and text)
+            or self._pending >= self._flush_size
+            or monotonic() - self._flushed_at >= self._flush_interval
+        ):
+            self.flush(partial=True)
+
+    def flush(self, partial: bool) -> None:
+        """
+        Write buffered content to the database. The message is created on the
+        first flush and updated on subsequent flushes.
+
+        Params
+        ------
+        - partial (bool): Whether the message is still incomplete.
+
+        """
+
+        content = self.content
+
+        if self._message is None:
+            if not content:
+                return None
+
+            self._message = self._commands.create_message(
+                schemas.MessageCreate(
+                    thread_id=self._thread_id,
+                    role=self._role,
+                    content=content,
+                    partial=partial,
+                )
+            )
+
+        else:
+            self._commands.update_message(self._message.id, content, partial)
+
+        self._pending = 0
+        self._flushed_at = monotonic()
+
+    def close(self) -> Union[schemas.MessageResponse, None]:
+        """
+        Flush remaining content and mark message as complete. Closing the
+        buffer again only returns the stored message.
+
+        Returns
+        -------
+        - Union[MessageResponse, None]: Stored message or None if nothing was
+          received.
+
+        """
+
+        if not self._closed:
+            self.flush(partial=False)
+            self._closed = True
+
+        if self._message is None:
+            return None
+
+        return self._message.model_copy(
+            update={"content": self.content, "partial": False}
+        )
+
+    def __enter__(self) -> Self:
+        return self
+
+    def __exit__(
+        self,
+        exc_type: Optional[Type[BaseException]],
+        exc_value: Optional[BaseException],
+        traceback: Optional[TracebackType],
+    ) -> None:
+        # Keep what has been received so far when the stream is interrupted,
+        # flagged as partial
+        if exc_type is not None:
+            self.flush(partial=True)
+            return None
+
+        self.close()
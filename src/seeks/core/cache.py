@@ -0,0 +1,194 @@
+import hashlib
+import json
+import threading
+from pathlib import Path
+from time import time
+from typing import Any, Dict, List, Union
+
+from sqlalchemy import (
+    Column,
+    Float,
+    Index,
+    Integer,
+    MetaData,
+    String,
+    Table,
+    Text,
+    delete,
+    func,
+    insert,
+    select,
+    update,
+)
+
+from seeks.common.config import CacheSettings
+from seeks.core.database import create_database_engine
+
+metadata = MetaData()
+
+response_cache = Table(
+    "response_cache",
+    metadata,
+    Column("key", String(64), primary_key=True),
+    Column("chunks", Text, nullable=False),
+    Column("size", Integer, nullable=False),
+    Column("created_at", Float, nullable=False),
+    Column("accessed_at", Float, nullable=False),
+    Index("ix_response_cache_accessed_at", "accessed_at"),
+)
+
+
+class ResponseCache:
+    """
+    Content-addressed cache of complete responses, stored in a SQLite file next
+    to the main database. Entries are keyed by a hash of the request body, so
+    sending the same model the same messages again replays the stored chunks
+    without a request. Entries expire after a time to live and the least
+    recently used entries are evicted beyond the maximum number of entries or
+    the maximum total size.
+
+    """
+
+    def __init__(self, database_file: Path, settings: CacheSettings) -> None:
+        self._settings = settings
+        self._engine = create_database_engine(database_file)
+        self._lock = threading.Lock()
+        metadata.create_all(bind=self._engine)
+
+    @staticmethod
+    def key(provider_name: str, data: Dict[str, Any]) -> str:
+        """
+        Return stable hash of request. Headers are left out, so API keys never
+        end up in the cache and rotating a key keeps the cache valid.
+
+        Params
+        ------
+        - provider_name (str): Provider name.
+        - data (Dict[str, Any]): Request body.
+
+        Returns
+        -------
+        - str: Hex digest of request.
+
+        """
+
+        payload = json.dumps(
+            [provider_name, data],
+            sort_keys=True,
+            separators=(",", ":"),
+            ensure_ascii=False,
+        )
+        return hashlib.sha256(payload.encode()).hexdigest()
+
+    def get(self, key: str) -> Union[List[str], None]:
+        """
+        Return cached text chunks of request, if present and not expired.
+
+        Params
+        ------
+        - key (str): Request key.
+
+        Returns
+        -------
+        - Union[List[str], None]: Text chunks in order of arrival.
+
+        """
+
+        now = time()
+
+        with self._lock, self._engine.begin() as connection:
+            chunks = connection.scalar(
+                select(response_cache.c.chunks).where(
+                    response_cache.c.key == key,
+                    response_cache.c.created_at >= now - self._settings.ttl,
+                )
+            )
+
+            if chunks is None:
+                return None
+
+            connection.execute(
+                update(response_cache)
+                .where(response_cache.c.key == key)
+                .values(accessed_at=now)
+            )
+
+        return list(json.loads(chunks))
+
+    def put(self, key: str, chunks: List[str]) -> None:
+        """
+        Store text chunks of complete response and evict expired and least
+        recently used entries.
+
+        Params
+        ------
+        - key (str): Request key.
+        - chunks (List[str]): Text chunks in order of arrival.
+
+        """
+
+        now = time()
+        value = json.dumps(chunks, ensure_ascii=False)
+
+        with self._lock, self._engine.begin() as connection:
+            connection.execute(
+                delete(response_cache).where(response_cache.c.key == key)
+            )
+            connection.execute(
+                insert(response_cache).values(
+                    key=key,
+                    chunks=value,
+                    size=len(value),
+                    created_at=now,
+                    accessed_at=now,
+                )
+            )
+            connection.execute(
+                delete(response_cache).where(
+                    response_cache.c.created_at < now - self._settings.ttl
+                )
+            )
+            connection.execute(
+                delete(response_cache).where(
+                    response_cache.c.key.in_(
+                        select(response_cache.c.key)
+                        .order_by(response_cache.c.accessed_at.desc())
+                        .offset(self._settings.max_entries)
+                    )
+                )
+            )
+
+            # Running total of sizes from most to least recently used, entries
+            # past the maximum size are evicted
+            totals = select(
+                response_cache.c.key,
+                func.sum(response_cache.c.size)
+                .over(order_by=response_cache.c.accessed_at.desc())
+                .label("total"),
+            ).subquery()
+            connection.execute(
+                delete(response_cache).where(
+                    response_cache.c.key.in_(
+                        select(totals.c.key).where(
+                            totals.c.total > self._settings.max_size
+                        )
+                    )
+                )
+            )
+
+    def clear(self) -> None:
+        """
+        Remove all entries.
+
+        """
+
+        with self._lock, self._engine.begin() as connection:
+            connection.execute(delete(response_cache))
+
+    def close(self) -> None:
+        """
+        Dispose connections of the cache database.
+
+        """
+
+        self._engine.dispose()
@@ -0,0 +1,421 @@
+import json
+from copy import deepcopy
+from functools import partial
+from pathlib import Path
+from typing import (
+    TYPE_CHECKING,
+    Any,
+    Callable,
+    Dict,
+    Iterable,
+    List,
+    Optional,
+    Tuple,
+    Union,
+)
+
+from pydantic import BaseModel
+
+from seeks.core import schemas
+
+if TYPE_CHECKING:
+    from importlib.metadata import EntryPoint
+
+# Entry point group of catalog plugins. Each entry point refers to a list of
+# provider entries, or a callable returning one, in the format of the catalog
+# file, ie. in `pyproject.toml` of a plugin:
+#
+#     [project.entry-points."seeks.catalog"]
+#     example = "seeks_example:providers"
+ENTRY_POINT_GROUP = "seeks.catalog"
+
+
+class ModelDetails(BaseModel):
+    name: str
+    description: Optional[str] = None
+    # Limits and prices are unknown for models only found through discovery
+    context_window: Optional[int] = None
+    max_output_tokens: Optional[int] = None
+    # Prices in USD per million tokens
+    input_price: Optional[float] = None
+    output_price: Optional[float] = None
+
+
+class ProviderProfile(BaseModel):
+    name: schemas.ProviderName
+    display_name: str
+    endpoint: str
+    models_endpoint: Optional[str] = None
+    description: Optional[str] = None
+    models: List[ModelDetails]
+
+
+class ModelListing(BaseModel):
+    models: List[str]
+    fetched_at: float
+
+
+default_providers: List[Dict[str, Any]] = [
+    {
+        "name": schemas.ProviderName.ANTHROPIC.value,
+        "display_name": "Anthropic",
+        "description": "Anthropic API",
+        "endpoint": "https://api.anthropic.com/v1/messages",
+        "models_endpoint": "https://api.anthropic.com/v1/models",
+        "models": [
+            {
+                "name": schemas.ModelName.CLAUDE_3_5_HAIKU_20241022.value,
+                "description": "Claude 3.5 Haiku model",
+                "context_window": 200000,
+                "max_output_tokens": 8192,
+                "input_price": 0.8,
+                "output_price": 4.0,
+            },
+            {
+                "name": schemas.ModelName.CLAUDE_3_5_SONNET_20241022.value,
+                "description": "Claude 3.5 Sonnet model",
+                "context_window": 200000,
+                "max_output_tokens": 8192,
+                "input_price": 3.0,
+                "output_price": 15.0,
+            },
+        ],
+    },
+    {
+        "name": schemas.ProviderName.OPENAI.value,
+        "display_name": "OpenAI",
+        "description": "OpenAI API",
+        "endpoint": "https://api.openai.com/v1/chat/completions",
+        "models_endpoint": "https://api.openai.com/v1/models",
+        "models": [
+            {
+                "name": schemas.ModelName.O3_MINI.value,
+                "description": "OpenAI o3-mini model",
+                "context_window": 200000,
+                "max_output_tokens": 100000,
+                "input_price": 1.1,
+                "output_price": 4.4,
+            },
+            {
+                "name": schemas.ModelName.GPT_4O.value,
+                "description": "GPT-4o model",
+                "context_window": 128000,
+                "max_output_tokens": 16384,
+                "input_price": 2.5,
+                "output_price": 10.0,
+            },
+        ],
+    },
+]
+
+
+class Registry:
+    """
+    Providers and their models, indexed by name once so lookups on every
+    prompt do not scan the catalog.
+
+    Entries are merged in order: the built-in catalog, models discovered
+    through provider model listings, entry point plugins and the user catalog
+    file. Discovered models are only added when not already known, as listings
+    carry no limits or prices. A provider entry that is already known only needs a
+    name; its other fields are overridden and its models are added to, or
+    replace models of the same name.
+
+    """
+
+    def __init__(self, entries: Iterable[Dict[str, Any]] = ()) -> None:
+        self._providers: Dict[schemas.ProviderName, ProviderProfile] = {}
+        self._models: Dict[str, ModelDetails] = {}
+        self._model_providers: Dict[str, ProviderProfile] = {}
+
+        for entry in entries:
+            self.merge(entry)
+
+    @classmethod
+    def load(
+        cls,
+        path: Optional[Path] = None,
+        plugins: bool = True,
+        listings: Optional[Dict[str, ModelListing]] = None,
+        on_error: Optional[Callable[[str, Exception], None]] = None,
+    ) -> "Registry":
+        """
+        Load registry from the built-in catalog, discovered models, plugins and
+        user catalog file. A plugin or catalog file that cannot be read is
+        passed to `on_error` and skipped as a whole, or raises a ValueError if
+        no handler is passed.
+
+        Params
+        ------
+        - path (Optional[Path]): Path to user catalog file, skipped if it does
+          not exist.
+        - plugins (bool): Whether to load entry point plugins.
+        - listings (Optional[Dict[str, ModelListing]]): Discovered models by
+          provider name.
+        - on_error (Optional[Callable[[str, Exception], None]]): Handler of
+          invalid sources, called with source description and error.
+
+        Returns
+        -------
+        - Registry: Registry.
+
+        """
+
+        registry = cls(default_providers)
+
+        for name, listing in (listings or {}).items():
+            registry.merge(
+                {
+                    "name": name,
+                    "models": [
+                        {"name": model}
+                        for model in listing.models
+                        if registry.find_model(model) is None
+                    ],
+                }
+            )
+
+        sources: List[Tuple[str, Callable[[], List[Dict[str, Any]]]]] = []
+
+        if plugins:
+            sources += [
+                (f"plugin {entry_point.name}", partial(load_plugin, entry_point))
+                for entry_point in find_plugins()
+            ]
+
+        if path is not None and path.exists():
+            sources.append((f"file {path}", partial(read_catalog, path)))
+
+        for source, read_entries in sources:
+            # Entries are merged into a copy, so a source failing halfway does
+            # not leave part of it behind
+            candidate = deepcopy(registry)
+
+            try:
+                for entry in read_entries():
+                    candidate.merge(entry)
+
+            except (ImportError, KeyError, OSError, TypeError, ValueError) as error:
+                if on_error is None:
+                    raise ValueError(f"Invalid catalog {source}: {error}") from error
+
+                on_error(source, error)
+                continue
+
+            registry = candidate
+
+        return registry
+
+    @property
+    def providers(self) -> List[ProviderProfile]:
+        return list(self._providers.values())
+
+    def merge(self, entry: Union[Dict[str, Any], ProviderProfile]) -> None:
+        """
+        Merge provider entry into registry.
+
+        Params
+        ------
+        - entry (Union[Dict[str, Any], ProviderProfile]): Provider entry.
+
+        """
+
+        if isinstance(entry, ProviderProfile):
+            entry = entry.model_dump()
+
+        name = schemas.ProviderName(entry["name"])
+        current = self._providers.get(name)
+
+        if current is None:
+            profile = ProviderProfile.model_validate(entry)
+
+        else:
+            models = {model.name: model for model in current.models}
+
+            for model in entry.get("models", []):
+                model_details = ModelDetails.model_validate(model)
+                models[model_details.name] = model_details
+
+            profile = ProviderProfile.model_validate(
+                {
+                    **current.model_dump(exclude={"models"}),
+                    **entry,
+                    "models": list(models.values()),
+                }
+            )
+
+        self._providers[name] = profile
+
+        # Models are owned by a single provider, so a model moved to another
+        # provider is no longer listed under the previous one
+        for model_details in profile.models:
+            owner = self._model_providers.get(model_details.name)
+
+            if owner is not None and owner.name != name:
+                owner.models = [
+                    model for model in owner.models if model.name != model_details.name
+                ]
+
+            self._models[model_details.name] = model_details
+            self._model_providers[model_details.name] = profile
+
+    def find_provider(self, name: schemas.ProviderName) -> Union[ProviderProfile, None]:
+        """
+        Find provider by name.
+
+        Params
+        ------
+        - name (ProviderName): Provider name.
+
+        Returns
+        -------
+        - Union[ProviderProfile, None]: Provider profile.
+
+        """
+
+        return self._providers.get(name)
+
+    def find_provider_by_model(self, model: str) -> Union[ProviderProfile, None]:
+        """
+        Find provider by model.
+
+        Params
+        ------
+        - model (str): Model name.
+
+        Returns
+        -------
+        - Union[ProviderProfile, None]: Provider profile.
+
+        """
+
+        return self._model_providers.get(model)
+
+    def find_model(self, model: str) -> Union[ModelDetails, None]:
+        """
+        Find model details by model name.
+
+        Params
+        ------
+        - model (str): Model name.
+
+        Returns
+        -------
+        - Union[ModelDetails, None]: Model details.
+
+        """
+
+        return self._models.get(model)
+
+
+def read_catalog(path: Path) -> List[Dict[str, Any]]:
+    """
+    Read provider entries from catalog file, ie.
+
+        {"providers": [{"name": "openai", "models": [{"name": "gpt-4.1",
+        "context_window": 1047576, "max_output_tokens": 32768}]}]}
+
+    Params
+    ------
+    - path (Path): Path to catalog file.
+
+    Returns
+    -------
+    - List[Dict[str, Any]]: Provider entries.
+
+    """
+
+    with open(path, encoding="utf-8") as file:
+        return list(json.load(file)["providers"])
+
+
+def find_plugins() -> List["EntryPoint"]:
+    """
+    Find catalog plugins among installed packages.
+
+    Returns
+    -------
+    - List["EntryPoint"]: Entry point(s) of plugins.
+
+    """
+
+    from importlib.metadata import entry_points
+
+    return list(entry_points(group=ENTRY_POINT_GROUP))
+
+
+def load_plugin(entry_point: "EntryPoint") -> List[Dict[str, Any]]:
+    """
+    Load provider entries from catalog plugin.
+
+    Params
+    ------
+    - entry_point (EntryPoint): Entry point of plugin.
+
+    Returns
+    -------
+    - List[Dict[str, Any]]: Provider entries.
+
+    """
+
+    providers = entry_point.load()
+
+    if callable(providers):
+        providers = providers()
+
+    return [
+        provider.model_dump() if isinstance(provider, ProviderProfile) else provider
+        for provider in providers
+    ]
+
+
+def read_listings(path: Path) -> Dict[str, ModelListing]:
+    """
+    Read discovered models from cache file. A missing or unreadable cache is
+    treated as empty, so discovery never prevents startup.
+
+    Params
+    ------
+    - path (Path): Path to cache file.
+
+    Returns
+    -------
+    - Dict[str, ModelListing]: Discovered models by provider name.
+
+    """
+
+    try:
+        with open(path, encoding="utf-8") as file:
+            data = json.load(file)
+
+        return {
+            name: ModelListing.model_validate(listing)
+            for name, listing in data["providers"].items()
+            if name in {provider.value for provider in schemas.ProviderName}
+        }
+
+    except (OSError, KeyError, TypeError, ValueError):
+        return {}
+
+
+def write_listings(path: Path, listings: Dict[str, ModelListing]) -> None:
+    """
+    Write discovered models to cache file. The file is replaced at once, so
+    concurrent readers never see a partial cache.
+
+    Params
+    ------
+    - path (Path): Path to cache file.
+    - listings (Dict[str, ModelListing]): Discovered models by provider name.
+
+    """
+
+    data = {
+        "providers": {name: listing.model_dump() for name, listing in listings.items()}
+    }
+    temporary = path.with_name(f"{path.name}.tmp")
+
+    with open(temporary, "w", encoding="utf-8") as file:
+        json.dump(data, file, indent=2)
+
+    temporary.replace(path)
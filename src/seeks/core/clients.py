@@ -1,16 +1,293 @@
-# {
-#     "id": "chatcmpl-BB08mOzUpnrE5aQNAz0nkUufbNHIk",
-#     "object": "chat.completion.chunk",
-#     "created": 1741961848,
-#     "model": "gpt-4o-2024-08-06",
-#     "service_tier": "default",
-#     "system_fingerprint": "fp_f9f4fb6dbf",
-#     "choices": [
-#         {
-#             "index": 0,
-#             "delta": {"role": "assistant", "content": "", "refusal": None},
-#             "logprobs": None,
-#             "finish_reason": None,
-#         }
-#     ],
-# }
+import asyncio
+from contextlib import asynccontextmanager
+from importlib.util import find_spec
+from typing import Any, AsyncIterator, Dict
+from urllib.parse import urlsplit
+
+import httpx
+
+from seeks.common.config import ClientSettings
+from seeks.core.limits import CircuitBreaker, RateLimiter, backoff, parse_retry_after
+from seeks.core.providers import ProviderError, read_error_message
+
+# Status codes worth retrying: rate limited, overloaded or temporarily
+# unavailable. Anthropic reports overload as 529. Conflicts (409) are caused by
+# the request rather than the provider, so these are neither retried nor
+# counted against the circuit breaker.
+retryable_status_codes = {408, 429, 500, 502, 503, 504, 529}
+
+
+class Clients:
+    """
+    Registry of long-lived HTTP clients. One keep-alive client is kept per
+    provider origin (scheme, host and port), so consecutive requests to the same
+    provider reuse pooled connections instead of paying the TCP connect and TLS
+    handshake on every turn.
+
+    The registry also holds a rate limiter and a circuit breaker per provider,
+    so every request sent through it, whether interactive or batched, draws
+    from the same budget and skips the same failing provider.
+
+    """
+
+    def __init__(self, settings: ClientSettings) -> None:
+        self._settings = settings
+        self._async_clients: Dict[str, httpx.AsyncClient] = {}
+        self._limiters: Dict[str, RateLimiter] = {}
+        self._breakers: Dict[str, CircuitBreaker] = {}
+
+    @property
+    def http2(self) -> bool:
+        """
+        Return whether HTTP/2 is enabled. HTTP/2 requires the optional `h2`
+        package, so the setting is ignored when it is not installed.
+
+        """
+
+        return self._settings.http2 and find_spec("h2") is not None
+
+    def _origin(self, endpoint: str) -> str:
+        """
+        Return origin of endpoint, which is used as key of the registry.
+
+        Params
+        ------
+        - endpoint (str): Provider endpoint.
+
+        Returns
+        -------
+        - str: Origin of endpoint.
+
+        """
+
+        url = urlsplit(endpoint)
+        return f"{url.scheme}://{url.netloc}"
+
+    def _limits(self) -> httpx.Limits:
+        return httpx.Limits(
+            max_connections=self._settings.max_connections,
+            max_keepalive_connections=self._settings.max_keepalive_connections,
+            keepalive_expiry=self._settings.keepalive_expiry,
+        )
+
+    def _timeout(self) -> httpx.Timeout:
+        return httpx.Timeout(
+            self._settings.read_timeout,
+            connect=self._settings.connect_timeout,
+        )
+
+    def get_async(self, endpoint: str) -> httpx.AsyncClient:
+        """
+        Return asynchronous client for endpoint. The client is created on first
+        use and kept open until the registry is closed. The connection pool of an
+        asynchronous client is bound to the event loop it is first used in, so
+        a registry should only serve a single event loop.
+
+        Params
+        ------
+        - endpoint (str): Provider endpoint.
+
+        Returns
+        -------
+        - httpx.AsyncClient: Asynchronous client bound to the origin of the
+          endpoint.
+
+        """
+
+        origin = self._origin(endpoint)
+
+        if origin not in self._async_clients:
+            self._async_clients[origin] = httpx.AsyncClient(
+                base_url=origin,
+                http2=self.http2,
+                limits=self._limits(),
+                timeout=self._timeout(),
+            )
+
+        return self._async_clients[origin]
+
+    def _backoff(self, attempt: int) -> float:
+        return backoff(
+            attempt,
+            self._settings.backoff_base,
+            self._settings.backoff_max,
+        )
+
+    def limiter(self, provider_name: str) -> RateLimiter:
+        """
+        Return rate limiter of provider, created on first use from the
+        configured requests and tokens per minute.
+
+        Params
+        ------
+        - provider_name (str): Provider name.
+
+        Returns
+        -------
+        - RateLimiter: Rate limiter shared by all requests to provider.
+
+        """
+
+        name = provider_name.lower()
+
+        if name not in self._limiters:
+            self._limiters[name] = RateLimiter(
+                requests_per_minute=self._settings.requests_per_minute.get(name),
+                tokens_per_minute=self._settings.tokens_per_minute.get(name),
+            )
+
+        return self._limiters[name]
+
+    def breaker(self, provider_name: str) -> CircuitBreaker:
+        """
+        Return circuit breaker of provider, created on first use.
+
+        Params
+        ------
+        - provider_name (str): Provider name.
+
+        Returns
+        -------
+        - CircuitBreaker: Circuit breaker shared by all requests to provider.
+
+        """
+
+        name = provider_name.lower()
+
+        if name not in self._breakers:
+            self._breakers[name] = CircuitBreaker(
+                failure_threshold=self._settings.breaker_threshold,
+                reset_timeout=self._settings.breaker_reset,
+            )
+
+        return self._breakers[name]
+
+    @asynccontextmanager
+    async def stream(
+        self,
+        provider_name: str,
+        endpoint: str,
+        headers: Dict[str, str],
+        data: Dict[str, Any],
+        tokens: int,
+    ) -> AsyncIterator[httpx.Response]:
+        """
+        Send streaming request to provider and yield the response once it is
+        accepted. Requests wait for the rate limiter of the provider. Connection
+        errors and retryable status codes are retried with exponential backoff
+        and jitter, honouring `retry-after` when the provider sends it. Retries
+        only happen before the response is yielded, so no chunk is ever
+        received twice. Requests are refused at once while the circuit breaker
+        of the provider is open.
+
+        Params
+        ------
+        - provider_name (str): Provider name to select rate limiter.
+        - endpoint (str): Provider endpoint.
+        - headers (Dict[str, str]): Request headers.
+        - data (Dict[str, Any]): Request body.
+        - tokens (int): Estimated number of tokens of request.
+
+        Returns
+        -------
+        - AsyncIterator[httpx.Response]: Accepted response. A ProviderError is
+          raised if the request fails after all retries, with a status code
+          that is not retryable, or while the body is read.
+
+        """
+
+        client = self.get_async(endpoint)
+        limiter = self.limiter(provider_name)
+        breaker = self.breaker(provider_name)
+        max_retries = self._settings.max_retries
+        attempt = 0
+
+        if not breaker.allow():
+            raise ProviderError(f"Skipped {provider_name} after repeated failures")
+
+        while True:
+            await limiter.acquire(tokens)
+            request = client.build_request(
+                "POST",
+                endpoint,
+                headers=headers,
+                json=data,
+            )
+
+            try:
+                response = await client.send(request, stream=True)
+
+            except httpx.TransportError as error:
+                breaker.record_failure()
+
+                if attempt >= max_retries or breaker.is_open:
+                    raise ProviderError(f"Request failed: {error}") from error
+
+                await asyncio.sleep(self._backoff(attempt))
+                attempt += 1
+                continue
+
+            limiter.update(response.headers)
+
+            # Rate limits and client errors do not mean the provider is down
+            if response.status_code in retryable_status_codes - {429}:
+                breaker.record_failure()
+
+            else:
+                breaker.record_success()
+
+            if response.is_success:
+                break
+
+            body = await response.aread()
+            await response.aclose()
+
+            if (
+                response.status_code not in retryable_status_codes
+                or attempt >= max_retries
+                or breaker.is_open
+            ):
+                raise ProviderError(
+                    f"{response.status_code} {read_error_message(body)}",
+                    status_code=response.status_code,
+                )
+
+            delay = parse_retry_after(response.headers)
+
+            if delay is None:
+                delay = self._backoff(attempt)
+
+            # Rate limits apply to the whole provider, so all requests wait
+            if response.status_code == 429:
+                limiter.pause(delay)
+
+            await asyncio.sleep(delay)
+            attempt += 1
+
+        # Errors while the body is read, ie. a dropped connection or an invalid
+        # event, end the stream and count as failure of the provider
+        try:
+            yield response
+
+        except httpx.HTTPError as error:
+            breaker.record_failure()
+            raise ProviderError(f"Stream interrupted: {error}") from error
+
+        except ProviderError:
+            breaker.record_failure()
+            raise
+
+        finally:
+            await response.aclose()
+
+    async def aclose(self) -> None:
+        """
+        Close all asynchronous clients and their connection pools. Must be
+        awaited in the event loop the clients were used in.
+
+        """
+
+        for client in self._async_clients.values():
+            await client.aclose()
+
+        self._async_clients.clear()
@@ -1,15 +1,120 @@
-from typing import List, Optional, Union
-
-from sqlalchemy import func, select
+from typing import (
+    Any,
+    Callable,
+    Dict,
+    Iterator,
+    List,
+    Literal,
+    Optional,
+    Tuple,
+    Type,
+    TypeVar,
+    Union,
+    overload,
+)
+
+from pydantic import BaseModel
+from sqlalchemy import (
+    String,
+    delete,
+    func,
+    insert,
+    literal,
+    select,
+    text,
+    tuple_,
+    type_coerce,
+)
+from sqlalchemy.engine import Row
 from sqlalchemy.exc import IntegrityError
 from sqlalchemy.orm import Session
 
 from seeks.core import models, schemas
+from seeks.core.search import rebuild_search_index, to_match_query
+from seeks.utils.count_tokens import count_tokens
+from seeks.utils.validate_rows import validate_rows
+
+T = TypeVar("T")
+
+
+def columns(model: Type[models.Base], schema: Type[BaseModel]) -> List[Any]:
+    """
+    Return columns of model for the fields of schema, so reads select only
+    what the schema needs as plain rows instead of loading full records.
+
+    Params
+    ------
+    - model (Type[Base]): Model to select from.
+    - schema (Type[BaseModel]): Schema to validate rows into.
+
+    Returns
+    -------
+    - List[Any]: Column(s) in order of the fields of schema.
+
+    """
+
+    return [getattr(model, name) for name in schema.model_fields]
 
 
 class Commands:
     def __init__(self, session: Session) -> None:
         self._session = session
+        self._cache: Dict[Tuple[Any, ...], Any] = {}
+        self._cache_hits = 0
+        self._cache_misses = 0
+
+    @property
+    def cache_stats(self) -> schemas.CacheStats:
+        """
+        Return hit and miss counters of the cache of rarely changing records.
+
+        """
+
+        return schemas.CacheStats(
+            hits=self._cache_hits,
+            misses=self._cache_misses,
+            size=len(self._cache),
+        )
+
+    def _cached(self, key: Tuple[Any, ...], read: Callable[[], T]) -> T:
+        """
+        Return cached response for key or read and cache it. Providers,
+        assistants and settings change only through the methods of this class,
+        which invalidate the affected entries, so their validated responses are
+        kept for the lifetime of the instance.
+
+        Params
+        ------
+        - key (Tuple[Any, ...]): Cache key. First item is the component.
+        - read (Callable[[], T]): Function to read the response on a miss.
+
+        Returns
+        -------
+        - T: Response.
+
+        """
+
+        if key in self._cache:
+            self._cache_hits += 1
+            return self._cache[key]  # type: ignore[no-any-return]
+
+        self._cache_misses += 1
+        value = read()
+        self._cache[key] = value
+        return value
+
+    def _invalidate(self, *components: schemas.Component) -> None:
+        """
+        Drop cached responses of components.
+
+        Params
+        ------
+        - components (Component): Component(s) to invalidate.
+
+        """
+
+        for key in [key for key in self._cache if key[0] in components]:
+            del self._cache[key]
 
     def create_provider(self, provider: schemas.ProviderCreate) -> None:
         """
@@ -21,8 +126,10 @@ class Commands:
 
         """
 
-        provider = models.Provider(**provider.model_dump())
-        self._session.add(provider)
+        self._invalidate(schemas.Component.PROVIDER)
+
+        record = models.Provider(**provider.model_dump())
+        self._session.add(record)
 
         try:
             self._session.commit()
@@ -41,8 +148,10 @@ class Commands:
 
         """
 
-        assistant = models.Assistant(**assistant.model_dump())
-        self._session.add(assistant)
+        self._invalidate(schemas.Component.ASSISTANT)
+
+        record = models.Assistant(**assistant.model_dump())
+        self._session.add(record)
 
         try:
             self._session.commit()
@@ -65,10 +174,10 @@ class Commands:
 
         """
 
-        thread = models.Thread(**thread.model_dump())
-        self._session.add(thread)
+        record = models.Thread(**thread.model_dump())
+        self._session.add(record)
         self._session.commit()
-        return schemas.ThreadResponse.model_validate(thread)
+        return schemas.ThreadResponse.model_validate(record)
 
     def create_message(self, message: schemas.MessageCreate) -> schemas.MessageResponse:
         """
@@ -84,11 +193,33 @@ class Commands:
 
         """
 
-        message = models.Message(**message.model_dump())
-        self._session.add(message)
+        record = models.Message(
+            **message.model_dump(),
+            token_count=count_tokens(message.content),
+        )
+        self._session.add(record)
         self._session.commit()
 
-        return schemas.MessageResponse.model_validate(message)
+        return schemas.MessageResponse.model_validate(record)
+
+    def create_timings(self, timings: List[schemas.TimingCreate]) -> None:
+        """
+        Create timings of the phases of a turn in a single statement.
+
+        Params
+        ------
+        - timings (List[TimingCreate]): Timing(s) to create.
+
+        """
+
+        if not timings:
+            return None
+
+        self._session.execute(
+            insert(models.Timing),
+            [timing.model_dump() for timing in timings],
+        )
+        self._session.commit()
 
     def read_providers(self) -> List[schemas.ProviderResponse]:
         """
@@ -100,8 +231,13 @@ class Commands:
 
         """
 
-        records = self._session.scalars(select(models.Provider)).all()
-        return [schemas.ProviderResponse.model_validate(record) for record in records]
+        def read() -> List[schemas.ProviderResponse]:
+            records = self._session.scalars(select(models.Provider)).all()
+            return [
+                schemas.ProviderResponse.model_validate(record) for record in records
+            ]
+
+        return list(self._cached((schemas.Component.PROVIDER,), read))
 
     def read_provider_by_name(self, provider_name: str) -> schemas.ProviderResponse:
         """
@@ -117,10 +253,13 @@ class Commands:
 
         """
 
-        record = self._session.scalar(
-            select(models.Provider).filter_by(name=provider_name)
-        )
-        return schemas.ProviderResponse.model_validate(record)
+        def read() -> schemas.ProviderResponse:
+            record = self._session.scalar(
+                select(models.Provider).filter_by(name=provider_name)
+            )
+            return schemas.ProviderResponse.model_validate(record)
+
+        return self._cached((schemas.Component.PROVIDER, provider_name), read)
 
     def read_assistants(self) -> List[schemas.AssistantResponse]:
         """
@@ -132,8 +271,13 @@ class Commands:
 
         """
 
-        records = self._session.scalars(select(models.Assistant)).all()
-        return [schemas.AssistantResponse.model_validate(record) for record in records]
+        def read() -> List[schemas.AssistantResponse]:
+            records = self._session.scalars(select(models.Assistant)).all()
+            return [
+                schemas.AssistantResponse.model_validate(record) for record in records
+            ]
+
+        return list(self._cached((schemas.Component.ASSISTANT,), read))
 
     def read_assistant_by_id(self, assistant_id: int) -> schemas.AssistantResponse:
         """
@@ -149,8 +293,47 @@ class Commands:
 
         """
 
-        record = self._session.get(models.Assistant, assistant_id)
-        return schemas.AssistantResponse.model_validate(record)
+        def read() -> schemas.AssistantResponse:
+            record = self._session.get(models.Assistant, assistant_id)
+            return schemas.AssistantResponse.model_validate(record)
+
+        return self._cached((schemas.Component.ASSISTANT, assistant_id), read)
+
+    def read_thread_by_id(self, thread_id: int) -> Union[schemas.ThreadResponse, None]:
+        """
+        Return thread by id.
+
+        Params
+        ------
+        - thread_id (int): Thread id.
+
+        Returns
+        -------
+        - Union[ThreadResponse, None]: Thread or None if it does not exist.
+
+        """
+
+        record = self._session.get(models.Thread, thread_id)
+
+        if record is None:
+            return None
+
+        return schemas.ThreadResponse.model_validate(record)
+
+    @overload
+    def read_threads(
+        self,
+        assistant_id: Optional[int] = None,
+        verbose: Literal[False] = False,
+    ) -> List[schemas.ThreadResponse]: ...
+
+    @overload
+    def read_threads(
+        self,
+        assistant_id: Optional[int] = None,
+        *,
+        verbose: Literal[True],
+    ) -> List[schemas.ThreadVerboseResponse]: ...
 
     def read_threads(
         self,
@@ -175,20 +358,90 @@ class Commands:
         """
 
         if assistant_id:
-            records = self._session.scalars(
-                select(models.Thread).filter_by(assistant_id=assistant_id)
-            ).all()
-            return [schemas.ThreadResponse.model_validate(record) for record in records]
-
-        records = self._session.scalars(select(models.Thread)).all()
+            rows = self._session.execute(
+                select(*columns(models.Thread, schemas.ThreadResponse)).filter_by(
+                    assistant_id=assistant_id
+                )
+            )
+            return validate_rows(schemas.ThreadResponse, rows)
 
         if verbose:
-            return [
-                schemas.ThreadVerboseResponse.model_validate(record)
-                for record in records
-            ]
+            # The assistant name is joined in, instead of loading the assistant
+            # once per thread when `assistant_name` is accessed
+            rows = self._session.execute(
+                select(
+                    models.Thread.id,
+                    models.Assistant.name.label("assistant_name"),
+                    models.Thread.subject,
+                    models.Thread.updated_at,
+                ).join(
+                    models.Assistant,
+                    models.Assistant.id == models.Thread.assistant_id,
+                )
+            )
+            return validate_rows(schemas.ThreadVerboseResponse, rows)
+
+        rows = self._session.execute(
+            select(*columns(models.Thread, schemas.ThreadResponse))
+        )
+        return validate_rows(schemas.ThreadResponse, rows)
+
+    def read_threads_page(
+        self,
+        cursor: Optional[str] = None,
+        limit: int = 50,
+    ) -> schemas.ThreadPage:
+        """
+        Return page of threads, most recently active first, with the name of
+        their assistant joined in. Pages are addressed by the last activity and
+        id of the last thread of the previous page, so every page is a single
+        range scan on the `(updated_at, id)` index regardless of the number of
+        threads.
+
+        Params
+        ------
+        - cursor (Optional[str]): Cursor returned by previous page, or None to
+          start at the most recently active thread.
+        - limit (int): Limit of threads to return.
+
+        Returns
+        -------
+        - ThreadPage: Thread(s) and the cursor of the next page, which is None
+          when there are no more threads.
+
+        """
+
+        # Timestamps are compared as stored, as SQLite compares them as text
+        # and a parsed and formatted timestamp may not match the stored one
+        updated_at = type_coerce(models.Thread.updated_at, String)
+        statement = select(
+            models.Thread.id,
+            models.Assistant.name.label("assistant_name"),
+            models.Thread.subject,
+            models.Thread.updated_at,
+            updated_at.label("position"),
+        ).join(models.Assistant, models.Assistant.id == models.Thread.assistant_id)
+
+        if cursor is not None:
+            position, _, thread_id = cursor.rpartition("|")
+            statement = statement.where(
+                tuple_(updated_at, models.Thread.id)
+                < tuple_(literal(position, String), int(thread_id))
+            )
+
+        # Fetch one extra row to find out whether there is a next page
+        rows = self._session.execute(
+            statement.order_by(
+                models.Thread.updated_at.desc(),
+                models.Thread.id.desc(),
+            ).limit(limit + 1)
+        ).all()
+        rows, remainder = rows[:limit], rows[limit:]
 
-        return [schemas.ThreadResponse.model_validate(record) for record in records]
+        return schemas.ThreadPage(
+            threads=validate_rows(schemas.ThreadVerboseResponse, rows),
+            cursor=f"{rows[-1].position}|{rows[-1].id}" if remainder else None,
+        )
 
     def read_messages(
         self,
@@ -196,7 +449,7 @@ class Commands:
         limit: int = 10,
     ) -> List[schemas.MessageResponse]:
         """
-        Return all messages filtered by thread id.
+        Return last messages filtered by thread id, in chronological order.
 
         Params
         ------
@@ -209,43 +462,510 @@ class Commands:
 
         """
 
-        record_count = (
-            self._session.query(func.count(models.Message.id))
-            .filter_by(thread_id=thread_id)
-            .scalar()
-        )
-        records = self._session.scalars(
-            select(models.Message)
+        rows = self._session.execute(
+            select(*columns(models.Message, schemas.MessageResponse))
             .filter_by(thread_id=thread_id)
-            .offset(record_count - limit)
+            .order_by(models.Message.id.desc())
             .limit(limit)
         ).all()
 
-        return [schemas.MessageResponse.model_validate(record) for record in records]
+        return validate_rows(schemas.MessageResponse, reversed(rows))
+
+    def read_messages_page(
+        self,
+        thread_id: int,
+        cursor: Optional[int] = None,
+        limit: int = 50,
+    ) -> schemas.MessagePage:
+        """
+        Return page of messages filtered by thread id, walking the thread from
+        newest to oldest. Pages are addressed by the id of the oldest message of
+        the previous page, so every page is a single range scan on the
+        `(thread_id, id)` index regardless of thread length.
+
+        Params
+        ------
+        - thread_id (int): Thread id.
+        - cursor (Optional[int]): Cursor returned by previous page, or None to
+          start at the newest message.
+        - limit (int): Limit of messages to return.
+
+        Returns
+        -------
+        - MessagePage: Message(s) in chronological order and the cursor of the
+          next (older) page, which is None when there are no more messages.
+
+        """
+
+        statement = select(*columns(models.Message, schemas.MessageResponse)).filter_by(
+            thread_id=thread_id
+        )
+
+        if cursor is not None:
+            statement = statement.where(models.Message.id < cursor)
+
+        # Fetch one extra row to find out whether there is a next page
+        rows = self._session.execute(
+            statement.order_by(models.Message.id.desc()).limit(limit + 1)
+        ).all()
+        rows, remainder = rows[:limit], rows[limit:]
+
+        return schemas.MessagePage(
+            messages=validate_rows(schemas.MessageResponse, reversed(rows)),
+            cursor=rows[-1].id if remainder else None,
+        )
+
+    def read_context(
+        self,
+        thread_id: int,
+        budget: int,
+    ) -> List[schemas.MessageResponse]:
+        """
+        Return last messages filtered by thread id that fit within the token
+        budget, in chronological order. Messages are read newest first using
+        the token count stored with each message, so building the context never
+        tokenizes the history again. The newest message is always included.
+
+        If the thread has been compacted, only messages after the summary are
+        considered and the summary is prepended as system message.
+
+        Params
+        ------
+        - thread_id (int): Thread id.
+        - budget (int): Token budget.
+
+        Returns
+        -------
+        - List[MessageResponse]: Message(s).
+
+        """
+
+        thread = self.read_thread_summary(thread_id)
+        statement = select(*columns(models.Message, schemas.MessageResponse)).filter_by(
+            thread_id=thread_id
+        )
+
+        if thread.summary_until_id is not None:
+            statement = statement.where(models.Message.id > thread.summary_until_id)
+            budget -= thread.summary_token_count
+
+        # Approximate tokens added by the provider per message for its role and
+        # separators
+        overhead = 4
+        rows: List[Row[Any]] = []
+        total = 0
+
+        result = self._session.execute(
+            statement.order_by(models.Message.id.desc()).execution_options(yield_per=50)
+        )
+
+        for row in result:
+            total += row.token_count + overhead
+
+            if rows and total > budget:
+                break
+
+            rows.append(row)
+
+        result.close()
+
+        # Context should open with a user turn, as some providers reject
+        # conversations starting with an assistant message
+        while len(rows) > 1 and rows[-1].role == schemas.Role.ASSISTANT:
+            rows.pop()
+
+        messages = validate_rows(schemas.MessageResponse, reversed(rows))
+
+        if thread.summary:
+            messages.insert(
+                0,
+                schemas.MessageResponse(
+                    id=0,
+                    thread_id=thread_id,
+                    role=schemas.Role.SYSTEM,
+                    content=f"Summary of the earlier conversation:\n\n{thread.summary}",
+                    token_count=thread.summary_token_count,
+                ),
+            )
+
+        return messages
+
+    def read_messages_after(
+        self,
+        thread_id: int,
+        after_id: Optional[int],
+        budget: int,
+    ) -> List[schemas.MessageResponse]:
+        """
+        Return oldest messages filtered by thread id following the passed
+        message id, in chronological order, until the token budget is spent.
+        The first message is always included.
+
+        Params
+        ------
+        - thread_id (int): Thread id.
+        - after_id (Optional[int]): Message id to start after, or None to start
+          at the first message.
+        - budget (int): Token budget.
+
+        Returns
+        -------
+        - List[MessageResponse]: Message(s).
+
+        """
+
+        statement = select(*columns(models.Message, schemas.MessageResponse)).filter_by(
+            thread_id=thread_id
+        )
+
+        if after_id is not None:
+            statement = statement.where(models.Message.id > after_id)
+
+        rows: List[Row[Any]] = []
+        total = 0
+
+        result = self._session.execute(
+            statement.order_by(models.Message.id).execution_options(yield_per=50)
+        )
+
+        for row in result:
+            total += row.token_count
+
+            if rows and total > budget:
+                break
+
+            rows.append(row)
+
+        result.close()
+
+        return validate_rows(schemas.MessageResponse, rows)
+
+    def _export_filter(
+        self,
+        thread_id: Optional[int],
+        assistant_id: Optional[int],
+    ) -> List[Any]:
+        if thread_id is not None:
+            return [models.Message.thread_id == thread_id]
+
+        if assistant_id is not None:
+            return [models.Thread.assistant_id == assistant_id]
+
+        return []
+
+    def count_export_messages(
+        self,
+        thread_id: Optional[int] = None,
+        assistant_id: Optional[int] = None,
+    ) -> int:
+        """
+        Return number of messages to export, to report progress against.
+
+        Params
+        ------
+        - thread_id (Optional[int]): Thread id to export.
+        - assistant_id (Optional[int]): Assistant id to export the threads of.
+
+        Returns
+        -------
+        - int: Number of messages.
+
+        """
+
+        count = self._session.scalar(
+            select(func.count(models.Message.id))
+            .join(models.Thread, models.Thread.id == models.Message.thread_id)
+            .where(*self._export_filter(thread_id, assistant_id))
+        )
+        return count or 0
+
+    def export_messages(
+        self,
+        thread_id: Optional[int] = None,
+        assistant_id: Optional[int] = None,
+        batch_size: int = 1000,
+    ) -> Iterator[schemas.ExportMessage]:
+        """
+        Stream messages of a thread, of the threads of an assistant or of all
+        threads, ordered by thread and message. Plain columns are selected
+        instead of models and fetched in batches, so rows are never held by the
+        session and memory use does not grow with the size of the history.
+
+        Params
+        ------
+        - thread_id (Optional[int]): Thread id to export.
+        - assistant_id (Optional[int]): Assistant id to export the threads of.
+        - batch_size (int): Number of rows fetched at once.
+
+        Returns
+        -------
+        - Iterator[ExportMessage]: Message(s) in order of thread and message.
+
+        """
+
+        statement = (
+            select(
+                models.Message.thread_id,
+                models.Thread.subject,
+                models.Assistant.name.label("assistant_name"),
+                models.Message.id.label("message_id"),
+                models.Message.role,
+                models.Message.content,
+                models.Message.partial,
+                models.Message.created_at,
+            )
+            .join(models.Thread, models.Thread.id == models.Message.thread_id)
+            .join(models.Assistant, models.Assistant.id == models.Thread.assistant_id)
+            .where(*self._export_filter(thread_id, assistant_id))
+            .order_by(models.Message.thread_id, models.Message.id)
+            .execution_options(yield_per=batch_size)
+        )
+
+        # Rows are validated a batch at a time
+        for rows in self._session.execute(statement).partitions():
+            yield from validate_rows(schemas.ExportMessage, rows)
+
+    def read_thread_summary(self, thread_id: int) -> schemas.ThreadSummaryResponse:
+        """
+        Return summary of thread by id.
+
+        Params
+        ------
+        - thread_id (int): Thread id.
+
+        Returns
+        -------
+        - ThreadSummaryResponse: Thread summary.
+
+        """
+
+        record = self._session.get(models.Thread, thread_id)
+        return schemas.ThreadSummaryResponse.model_validate(record)
+
+    def read_thread_token_count(
+        self,
+        thread_id: int,
+        after_id: Optional[int] = None,
+    ) -> int:
+        """
+        Return total of stored token counts of messages filtered by thread id.
+
+        Params
+        ------
+        - thread_id (int): Thread id.
+        - after_id (Optional[int]): Only count messages following this message
+          id.
+
+        Returns
+        -------
+        - int: Token count.
+
+        """
+
+        statement = select(func.coalesce(func.sum(models.Message.token_count), 0))
+        statement = statement.where(models.Message.thread_id == thread_id)
+
+        if after_id is not None:
+            statement = statement.where(models.Message.id > after_id)
+
+        return self._session.scalar(statement) or 0
+
+    @overload
+    def read_settings(
+        self,
+        verbose: Literal[False] = False,
+    ) -> Union[schemas.SettingsResponse, None]: ...
+
+    @overload
+    def read_settings(
+        self,
+        verbose: Literal[True],
+    ) -> Union[schemas.SettingsVerboseResponse, None]: ...
 
     def read_settings(
         self,
         verbose: Optional[bool] = False,
-    ) -> Union[schemas.SettingsResponse, None]:
+    ) -> Union[schemas.SettingsResponse, schemas.SettingsVerboseResponse, None]:
         """
         Return all settings. Return only the first record as it should be
         unique, due its constraints set in the database.
 
         Returns
         -------
-        - SettingsResponse: Settings.
+        - Union[SettingsResponse, SettingsVerboseResponse, None]: Settings.
 
         """
 
-        record = self._session.scalar(select(models.Settings))
+        def read() -> (
+            Union[schemas.SettingsResponse, schemas.SettingsVerboseResponse, None]
+        ):
+            record = self._session.scalar(select(models.Settings))
 
-        if not record:
-            return None
+            if not record:
+                return None
 
-        if verbose:
-            return schemas.SettingsVerboseResponse.model_validate(record)
+            if verbose:
+                return schemas.SettingsVerboseResponse.model_validate(record)
+
+            return schemas.SettingsResponse.model_validate(record)
+
+        return self._cached((schemas.Component.SETTINGS, bool(verbose)), read)
 
-        return schemas.SettingsResponse.model_validate(record)
+    def search_messages(
+        self,
+        query: str,
+        limit: int = 20,
+    ) -> List[schemas.SearchResult]:
+        """
+        Return messages matching the search query, ranked by relevance (bm25)
+        with matches in the content weighing more than matches in the thread
+        subject.
+
+        Params
+        ------
+        - query (str): Search query.
+        - limit (int): Limit of results to return.
+
+        Returns
+        -------
+        - List[SearchResult]: Search result(s) with highlighted snippet.
+
+        """
+
+        match = to_match_query(query)
+
+        if not match:
+            return []
+
+        rows = self._session.execute(
+            text(
+                """
+                SELECT
+                    message.id AS message_id,
+                    message.thread_id AS thread_id,
+                    thread.subject AS subject,
+                    message.role AS role,
+                    snippet(message_search, 0, :start, :end, '...', 12) AS snippet
+                FROM message_search
+                JOIN message ON message.id = message_search.rowid
+                JOIN thread ON thread.id = message.thread_id
+                WHERE message_search MATCH :match
+                ORDER BY bm25(message_search, 1.0, 0.5)
+                LIMIT :limit
+                """
+            ),
+            {
+                "start": "\033[1m",
+                "end": "\033[0m",
+                "match": match,
+                "limit": limit,
+            },
+        ).mappings()
+
+        return [
+            schemas.SearchResult(
+                **{
+                    **row,
+                    "role": schemas.Role[row["role"]],
+                    "snippet": " ".join(row["snippet"].split()),
+                }
+            )
+            for row in rows
+        ]
+
+    def rebuild_search_index(self) -> None:
+        """
+        Rebuild full-text search index of messages, ie. for messages stored
+        before the index existed.
+
+        """
+
+        rebuild_search_index(self._session.connection())
+        self._session.commit()
+
+    def read_pragmas(self, names: List[str]) -> List[schemas.PragmaResponse]:
+        """
+        Return values of SQLite pragmas in effect for the connection of the
+        session.
+
+        Params
+        ------
+        - names (List[str]): Pragma names.
+
+        Returns
+        -------
+        - List[PragmaResponse]: Pragma(s).
+
+        """
+
+        return [
+            schemas.PragmaResponse(
+                name=name,
+                value=str(self._session.execute(text(f"PRAGMA {name}")).scalar()),
+            )
+            for name in names
+        ]
+
+    def read_timing_stats(
+        self,
+        model_name: Optional[str] = None,
+    ) -> List[schemas.TimingStats]:
+        """
+        Return percentiles of the durations of turn phases per model. SQLite
+        has no percentile function, so durations are ranked per model and
+        phase with window functions and each percentile is the smallest
+        duration ranked at or above it.
+
+        Params
+        ------
+        - model_name (Optional[str]): Model name to filter on.
+
+        Returns
+        -------
+        - List[TimingStats]: Statistic(s) per model and phase.
+
+        """
+
+        rows = self._session.execute(
+            text(
+                """
+                WITH ranked AS (
+                    SELECT
+                        model_name,
+                        phase,
+                        duration,
+                        row_number() OVER (
+                            PARTITION BY model_name, phase ORDER BY duration
+                        ) AS position,
+                        count(*) OVER (PARTITION BY model_name, phase) AS total
+                    FROM timing
+                    WHERE :model_name IS NULL OR model_name = :model_name
+                )
+                SELECT
+                    model_name,
+                    phase,
+                    max(total) AS count,
+                    min(CASE WHEN position >= 0.50 * total THEN duration END) AS p50,
+                    min(CASE WHEN position >= 0.95 * total THEN duration END) AS p95,
+                    min(CASE WHEN position >= 0.99 * total THEN duration END) AS p99
+                FROM ranked
+                GROUP BY model_name, phase
+                """
+            ),
+            {"model_name": model_name},
+        ).mappings()
+
+        return [
+            schemas.TimingStats(
+                model_name=row["model_name"],
+                phase=row["phase"],
+                count=row["count"],
+                p50_ms=round(row["p50"] * 1000, 1),
+                p95_ms=round(row["p95"] * 1000, 1),
+                p99_ms=round(row["p99"] * 1000, 1),
+            )
+            for row in rows
+        ]
 
     def update_provider(self, provider: schemas.ProviderResponse) -> None:
         """
@@ -259,6 +979,8 @@ class Commands:
 
         """
 
+        self._invalidate(schemas.Component.PROVIDER)
+
         record = self._session.get(models.Provider, provider.id)
 
         if not record:
@@ -267,16 +989,18 @@ class Commands:
         record.api_key = provider.api_key
         self._session.commit()
 
-    def update_assistant(self, assistant: schemas.ProviderResponse) -> None:
+    def update_assistant(self, assistant: schemas.AssistantResponse) -> None:
         """
         Update assistant by id within passed payload.
 
         Params
         ------
-        - assistant (schemas.AssistantUpdate): Assistant to update.
+        - assistant (schemas.AssistantResponse): Assistant to update.
 
         """
 
+        self._invalidate(schemas.Component.ASSISTANT, schemas.Component.SETTINGS)
+
         record = self._session.get(models.Assistant, assistant.id)
 
         if not record:
@@ -284,7 +1008,61 @@ class Commands:
 
         record.name = assistant.name
         record.description = assistant.description
-        record.model_name = assistant.model
+        record.model_name = assistant.model_name
+        record.fallback_model_names = assistant.fallback_model_names
+        self._session.commit()
+
+    def update_message(self, message_id: int, content: str, partial: bool) -> None:
+        """
+        Update content of message by id. Used to complete a message that is
+        stored while it is still being streamed.
+
+        Params
+        ------
+        - message_id (int): Message id.
+        - content (str): Message content.
+        - partial (bool): Whether the message is still incomplete.
+
+        """
+
+        record = self._session.get(models.Message, message_id)
+
+        if not record:
+            return None
+
+        record.content = content
+        record.partial = partial
+        record.token_count = count_tokens(content)
+        self._session.commit()
+
+    def update_thread_summary(
+        self,
+        thread_id: int,
+        summary: str,
+        summary_until_id: int,
+    ) -> None:
+        """
+        Update summary of thread by id. Summarized messages are kept in the
+        database, the summary only replaces them in the context sent to the
+        provider.
+
+        Params
+        ------
+        - thread_id (int): Thread id.
+        - summary (str): Summary of messages up to and including
+          `summary_until_id`.
+        - summary_until_id (int): Id of last summarized message.
+
+        """
+
+        record = self._session.get(models.Thread, thread_id)
+
+        if not record:
+            return None
+
+        record.summary = summary
+        record.summary_until_id = summary_until_id
+        record.summary_token_count = count_tokens(summary)
         self._session.commit()
 
     def update_settings(
@@ -302,6 +1080,8 @@ class Commands:
 
         """
 
+        self._invalidate(schemas.Component.SETTINGS)
+
         record = self._session.scalar(select(models.Settings))
 
         if not record:
@@ -326,6 +1106,8 @@ class Commands:
 
         """
 
+        self._invalidate(schemas.Component.PROVIDER)
+
         record = self._session.get(models.Provider, provider_id)
         self._session.delete(record)
         self._session.commit()
@@ -340,6 +1122,8 @@ class Commands:
 
         """
 
+        self._invalidate(schemas.Component.ASSISTANT, schemas.Component.SETTINGS)
+
         record = self._session.get(models.Assistant, assistant_id)
         self._session.delete(record)
         self._session.commit()
@@ -354,6 +1138,8 @@ class Commands:
 
         """
 
+        self._invalidate(schemas.Component.SETTINGS)
+
         record = self._session.get(models.Thread, thread_id)
         self._session.delete(record)
         self._session.commit()
@@ -364,6 +1150,8 @@ class Commands:
 
         """
 
+        self._invalidate(schemas.Component.SETTINGS)
+
         record = self._session.scalar(select(models.Settings))
 
         if not record:
@@ -371,3 +1159,22 @@ class Commands:
 
         record.thread_id = None
         self._session.commit()
+
+    def delete_timings(self, retention_days: int) -> None:
+        """
+        Delete timings older than the retention period, so timings form a
+        rolling window instead of growing with the history.
+
+        Params
+        ------
+        - retention_days (int): Number of days to keep timings.
+
+        """
+
+        self._session.execute(
+            delete(models.Timing).where(
+                models.Timing.created_at
+                < func.datetime("now", f"-{retention_days} days")
+            )
+        )
+        self._session.commit()
@@ -0,0 +1,137 @@
+from seeks.common.config import CompactionSettings
+from seeks.core import schemas
+from seeks.core.catalog import ProviderProfile
+from seeks.core.commands import Commands
+from seeks.core.engine import Bridge, Engine
+from seeks.core.providers import get_adapter
+
+INSTRUCTION = (
+    "You maintain a running summary of a conversation between a user and an "
+    "assistant. Update the existing summary with the new messages. Keep facts, "
+    "decisions, open questions, names, numbers and code identifiers. Reply with "
+    "the updated summary only."
+)
+
+
+class Compactor:
+    """
+    Fold older messages of long threads into a rolling summary. Compaction is
+    incremental: each run only summarizes the messages following the previous
+    summary, together with that summary, so the work per run is bounded by the
+    threshold instead of growing with the thread.
+
+    """
+
+    def __init__(
+        self,
+        bridge: Bridge,
+        commands: Commands,
+        engine: Engine,
+        settings: CompactionSettings,
+    ) -> None:
+        self._bridge = bridge
+        self._commands = commands
+        self._engine = engine
+        self._settings = settings
+
+    def compact(
+        self,
+        thread_id: int,
+        provider: schemas.ProviderResponse,
+        provider_profile: ProviderProfile,
+        assistant: schemas.AssistantResponse,
+    ) -> bool:
+        """
+        Compact thread if the stored token total of its unsummarized messages
+        exceeds the threshold. The most recent messages worth `keep_tokens` are
+        left out of the summary, as these are sent verbatim.
+
+        Params
+        ------
+        - thread_id (int): Thread id.
+        - provider (ProviderResponse): Provider to request summary from.
+        - provider_profile (ProviderProfile): Profile of provider.
+        - assistant (AssistantResponse): Assistant whose model summarizes.
+
+        Returns
+        -------
+        - bool: Whether the thread was compacted. A ProviderError is raised if
+          the summary request fails, ie. breaks off while streaming, in which
+          case the thread is left as is.
+
+        """
+
+        if not self._settings.enabled:
+            return False
+
+        thread = self._commands.read_thread_summary(thread_id)
+        total = self._commands.read_thread_token_count(
+            thread_id,
+            after_id=thread.summary_until_id,
+        )
+
+        budget = min(total - self._settings.keep_tokens, self._settings.threshold)
+
+        if total <= self._settings.threshold or budget <= 0:
+            return False
+
+        messages = self._commands.read_messages_after(
+            thread_id,
+            after_id=thread.summary_until_id,
+            budget=budget,
+        )
+
+        # Summary should end on an assistant turn, as the context following it
+        # drops a leading assistant reply, which would then be lost to both
+        while messages and messages[-1].role == schemas.Role.USER:
+            messages.pop()
+
+        if not messages:
+            return False
+
+        transcript = "\n\n".join(
+            f"{message.role.value.capitalize()}: {message.content}"
+            for message in messages
+        )
+        content = "Existing summary:\n\n{}\n\nNew messages:\n\n{}".format(
+            thread.summary or "(none)",
+            transcript,
+        )
+
+        headers, data = get_adapter(provider.name).build_payload(
+            provider=provider,
+            assistant=assistant,
+            messages=[
+                schemas.MessageResponse(
+                    id=0,
+                    thread_id=thread_id,
+                    role=schemas.Role.SYSTEM,
+                    content=INSTRUCTION,
+                ),
+                schemas.MessageResponse(
+                    id=0,
+                    thread_id=thread_id,
+                    role=schemas.Role.USER,
+                    content=content,
+                ),
+            ],
+        )
+        summary = self._bridge.run(
+            self._engine.complete(
+                provider_name=provider.name,
+                endpoint=provider_profile.endpoint,
+                headers=headers,
+                data=data,
+            )
+        )
+
+        if not summary:
+            return False
+
+        self._commands.update_thread_summary(
+            thread_id,
+            summary=summary,
+            summary_until_id=messages[-1].id,
+        )
+
+        return True
@@ -0,0 +1,162 @@
+import asyncio
+from dataclasses import dataclass, field
+from time import perf_counter
+from typing import AsyncIterator, Dict, List, Optional, Tuple, TypeVar
+
+from seeks.core import schemas
+from seeks.core.engine import Engine
+from seeks.core.failover import Route
+from seeks.core.providers import Chunk, ProviderError, TextChunk, UsageChunk
+from seeks.core.spans import Spans
+from seeks.utils.count_tokens import count_tokens
+
+T = TypeVar("T")
+
+
+@dataclass(slots=True)
+class Contender:
+    """
+    Reply of a single assistant in a comparison, with the measurements taken
+    while it streamed.
+
+    """
+
+    assistant_name: str
+    thread_id: int
+    route: Route
+    spans: Spans = field(default_factory=Spans)
+    parts: List[str] = field(default_factory=list)
+    output_tokens: int = 0
+    error: Optional[ProviderError] = None
+    started_at: float = 0.0
+    first_token_at: Optional[float] = None
+    finished_at: float = 0.0
+
+    @property
+    def text(self) -> str:
+        return "".join(self.parts)
+
+    async def stream(self, engine: Engine) -> AsyncIterator[Chunk]:
+        """
+        Stream reply from engine. A failing request ends the stream and is kept
+        as error, so it does not affect the other contenders.
+
+        Params
+        ------
+        - engine (Engine): Engine to stream with.
+
+        Returns
+        -------
+        - AsyncIterator[Chunk]: Chunk(s) in order of arrival.
+
+        """
+
+        self.spans = Spans()
+        self.started_at = perf_counter()
+
+        try:
+            async for chunk in engine.stream(
+                provider_name=self.route.provider_name,
+                endpoint=self.route.endpoint,
+                headers=self.route.headers,
+                data=self.route.data,
+                spans=self.spans,
+            ):
+                if isinstance(chunk, TextChunk):
+                    if self.first_token_at is None:
+                        self.first_token_at = perf_counter()
+
+                    self.parts.append(chunk.text)
+
+                # Anthropic reports the running total, OpenAI the final count
+                if isinstance(chunk, UsageChunk):
+                    self.output_tokens = max(self.output_tokens, chunk.output_tokens)
+
+                yield chunk
+
+        except ProviderError as error:
+            self.error = error
+
+        finally:
+            self.finished_at = perf_counter()
+            self.spans.finish()
+
+    def result(self) -> schemas.CompareResult:
+        """
+        Return measurements of reply. Tokens are estimated from the text when
+        the provider did not report usage.
+
+        Returns
+        -------
+        - CompareResult: Time to first token, total time and throughput.
+
+        """
+
+        tokens = self.output_tokens or count_tokens(self.text)
+        ttft = None
+        tokens_per_second = None
+
+        if self.first_token_at is not None:
+            ttft = round((self.first_token_at - self.started_at) * 1000, 1)
+            duration = self.finished_at - self.first_token_at
+
+            if duration > 0:
+                tokens_per_second = round(tokens / duration, 1)
+
+        return schemas.CompareResult(
+            assistant_name=self.assistant_name,
+            model_name=self.route.model_name,
+            ttft_ms=ttft,
+            total_ms=round((self.finished_at - self.started_at) * 1000, 1),
+            tokens=tokens,
+            tokens_per_second=tokens_per_second,
+            error=str(self.error) if self.error is not None else None,
+        )
+
+
+async def merge(iterators: List[AsyncIterator[T]]) -> AsyncIterator[Tuple[int, T]]:
+    """
+    Merge async iterators into one, passing on items as soon as any of them
+    produces one. Once the merged iterator ends, fails or is closed, the
+    pending iterators are cancelled and closed, releasing their requests.
+
+    Params
+    ------
+    - iterators (List[AsyncIterator[T]]): Iterator(s) to merge.
+
+    Returns
+    -------
+    - AsyncIterator[Tuple[int, T]]: (index of iterator, item) in order of
+      arrival.
+
+    """
+
+    pending: Dict[asyncio.Future[T], int] = {
+        asyncio.ensure_future(iterator.__anext__()): index
+        for index, iterator in enumerate(iterators)
+    }
+
+    try:
+        while pending:
+            done, _ = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+
+            for task in done:
+                index = pending.pop(task)
+
+                try:
+                    item = task.result()
+
+                except StopAsyncIteration:
+                    continue
+
+                pending[asyncio.ensure_future(iterators[index].__anext__())] = index
+                yield index, item
+
+    finally:
+        for task in pending:
+            task.cancel()
+
+        await asyncio.gather(*pending, return_exceptions=True)
+
+        for iterator in iterators:
+            await iterator.aclose()  # type: ignore[attr-defined]
@@ -1,13 +1,77 @@
-from typing import Generator
+from pathlib import Path
+from typing import Any, Dict, Generator, Union
 
-from sqlalchemy import create_engine
+from sqlalchemy import Engine, create_engine, event
 from sqlalchemy.orm import Session, sessionmaker
 
+from seeks.utils.get_env import get_env
 from seeks.utils.get_home_dir import get_home_dir
+from seeks.utils.print import print_alert
+
+# Pragmas applied on every new connection, by profile. The performance profile
+# trades durability of the last transactions on power loss for commits without
+# an fsync each, the durable profile syncs every commit to disk.
+profiles: Dict[str, Dict[str, Union[str, int]]] = {
+    "performance": {
+        "journal_mode": "WAL",
+        "synchronous": "NORMAL",
+        "mmap_size": 268435456,
+        "cache_size": -65536,
+        "temp_store": "MEMORY",
+        "busy_timeout": 5000,
+    },
+    "durable": {
+        "journal_mode": "WAL",
+        "synchronous": "FULL",
+        "busy_timeout": 5000,
+    },
+}
+
+profile = get_env("SEEKS_DATABASE_PROFILE", "performance", str)
+
+# Unknown profiles fall back on the default like other settings, as raising
+# here would end every entry point with a traceback on import
+if profile not in profiles:
+    print_alert(
+        f"Unknown database profile {profile}, choose from {', '.join(profiles)}; "
+        "using performance",
+        "warning",
+        clear=False,
+    )
+    profile = "performance"
+
+
+def apply_pragmas(connection: Any, _: Any) -> None:
+    cursor = connection.cursor()
+
+    for name, value in profiles[profile].items():
+        cursor.execute(f"PRAGMA {name}={value}")
+
+    cursor.close()
+
+
+def create_database_engine(database_file: Path) -> Engine:
+    """
+    Create engine for SQLite database file, applying the pragmas of the
+    configured profile on every new connection.
+
+    Params
+    ------
+    - database_file (Path): Path to database file.
+
+    Returns
+    -------
+    - Engine: Database engine.
+
+    """
+
+    database_engine = create_engine(f"sqlite:///{database_file}", echo=False)
+    event.listen(database_engine, "connect", apply_pragmas)
+    return database_engine
+
 
 # Create a database file in the user's home directory
-database_file = get_home_dir() / "database.db"
-engine = create_engine(f"sqlite:///{database_file}", echo=False)
+engine = create_database_engine(get_home_dir() / "database.db")
 
 # Create a session factory
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
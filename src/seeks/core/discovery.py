@@ -0,0 +1,114 @@
+import asyncio
+from time import time
+from typing import Dict, List, Tuple, Union
+
+import httpx
+
+from seeks.core import schemas
+from seeks.core.catalog import ModelListing, ProviderProfile
+from seeks.core.clients import Clients
+from seeks.core.providers import ProviderError, get_adapter, read_error_message
+
+
+async def fetch_models(
+    clients: Clients,
+    provider_profile: ProviderProfile,
+    provider: schemas.ProviderResponse,
+) -> List[str]:
+    """
+    Fetch names of the chat models listed by provider.
+
+    Params
+    ------
+    - clients (Clients): Registry of HTTP clients.
+    - provider_profile (ProviderProfile): Profile holding the models endpoint.
+    - provider (ProviderResponse): Provider holding the API key.
+
+    Returns
+    -------
+    - List[str]: Model name(s).
+
+    """
+
+    if provider_profile.models_endpoint is None:
+        raise ProviderError("No models endpoint configured")
+
+    adapter = get_adapter(provider_profile.name)
+    endpoint = provider_profile.models_endpoint
+    client = clients.get_async(endpoint)
+    limiter = clients.limiter(provider_profile.name.value)
+    headers = adapter.build_headers(provider)
+    params: Dict[str, Union[str, int]] = {"limit": 1000}
+    models: List[str] = []
+
+    while True:
+        await limiter.acquire(0)
+
+        try:
+            response = await client.get(endpoint, headers=headers, params=params)
+
+        except httpx.TransportError as error:
+            raise ProviderError(f"Request failed: {error}") from error
+
+        if not response.is_success:
+            raise ProviderError(
+                f"{response.status_code} {read_error_message(response.content)}",
+                status_code=response.status_code,
+            )
+
+        data = response.json()
+        models += [item["id"] for item in data["data"]]
+
+        # Anthropic pages the listing, OpenAI returns all models at once
+        if not data.get("has_more") or not data.get("last_id"):
+            break
+
+        params = {"limit": 1000, "after_id": data["last_id"]}
+
+    return adapter.filter_models(models)
+
+
+async def discover_models(
+    clients: Clients,
+    targets: List[Tuple[ProviderProfile, schemas.ProviderResponse]],
+) -> Dict[str, Union[ModelListing, ProviderError]]:
+    """
+    Fetch model listings of providers concurrently. A failing provider does
+    not affect the others, its error is returned in place of its listing.
+
+    Params
+    ------
+    - clients (Clients): Registry of HTTP clients.
+    - targets (List[Tuple[ProviderProfile, ProviderResponse]]): Profile and
+      provider pairs to fetch.
+
+    Returns
+    -------
+    - Dict[str, Union[ModelListing, ProviderError]]: Listing or error by
+      provider name.
+
+    """
+
+    async def fetch(
+        provider_profile: ProviderProfile,
+        provider: schemas.ProviderResponse,
+    ) -> Union[ModelListing, ProviderError]:
+        try:
+            models = await fetch_models(clients, provider_profile, provider)
+
+        except ProviderError as error:
+            return error
+
+        except (KeyError, TypeError, ValueError) as error:
+            return ProviderError(f"Invalid model listing: {error}")
+
+        return ModelListing(models=models, fetched_at=time())
+
+    results = await asyncio.gather(
+        *(fetch(provider_profile, provider) for provider_profile, provider in targets)
+    )
+
+    return {
+        provider_profile.name.value: result
+        for (provider_profile, _), result in zip(targets, results)
+    }
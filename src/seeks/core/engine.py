@@ -0,0 +1,281 @@
+import asyncio
+import threading
+from queue import SimpleQueue
+from time import perf_counter
+from typing import (
+    Any,
+    AsyncIterator,
+    Coroutine,
+    Dict,
+    Iterator,
+    List,
+    Optional,
+    TypeVar,
+)
+
+from seeks.core import schemas
+from seeks.core.cache import ResponseCache
+from seeks.core.clients import Clients
+from seeks.core.providers import (
+    Chunk,
+    ProviderError,
+    StopChunk,
+    TextChunk,
+    get_adapter,
+)
+from seeks.core.spans import Spans
+from seeks.utils.count_tokens import count_tokens
+
+T = TypeVar("T")
+
+
+def estimate_tokens(data: Dict[str, Any]) -> int:
+    """
+    Estimate number of tokens of request for rate limiting, counting the
+    messages, the system prompt and the tokens reserved for the output.
+
+    Params
+    ------
+    - data (Dict[str, Any]): Request body.
+
+    Returns
+    -------
+    - int: Estimated number of tokens.
+
+    """
+
+    tokens: int = count_tokens(str(data.get("system", "")))
+
+    for message in data.get("messages", []):
+        tokens += count_tokens(str(message.get("content", "")))
+
+    return tokens + int(data.get("max_tokens", 0))
+
+
+class Engine:
+    """
+    Asynchronous streaming engine. A completion is driven as an async generator
+    of chunks, so any number of completions can be in flight within a single
+    event loop without a thread per request.
+
+    If a response cache is passed, identical requests are replayed from the
+    cache instead of being sent.
+
+    """
+
+    def __init__(
+        self,
+        clients: Clients,
+        cache: Optional[ResponseCache] = None,
+    ) -> None:
+        self._clients = clients
+        self._cache = cache
+
+    async def stream(
+        self,
+        provider_name: schemas.ProviderName,
+        endpoint: str,
+        headers: Dict[str, str],
+        data: Dict[str, Any],
+        spans: Optional[Spans] = None,
+    ) -> AsyncIterator[Chunk]:
+        """
+        Stream completion from provider.
+
+        Params
+        ------
+        - provider_name (ProviderName): Provider name to select adapter.
+        - endpoint (str): Provider endpoint.
+        - headers (Dict[str, str]): Request headers.
+        - data (Dict[str, Any]): Request body.
+        - spans (Optional[Spans]): Spans to record the connect, ttft and stream
+          phases in.
+
+        Returns
+        -------
+        - AsyncIterator[Chunk]: Chunk(s) in order of arrival. A ProviderError is
+          raised if the request fails or the stream breaks off.
+
+        """
+
+        key: Optional[str] = None
+
+        if self._cache is not None:
+            key = self._cache.key(provider_name.value, data)
+            # Cache reads and writes are blocking SQLite work, which runs in a
+            # worker thread so other streams on the loop are not stalled
+            cached = await asyncio.to_thread(self._cache.get, key)
+
+            if cached is not None:
+                for text in cached:
+                    yield TextChunk(text)
+
+                yield StopChunk("cached")
+                return
+
+        adapter = get_adapter(provider_name)
+        parts: List[str] = []
+        started_at = perf_counter()
+        first_token_at = 0.0
+
+        async with self._clients.stream(
+            provider_name.value,
+            endpoint,
+            headers=headers,
+            data=data,
+            tokens=estimate_tokens(data),
+        ) as response:
+            received_at = perf_counter()
+
+            try:
+                async for chunk in adapter.astream(response.aiter_lines()):
+                    if isinstance(chunk, TextChunk):
+                        if not parts:
+                            first_token_at = perf_counter()
+
+                        parts.append(chunk.text)
+
+                    yield chunk
+
+            except (KeyError, TypeError, ValueError) as error:
+                raise ProviderError(f"Invalid stream event: {error}") from error
+
+        if spans is not None:
+            spans.add("connect", received_at - started_at)
+
+            if parts:
+                spans.add("ttft", first_token_at - received_at)
+                spans.add("stream", perf_counter() - first_token_at)
+
+        # Only responses that streamed to the end are stored
+        if self._cache is not None and key is not None and parts:
+            await asyncio.to_thread(self._cache.put, key, parts)
+
+    async def complete(
+        self,
+        provider_name: schemas.ProviderName,
+        endpoint: str,
+        headers: Dict[str, str],
+        data: Dict[str, Any],
+    ) -> str:
+        """
+        Stream completion from provider and return the concatenated text.
+
+        Params
+        ------
+        - provider_name (ProviderName): Provider name to select adapter.
+        - endpoint (str): Provider endpoint.
+        - headers (Dict[str, str]): Request headers.
+        - data (Dict[str, Any]): Request body.
+
+        Returns
+        -------
+        - str: Completion text.
+
+        """
+
+        parts: List[str] = []
+
+        async for chunk in self.stream(provider_name, endpoint, headers, data):
+            if isinstance(chunk, TextChunk):
+                parts.append(chunk.text)
+
+        return "".join(parts)
+
+
+class Bridge:
+    """
+    Synchronous bridge to a long-lived event loop running in a background
+    thread. Keeping a single loop alive preserves the pooled connections of the
+    asynchronous clients between calls.
+
+    """
+
+    _done = object()
+
+    def __init__(self) -> None:
+        self._loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(target=self._loop.run_forever, daemon=True)
+        self._thread.start()
+
+    def run(self, coroutine: Coroutine[Any, Any, T]) -> T:
+        """
+        Run coroutine in the event loop and block until it is done. The
+        coroutine is cancelled if the caller is interrupted.
+
+        Params
+        ------
+        - coroutine (Coroutine[Any, Any, T]): Coroutine to run.
+
+        Returns
+        -------
+        - T: Result of coroutine.
+
+        """
+
+        future = asyncio.run_coroutine_threadsafe(coroutine, self._loop)
+
+        try:
+            return future.result()
+
+        except BaseException:
+            future.cancel()
+            raise
+
+    def iterate(self, iterator: AsyncIterator[T]) -> Iterator[T]:
+        """
+        Iterate async iterator from synchronous code. Items are handed over as
+        soon as they are produced. The iterator is cancelled if the caller stops
+        iterating or is interrupted.
+
+        Params
+        ------
+        - iterator (AsyncIterator[T]): Async iterator to consume.
+
+        Returns
+        -------
+        - Iterator[T]: Item(s) of async iterator.
+
+        """
+
+        queue: SimpleQueue[Any] = SimpleQueue()
+
+        async def pump() -> None:
+            try:
+                async for item in iterator:
+                    queue.put((item, None))
+
+            # Not handled here: the error is handed over to be raised again on
+            # the caller's thread, where it would otherwise be lost
+            except Exception as error:  # noqa: BLE001
+                queue.put((None, error))
+
+            finally:
+                queue.put((self._done, None))
+
+        future = asyncio.run_coroutine_threadsafe(pump(), self._loop)
+
+        try:
+            while True:
+                item, error = queue.get()
+
+                if error is not None:
+                    raise error
+
+                if item is self._done:
+                    break
+
+                yield item
+
+        finally:
+            future.cancel()
+
+    def close(self) -> None:
+        """
+        Stop event loop and wait for its thread to finish.
+
+        """
+
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        self._thread.join()
+        self._loop.close()
@@ -0,0 +1,79 @@
+from typing import Callable, Iterable, Optional, TextIO
+
+from seeks.core import schemas
+
+
+def write_jsonl(message: schemas.ExportMessage, file: TextIO) -> None:
+    file.write(message.model_dump_json())
+    file.write("\n")
+
+
+def write_markdown(
+    message: schemas.ExportMessage,
+    previous: Optional[schemas.ExportMessage],
+    file: TextIO,
+) -> None:
+    # Threads are exported one after the other, so a heading is written
+    # whenever the thread changes
+    if previous is None or previous.thread_id != message.thread_id:
+        if previous is not None:
+            file.write("\n---\n\n")
+
+        file.write(f"# {message.subject}\n\n")
+        file.write(f"_Thread {message.thread_id} with {message.assistant_name}_\n\n")
+
+    heading = message.role.value.capitalize()
+
+    if message.partial:
+        heading += " (incomplete)"
+
+    file.write(f"## {heading}\n\n{message.content.strip()}\n\n")
+
+
+def export_messages(
+    messages: Iterable[schemas.ExportMessage],
+    file: TextIO,
+    format: schemas.ExportFormat,
+    progress: Optional[Callable[[int], None]] = None,
+    interval: int = 1000,
+) -> int:
+    """
+    Write messages to file one at a time, so memory use is independent of the
+    number of messages.
+
+    Params
+    ------
+    - messages (Iterable[ExportMessage]): Message(s) in order of thread and
+      message.
+    - file (TextIO): File to write to.
+    - format (ExportFormat): Export format.
+    - progress (Optional[Callable[[int], None]]): Called with the number of
+      messages written every interval and once at the end.
+    - interval (int): Number of messages between progress calls.
+
+    Returns
+    -------
+    - int: Number of messages written.
+
+    """
+
+    count = 0
+    previous: Optional[schemas.ExportMessage] = None
+
+    for message in messages:
+        if format == schemas.ExportFormat.JSONL:
+            write_jsonl(message, file)
+
+        else:
+            write_markdown(message, previous, file)
+
+        previous = message
+        count += 1
+
+        if progress is not None and count % interval == 0:
+            progress(count)
+
+    if progress is not None:
+        progress(count)
+
+    return count
@@ -0,0 +1,190 @@
+import asyncio
+from dataclasses import dataclass, field
+from typing import Any, AsyncIterator, Dict, List, Optional, Tuple
+
+from seeks.core import schemas
+from seeks.core.engine import Engine
+from seeks.core.providers import Chunk, ProviderError, TextChunk
+from seeks.core.spans import Spans
+
+
+@dataclass(frozen=True, slots=True)
+class Route:
+    model_name: str
+    provider_name: schemas.ProviderName
+    endpoint: str
+    headers: Dict[str, str]
+    data: Dict[str, Any]
+
+
+@dataclass(slots=True)
+class Racer:
+    route: Route
+    chunks: AsyncIterator[Chunk]
+    buffer: List[Chunk] = field(default_factory=list)
+    finished: bool = False
+
+
+class Failover:
+    """
+    Stream a completion from the first of several routes, ie. the model of an
+    assistant followed by its fallback models. A route failing before its
+    first token, be it with a status code, a dropped connection or an invalid
+    event, is replaced by the next one. With hedging, the next route is
+    also started whenever a pending route has not produced a token within the
+    hedge delay. The first route to produce a token wins and the others are
+    cancelled, so a reply is never mixed from several models.
+
+    """
+
+    def __init__(
+        self,
+        engine: Engine,
+        routes: List[Route],
+        hedge_after: Optional[float] = None,
+    ) -> None:
+        self._engine = engine
+        self._routes = routes
+        self._hedge_after = hedge_after
+        self.route: Optional[Route] = None
+        self.errors: List[Tuple[Route, ProviderError]] = []
+
+    async def stream(self, spans: Optional[Spans] = None) -> AsyncIterator[Chunk]:
+        """
+        Stream completion from the winning route. Errors after the first token
+        are raised as is, as the reply cannot be continued by another model.
+
+        Params
+        ------
+        - spans (Optional[Spans]): Spans to record the connect, ttft and stream
+          phases in. Only the winning route records its phases, as the others
+          are cancelled or fail first.
+
+        Returns
+        -------
+        - AsyncIterator[Chunk]: Chunk(s) of the winning route in order of
+          arrival. A ProviderError is raised if all routes fail.
+
+        """
+
+        loop = asyncio.get_running_loop()
+        routes = iter(self._routes)
+        pending: Dict[asyncio.Future[Chunk], Racer] = {}
+        winner: Optional[Racer] = None
+        hedge_at: Optional[float] = None
+
+        def start() -> bool:
+            nonlocal hedge_at
+            route = next(routes, None)
+
+            if route is None:
+                return False
+
+            # The delay counts from the start of the latest route, so chunks
+            # without text, ie. usage, do not postpone the hedge
+            if self._hedge_after is not None:
+                hedge_at = loop.time() + self._hedge_after
+
+            chunks = self._engine.stream(
+                provider_name=route.provider_name,
+                endpoint=route.endpoint,
+                headers=route.headers,
+                data=route.data,
+                spans=spans,
+            )
+            racer = Racer(route=route, chunks=chunks)
+            pending[asyncio.ensure_future(chunks.__anext__())] = racer
+            return True
+
+        try:
+            has_next = start()
+
+            while winner is None:
+                if not pending:
+                    if self.errors:
+                        raise self.errors[-1][1]
+
+                    raise ProviderError("No route available")
+
+                timeout = None
+
+                if has_next and hedge_at is not None:
+                    timeout = max(hedge_at - loop.time(), 0.0)
+
+                done, _ = await asyncio.wait(
+                    pending,
+                    timeout=timeout,
+                    return_when=asyncio.FIRST_COMPLETED,
+                )
+
+                if not done:
+                    has_next = start()
+                    continue
+
+                for task in done:
+                    racer = pending.pop(task)
+
+                    try:
+                        chunk = task.result()
+
+                    except StopAsyncIteration:
+                        # An empty reply is a complete reply as well
+                        racer.finished = True
+                        winner = racer
+                        break
+
+                    except ProviderError as error:
+                        self.errors.append((racer.route, error))
+
+                        if not pending:
+                            has_next = start()
+
+                        continue
+
+                    racer.buffer.append(chunk)
+
+                    if isinstance(chunk, TextChunk):
+                        winner = racer
+                        break
+
+                    pending[asyncio.ensure_future(racer.chunks.__anext__())] = racer
+
+        finally:
+            await self._cancel(pending)
+
+        self.route = winner.route
+
+        try:
+            for chunk in winner.buffer:
+                yield chunk
+
+            if not winner.finished:
+                async for chunk in winner.chunks:
+                    yield chunk
+
+        except ProviderError as error:
+            self.errors.append((winner.route, error))
+            raise
+
+        finally:
+            await winner.chunks.aclose()  # type: ignore[attr-defined]
+
+    async def _cancel(self, pending: Dict[asyncio.Future[Chunk], Racer]) -> None:
+        """
+        Cancel pending routes and close their streams, releasing connections.
+
+        Params
+        ------
+        - pending (Dict[Future[Chunk], Racer]): Pending next chunk by route.
+
+        """
+
+        for task in pending:
+            task.cancel()
+
+        await asyncio.gather(*pending, return_exceptions=True)
+
+        for racer in pending.values():
+            await racer.chunks.aclose()  # type: ignore[attr-defined]
+
+        pending.clear()
@@ -0,0 +1,340 @@
+import asyncio
+import random
+import threading
+from datetime import UTC, datetime
+from email.utils import parsedate_to_datetime
+from time import monotonic, time
+from typing import Mapping, Optional, Union
+
+
+class TokenBucket:
+    """
+    Token bucket refilling continuously at a rate per minute. Reservations are
+    taken immediately, possibly driving the bucket below zero, and return the
+    time the caller has to wait before its reservation is covered. This keeps
+    callers queued in order of arrival without holding a lock while waiting.
+
+    """
+
+    def __init__(self, per_minute: int) -> None:
+        self._rate = per_minute / 60
+        self._capacity = float(per_minute)
+        self._tokens = float(per_minute)
+        self._updated_at = monotonic()
+        self._lock = threading.Lock()
+
+    def reserve(self, amount: float) -> float:
+        """
+        Reserve tokens from bucket.
+
+        Params
+        ------
+        - amount (float): Number of tokens to reserve. Capped at the capacity
+          of the bucket, so a single large request cannot block forever.
+
+        Returns
+        -------
+        - float: Seconds to wait before the reservation is covered.
+
+        """
+
+        with self._lock:
+            now = monotonic()
+            self._tokens = min(
+                self._capacity,
+                self._tokens + (now - self._updated_at) * self._rate,
+            )
+            self._updated_at = now
+            self._tokens -= min(amount, self._capacity)
+
+            if self._tokens >= 0:
+                return 0.0
+
+            return -self._tokens / self._rate
+
+
+class RateLimiter:
+    """
+    Client-side rate limiter of a single provider, limiting requests and tokens
+    per minute. Rate limit headers of responses pause all callers until the
+    provider's window resets, so concurrent requests back off together instead
+    of stampeding the API.
+
+    """
+
+    def __init__(
+        self,
+        requests_per_minute: Optional[int] = None,
+        tokens_per_minute: Optional[int] = None,
+    ) -> None:
+        self._requests = (
+            TokenBucket(requests_per_minute) if requests_per_minute else None
+        )
+        self._tokens = TokenBucket(tokens_per_minute) if tokens_per_minute else None
+        self._paused_until = 0.0
+
+    async def acquire(self, tokens: int) -> None:
+        """
+        Wait until a request of the passed number of tokens is allowed.
+
+        Params
+        ------
+        - tokens (int): Estimated number of tokens of request.
+
+        """
+
+        delay = max(self._paused_until - monotonic(), 0.0)
+
+        if self._requests is not None:
+            delay = max(delay, self._requests.reserve(1))
+
+        if self._tokens is not None:
+            delay = max(delay, self._tokens.reserve(tokens))
+
+        if delay > 0:
+            await asyncio.sleep(delay)
+
+    def pause(self, seconds: float) -> None:
+        """
+        Pause all requests of provider for the passed number of seconds.
+
+        Params
+        ------
+        - seconds (float): Seconds to pause.
+
+        """
+
+        self._paused_until = max(self._paused_until, monotonic() + seconds)
+
+    def update(self, headers: Mapping[str, str]) -> None:
+        """
+        Pause requests if the rate limit headers of a response report that the
+        remaining requests or tokens of the current window are used up. Both
+        the OpenAI (`x-ratelimit-*`) and Anthropic (`anthropic-ratelimit-*`)
+        headers are understood.
+
+        Params
+        ------
+        - headers (Mapping[str, str]): Response headers.
+
+        """
+
+        for prefix in ("x-ratelimit", "anthropic-ratelimit"):
+            for kind in ("requests", "tokens", "input-tokens", "output-tokens"):
+                remaining = headers.get(f"{prefix}-remaining-{kind}")
+
+                if remaining is None:
+                    remaining = headers.get(f"{prefix}-{kind}-remaining")
+
+                if remaining is None or remaining.strip() != "0":
+                    continue
+
+                reset = headers.get(f"{prefix}-reset-{kind}") or headers.get(
+                    f"{prefix}-{kind}-reset"
+                )
+                seconds = parse_reset(reset) if reset else None
+
+                if seconds:
+                    self.pause(seconds)
+
+
+class CircuitBreaker:
+    """
+    Circuit breaker of a single provider. After a number of consecutive
+    failures the circuit opens and requests are refused at once, instead of
+    waiting on retries against a provider that is down. Once the reset timeout
+    has passed, a single request is let through to probe whether the provider
+    recovered: success closes the circuit, failure opens it again.
+
+    """
+
+    def __init__(self, failure_threshold: int, reset_timeout: float) -> None:
+        self._failure_threshold = failure_threshold
+        self._reset_timeout = reset_timeout
+        self._failures = 0
+        self._opened_at: Optional[float] = None
+        self._lock = threading.Lock()
+
+    @property
+    def is_open(self) -> bool:
+        opened_at = self._opened_at
+        return opened_at is not None and monotonic() - opened_at < self._reset_timeout
+
+    def allow(self) -> bool:
+        """
+        Return whether a request may be sent. Other requests are refused while
+        a probe is underway, until it reports back or the timeout passes again.
+
+        Returns
+        -------
+        - bool: Whether the circuit is closed, or a probe is let through.
+
+        """
+
+        with self._lock:
+            if self._opened_at is None:
+                return True
+
+            if monotonic() - self._opened_at < self._reset_timeout:
+                return False
+
+            self._opened_at = monotonic()
+            return True
+
+    def record_success(self) -> None:
+        with self._lock:
+            self._failures = 0
+            self._opened_at = None
+
+    def record_failure(self) -> None:
+        with self._lock:
+            self._failures += 1
+
+            if self._failures >= self._failure_threshold:
+                self._opened_at = monotonic()
+
+
+def parse_duration(value: str) -> Optional[float]:
+    """
+    Parse duration in the format of OpenAI rate limit headers, ie. "1s",
+    "6m0s" or "250ms".
+
+    Params
+    ------
+    - value (str): Duration.
+
+    Returns
+    -------
+    - Optional[float]: Duration in seconds, or None if not parsable.
+
+    """
+
+    units = {"h": 3600.0, "m": 60.0, "s": 1.0, "ms": 0.001}
+    seconds = 0.0
+    number = ""
+    index = 0
+
+    while index < len(value):
+        char = value[index]
+
+        if char.isdigit() or char == ".":
+            number += char
+            index += 1
+            continue
+
+        unit = "ms" if value[index : index + 2] == "ms" else char
+
+        if unit not in units or not number:
+            return None
+
+        seconds += float(number) * units[unit]
+        number = ""
+        index += len(unit)
+
+    if number:
+        seconds += float(number)
+
+    return seconds
+
+
+def parse_reset(value: str) -> Optional[float]:
+    """
+    Parse reset value of rate limit header into seconds from now. Accepts a
+    number of seconds, a duration (OpenAI) or an RFC 3339 timestamp
+    (Anthropic).
+
+    Params
+    ------
+    - value (str): Header value.
+
+    Returns
+    -------
+    - Optional[float]: Seconds until reset, or None if not parsable.
+
+    """
+
+    value = value.strip()
+
+    try:
+        return max(float(value), 0.0)
+
+    except ValueError:
+        pass
+
+    try:
+        reset_at = datetime.fromisoformat(value)
+
+    except ValueError:
+        return parse_duration(value)
+
+    # Timestamps without offset are in UTC, not local time
+    if reset_at.tzinfo is None:
+        reset_at = reset_at.replace(tzinfo=UTC)
+
+    return max(reset_at.timestamp() - time(), 0.0)
+
+
+def parse_retry_after(headers: Mapping[str, str]) -> Optional[float]:
+    """
+    Return delay requested by `retry-after-ms` or `retry-after` header. The
+    latter is either a number of seconds or an HTTP date.
+
+    Params
+    ------
+    - headers (Mapping[str, str]): Response headers.
+
+    Returns
+    -------
+    - Optional[float]: Seconds to wait, or None if not present.
+
+    """
+
+    value: Union[str, None] = headers.get("retry-after-ms")
+
+    if value is not None:
+        try:
+            return max(float(value) / 1000, 0.0)
+
+        except ValueError:
+            pass
+
+    value = headers.get("retry-after")
+
+    if value is None:
+        return None
+
+    try:
+        return max(float(value), 0.0)
+
+    except ValueError:
+        pass
+
+    try:
+        retry_at = parsedate_to_datetime(value)
+
+    except (TypeError, ValueError):
+        return None
+
+    if retry_at.tzinfo is None:
+        retry_at = retry_at.replace(tzinfo=UTC)
+
+    return max(retry_at.timestamp() - time(), 0.0)
+
+
+def backoff(attempt: int, base: float, cap: float) -> float:
+    """
+    Return exponential backoff delay with full jitter.
+
+    Params
+    ------
+    - attempt (int): Number of the failed attempt, starting at 0.
+    - base (float): Delay of the first retry in seconds.
+    - cap (float): Maximum delay in seconds.
+
+    Returns
+    -------
+    - float: Seconds to wait.
+
+    """
+
+    return random.uniform(0, min(cap, base * 2**attempt))
@@ -0,0 +1,204 @@
+from typing import Callable, List, Tuple
+
+from sqlalchemy import Connection, Engine, text
+from sqlalchemy.exc import OperationalError
+
+from seeks.core.models import Base, Timing
+from seeks.core.search import create_search_index
+
+Migration = Callable[[Connection], None]
+
+
+def add_column(connection: Connection, table: str, column: str, ddl: str) -> bool:
+    """
+    Add column to table if it does not exist yet. Databases created after the
+    column was introduced already have it, as these are created from the
+    current models.
+
+    Params
+    ------
+    - connection (Connection): Database connection.
+    - table (str): Table name.
+    - column (str): Column name.
+    - ddl (str): Column type and constraints.
+
+    Returns
+    -------
+    - bool: Whether the column was added.
+
+    """
+
+    columns = connection.execute(text(f"PRAGMA table_info({table})")).all()
+
+    if any(row.name == column for row in columns):
+        return False
+
+    connection.execute(text(f"ALTER TABLE {table} ADD COLUMN {column} {ddl}"))
+    return True
+
+
+def create_tables(connection: Connection) -> None:
+    Base.metadata.create_all(bind=connection)
+
+
+def add_message_partial(connection: Connection) -> None:
+    add_column(connection, "message", "partial", "BOOLEAN NOT NULL DEFAULT 0")
+
+
+def add_message_created_at(connection: Connection) -> None:
+    # SQLite does not allow adding a column with a non-constant default, so
+    # existing messages are stamped with the time of the migration
+    if add_column(connection, "message", "created_at", "DATETIME"):
+        connection.execute(text("UPDATE message SET created_at = CURRENT_TIMESTAMP"))
+
+
+def add_message_thread_index(connection: Connection) -> None:
+    connection.execute(
+        text(
+            "CREATE INDEX IF NOT EXISTS ix_message_thread_id_id "
+            "ON message (thread_id, id)"
+        )
+    )
+
+
+def add_message_token_count(connection: Connection) -> None:
+    # Same estimate as `count_tokens`, so counts are computed in a single
+    # statement instead of loading every message
+    if add_column(connection, "message", "token_count", "INTEGER NOT NULL DEFAULT 0"):
+        connection.execute(
+            text("UPDATE message SET token_count = (length(content) + 3) / 4")
+        )
+
+
+def add_thread_summary(connection: Connection) -> None:
+    add_column(connection, "thread", "summary", "VARCHAR")
+    add_column(connection, "thread", "summary_until_id", "INTEGER")
+    add_column(
+        connection,
+        "thread",
+        "summary_token_count",
+        "INTEGER NOT NULL DEFAULT 0",
+    )
+
+
+def create_timing_table(connection: Connection) -> None:
+    Base.metadata.create_all(
+        bind=connection, tables=[Base.metadata.tables[Timing.__tablename__]]
+    )
+
+
+def add_thread_updated_at(connection: Connection) -> None:
+    # Existing threads are stamped with the time of their latest message
+    if add_column(connection, "thread", "updated_at", "DATETIME"):
+        connection.execute(
+            text(
+                "UPDATE thread SET updated_at = coalesce("
+                "(SELECT max(created_at) FROM message WHERE thread_id = thread.id), "
+                "CURRENT_TIMESTAMP)"
+            )
+        )
+
+    connection.execute(
+        text(
+            "CREATE INDEX IF NOT EXISTS ix_thread_updated_at_id "
+            "ON thread (updated_at, id)"
+        )
+    )
+
+    # Every write path inserts messages, so the last activity of a thread is
+    # kept up to date by a trigger instead of by each caller
+    connection.execute(
+        text(
+            """
+            CREATE TRIGGER IF NOT EXISTS thread_activity AFTER INSERT ON message
+            BEGIN
+                UPDATE thread SET updated_at = new.created_at
+                WHERE id = new.thread_id;
+            END
+            """
+        )
+    )
+
+
+def add_assistant_fallback_model_names(connection: Connection) -> None:
+    add_column(
+        connection,
+        "assistant",
+        "fallback_model_names",
+        "JSON NOT NULL DEFAULT '[]'",
+    )
+
+
+# Ordered list of migrations. The schema version of a database is the number of
+# migrations applied to it, so migrations must only ever be appended. Every
+# migration must be idempotent, as a new database is created from the current
+# models by the first migration and then runs through all others.
+migrations: List[Tuple[str, Migration]] = [
+    ("create tables", create_tables),
+    ("add message partial", add_message_partial),
+    ("add message created at", add_message_created_at),
+    ("add message thread index", add_message_thread_index),
+    ("add message token count", add_message_token_count),
+    ("add thread summary", add_thread_summary),
+    ("create search index", create_search_index),
+    ("create timing table", create_timing_table),
+    ("add thread updated at", add_thread_updated_at),
+    ("add assistant fallback model names", add_assistant_fallback_model_names),
+]
+
+
+def read_version(engine: Engine) -> int:
+    """
+    Return schema version of database. Databases created before versioning
+    have no version table and are considered version 0.
+
+    Params
+    ------
+    - engine (Engine): Database engine.
+
+    Returns
+    -------
+    - int: Schema version.
+
+    """
+
+    try:
+        with engine.connect() as connection:
+            version = connection.scalar(text("SELECT max(version) FROM schema_version"))
+
+    except OperationalError:
+        return 0
+
+    return version or 0
+
+
+def migrate(engine: Engine) -> int:
+    """
+    Bring database schema up to date by applying pending migrations in order.
+    If the database is up to date, this costs a single read of the version.
+
+    Params
+    ------
+    - engine (Engine): Database engine.
+
+    Returns
+    -------
+    - int: Number of migrations applied.
+
+    """
+
+    version = read_version(engine)
+    pending = migrations[version:]
+
+    for index, (_, migration) in enumerate(pending, start=version + 1):
+        # Record version along with each migration, so an interrupted upgrade
+        # resumes at the first migration that did not complete
+        with engine.begin() as connection:
+            migration(connection)
+            connection.execute(text("DELETE FROM schema_version"))
+            connection.execute(
+                text("INSERT INTO schema_version (version) VALUES (:version)"),
+                {"version": index},
+            )
+
+    return len(pending)
@@ -1,6 +1,17 @@
-from typing import List, Union
-
-from sqlalchemy import Column, Enum, ForeignKey, Integer, String, UniqueConstraint
+from datetime import datetime
+from typing import List, Optional, Union
+
+from sqlalchemy import (
+    JSON,
+    Column,
+    Enum,
+    ForeignKey,
+    Index,
+    Integer,
+    String,
+    UniqueConstraint,
+    func,
+)
 from sqlalchemy.ext.hybrid import hybrid_property
 from sqlalchemy.orm import DeclarativeBase, Mapped, mapped_column, relationship
 
@@ -11,6 +22,15 @@ class Base(DeclarativeBase):
     pass
 
 
+class SchemaVersion(Base):
+    __tablename__ = "schema_version"
+
+    version: Mapped[int] = mapped_column(primary_key=True)
+
+    def __repr__(self) -> str:
+        return "<SchemaVersion(version={})>".format(self.version)
+
+
 class Provider(Base):
     __tablename__ = "provider"
 
@@ -33,6 +53,12 @@ class Assistant(Base):
     name: Mapped[str] = mapped_column(String(30), unique=True)
     description: Mapped[str]
     model_name: Mapped[str]
+    # Models to fall back on, in order, when the model fails or is slow
+    fallback_model_names: Mapped[List[str]] = mapped_column(
+        JSON,
+        default=list,
+        server_default="[]",
+    )
     threads: Mapped[List["Thread"]] = relationship(
         back_populates="assistant",
         cascade="all, delete-orphan",
@@ -50,9 +76,17 @@ class Assistant(Base):
 
 class Thread(Base):
     __tablename__ = "thread"
+    __table_args__ = (Index("ix_thread_updated_at_id", "updated_at", "id"),)
 
     id: Mapped[int] = mapped_column(primary_key=True)
     subject: Mapped[str]
+    updated_at: Mapped[Optional[datetime]] = mapped_column(
+        default=func.now(),
+        server_default=func.now(),
+    )
+    summary: Mapped[Optional[str]]
+    summary_until_id: Mapped[Optional[int]]
+    summary_token_count: Mapped[int] = mapped_column(default=0)
     assistant: Mapped["Assistant"] = relationship(back_populates="threads")
     assistant_id: Mapped[int] = mapped_column(ForeignKey("assistant.id"))
     messages: Mapped[List["Message"]] = relationship(
@@ -74,18 +108,53 @@ class Thread(Base):
 
 class Message(Base):
     __tablename__ = "message"
+    __table_args__ = (Index("ix_message_thread_id_id", "thread_id", "id"),)
 
     id: Mapped[int] = mapped_column(primary_key=True)
     role: Mapped[Role] = mapped_column(Enum(Role))
     content: Mapped[str]
+    partial: Mapped[bool] = mapped_column(default=False)
+    token_count: Mapped[int] = mapped_column(default=0)
+    created_at: Mapped[datetime] = mapped_column(
+        default=func.now(),
+        server_default=func.now(),
+    )
     thread: Mapped["Thread"] = relationship(back_populates="messages")
     thread_id: Mapped[int] = mapped_column(ForeignKey("thread.id"))
 
     def __repr__(self) -> str:
-        return "<Message(id={}, role={}, content={})>".format(
+        return "<Message(id={}, role={}, content={}, partial={})>".format(
             self.id,
             self.role,
             self.content,
+            self.partial,
+        )
+
+
+class Timing(Base):
+    __tablename__ = "timing"
+    __table_args__ = (
+        Index("ix_timing_model_name_phase", "model_name", "phase"),
+        Index("ix_timing_created_at", "created_at"),
+    )
+
+    id: Mapped[int] = mapped_column(primary_key=True)
+    message_id: Mapped[Optional[int]]
+    thread_id: Mapped[int]
+    model_name: Mapped[str]
+    phase: Mapped[str]
+    duration: Mapped[float]
+    created_at: Mapped[datetime] = mapped_column(
+        default=func.now(),
+        server_default=func.now(),
+    )
+
+    def __repr__(self) -> str:
+        return "<Timing(id={}, model_name={}, phase={}, duration={})>".format(
+            self.id,
+            self.model_name,
+            self.phase,
+            self.duration,
         )
 
 
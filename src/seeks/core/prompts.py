@@ -71,7 +71,7 @@ class Prompts:
 
         choices = [
             Choice(
-                title=self._config.find_provider_by_name(provider.name).display_name,
+                title=self._config.find_display_name(provider.name),
                 value=provider.id,
             )
             for provider in providers
@@ -132,6 +132,46 @@ class Prompts:
             assistant for assistant in assistants if assistant.id == result["id"]
         )
 
+    def select_assistants(
+        self, assistants: List[schemas.AssistantResponse]
+    ) -> Union[List[schemas.AssistantResponse], None]:
+        """
+        Prompt to select several assistants.
+
+        Params
+        ------
+        - assistants (List[schemas.AssistantResponse]): List of assistants.
+
+        Returns
+        -------
+        - Union[List[schemas.AssistantResponse], None]: Selected assistant(s)
+          or None in case user cancels.
+
+        """
+
+        choices = [
+            Choice(
+                title=f"{assistant.name} ({assistant.model_name})",
+                value=assistant.id,
+            )
+            for assistant in assistants
+        ]
+        questions: List[Dict[str, Any]] = [
+            {
+                "type": "checkbox",
+                "name": "ids",
+                "message": "Select assistants to compare",
+                "choices": choices,
+                "validate": lambda ids: len(ids) > 0,
+            },
+        ]
+        result = prompt(questions, kbi_msg="")
+
+        if not result:
+            return None
+
+        return [assistant for assistant in assistants if assistant.id in result["ids"]]
+
     def select_thread(
         self, threads: List[schemas.ThreadResponse]
     ) -> Union[schemas.ThreadResponse, None]:
@@ -171,6 +211,76 @@ class Prompts:
 
         return next(thread for thread in threads if thread.id == result["id"])
 
+    def confirm_next_page(self) -> bool:
+        """
+        Prompt to show the next page of a listing.
+
+        Returns
+        -------
+        - bool: Whether to show the next page, False in case user cancels.
+
+        """
+
+        questions: List[Dict[str, Any]] = [
+            {
+                "type": "confirm",
+                "name": "next",
+                "message": "Show more?",
+                "default": True,
+            },
+        ]
+        result = prompt(questions, kbi_msg="")
+
+        if not result:
+            return False
+
+        return bool(result["next"])
+
+    def export_options(self) -> Union[schemas.ExportOptions, None]:
+        """
+        Prompt to select what to export, in which format and where to.
+
+        Returns
+        -------
+        - Union[schemas.ExportOptions, None]: Export scope, format and path or
+          None in case user cancels.
+
+        """
+
+        questions: List[Dict[str, Any]] = [
+            {
+                "type": "select",
+                "name": "scope",
+                "message": "Export",
+                "choices": [
+                    Choice(title="Thread", value=schemas.ExportScope.THREAD.value),
+                    Choice(
+                        title="Threads of assistant",
+                        value=schemas.ExportScope.ASSISTANT.value,
+                    ),
+                    Choice(title="All threads", value=schemas.ExportScope.ALL.value),
+                ],
+            },
+            {
+                "type": "select",
+                "name": "format",
+                "message": "Format",
+                "choices": [format.value for format in schemas.ExportFormat],
+            },
+            {
+                "type": "path",
+                "name": "path",
+                "message": "File",
+                "validate": required,
+            },
+        ]
+        result = prompt(questions, kbi_msg="")
+
+        if not result:
+            return None
+
+        return schemas.ExportOptions(**result)
+
     def create_provider(self) -> Union[schemas.ProviderCreate, None]:
         """
         Prompt to create provider.
@@ -224,7 +334,8 @@ class Prompts:
         """
 
         provider_names = [provider.name for provider in providers]
-        questions = [
+        models = self._config.list_models(provider_names)
+        questions: List[Dict[str, Any]] = [
             {
                 "type": "text",
                 "name": "name",
@@ -235,7 +346,16 @@ class Prompts:
                 "type": "select",
                 "name": "model_name",
                 "message": "Model name",
-                "choices": self._config.list_models(provider_names),
+                "choices": models,
+            },
+            {
+                "type": "checkbox",
+                "name": "fallback_model_names",
+                "message": "Fallback models, tried in listed order",
+                "choices": lambda answers: fallback_choices(
+                    models, answers["model_name"], []
+                ),
+                "when": lambda _: len(models) > 1,
             },
             {
                 "type": "text",
@@ -296,7 +416,8 @@ class Prompts:
         """
 
         provider_names = [provider.name for provider in providers]
-        questions = [
+        models = self._config.list_models(provider_names)
+        questions: List[Dict[str, Any]] = [
             {
                 "type": "text",
                 "name": "name",
@@ -306,11 +427,20 @@ class Prompts:
             },
             {
                 "type": "select",
-                "name": "model",
+                "name": "model_name",
                 "message": "Model",
-                "choices": self._config.list_models(provider_names),
+                "choices": models,
                 "default": assistant.model_name,
             },
+            {
+                "type": "checkbox",
+                "name": "fallback_model_names",
+                "message": "Fallback models, tried in listed order",
+                "choices": lambda answers: fallback_choices(
+                    models, answers["model_name"], assistant.fallback_model_names
+                ),
+                "when": lambda _: len(models) > 1,
+            },
             {
                 "type": "text",
                 "name": "description",
@@ -330,3 +460,34 @@ class Prompts:
 
 def required(value: str) -> bool:
     return value != ""
+
+
+def fallback_choices(
+    models: List[str],
+    model_name: str,
+    selected: List[str],
+) -> List[Choice]:
+    """
+    Return choices of fallback models. Selected fallbacks are listed first, in
+    their current order, as the order of the choices is kept in the answer.
+
+    Params
+    ------
+    - models (List[str]): Model name(s).
+    - model_name (str): Model name of assistant, which is left out.
+    - selected (List[str]): Current fallback model name(s).
+
+    Returns
+    -------
+    - List[Choice]: Choice(s).
+
+    """
+
+    ordered = [model for model in selected if model in models]
+    ordered += [model for model in models if model not in ordered]
+
+    return [
+        Choice(title=model, value=model, checked=model in selected)
+        for model in ordered
+        if model != model_name
+    ]
@@ -0,0 +1,451 @@
+import json
+from abc import ABC, abstractmethod
+from dataclasses import dataclass
+from typing import (
+    Any,
+    AsyncIterable,
+    AsyncIterator,
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    Optional,
+    Tuple,
+    Union,
+)
+
+from seeks.core import schemas
+
+
+class ProviderError(Exception):
+    def __init__(self, message: str, status_code: Optional[int] = None) -> None:
+        super().__init__(message)
+        self.status_code = status_code
+
+
+def read_error_message(body: bytes) -> str:
+    """
+    Read error message from body of a failed response. Both OpenAI and
+    Anthropic return `{"error": {"message": ...}}`, other bodies are returned
+    as text.
+
+    Params
+    ------
+    - body (bytes): Response body.
+
+    Returns
+    -------
+    - str: Error message.
+
+    """
+
+    text = body.decode(errors="replace").strip()
+
+    try:
+        error = json.loads(text).get("error")
+
+    except (AttributeError, ValueError):
+        return text or "Unknown error"
+
+    if isinstance(error, dict) and error.get("message"):
+        return str(error["message"])
+
+    return text or "Unknown error"
+
+
+@dataclass(frozen=True, slots=True)
+class ServerSentEvent:
+    event: str
+    data: str
+
+
+@dataclass(frozen=True, slots=True)
+class TextChunk:
+    text: str
+
+
+@dataclass(frozen=True, slots=True)
+class UsageChunk:
+    input_tokens: int
+    output_tokens: int
+
+
+@dataclass(frozen=True, slots=True)
+class StopChunk:
+    reason: Optional[str]
+
+
+Chunk = Union[TextChunk, UsageChunk, StopChunk]
+
+
+class ServerSentEventDecoder:
+    """
+    Incremental decoder of server-sent events. Lines are fed one at a time and
+    an event is returned as soon as the blank line terminating it is received.
+    Fields are split with plain string operations, so decoding a line costs a
+    single pass over it.
+
+    """
+
+    def __init__(self) -> None:
+        self._event = ""
+        self._data: List[str] = []
+
+    def decode(self, line: str) -> Optional[ServerSentEvent]:
+        """
+        Decode line of event stream.
+
+        Params
+        ------
+        - line (str): Line without trailing newline.
+
+        Returns
+        -------
+        - Optional[ServerSentEvent]: Event if the line completes one.
+
+        """
+
+        if not line:
+            return self.flush()
+
+        # Lines starting with a colon are comments, ie. keep-alive pings
+        if line[0] == ":":
+            return None
+
+        field, _, value = line.partition(":")
+
+        if value[:1] == " ":
+            value = value[1:]
+
+        if field == "data":
+            self._data.append(value)
+
+        elif field == "event":
+            self._event = value
+
+        return None
+
+    def flush(self) -> Optional[ServerSentEvent]:
+        """
+        Return pending event, if any, and reset decoder state.
+
+        Returns
+        -------
+        - Optional[ServerSentEvent]: Pending event.
+
+        """
+
+        if not self._data:
+            self._event = ""
+            return None
+
+        event = ServerSentEvent(
+            event=self._event or "message",
+            data="\n".join(self._data),
+        )
+        self._event = ""
+        self._data = []
+        return event
+
+
+class Adapter(ABC):
+    """
+    Base class of provider adapters. An adapter owns everything that differs
+    between providers: building the request payload and translating the
+    provider's stream events into chunks.
+
+    """
+
+    @abstractmethod
+    def build_headers(self, provider: schemas.ProviderResponse) -> Dict[str, str]:
+        """
+        Build request headers authenticating with the API key of provider.
+
+        Params
+        ------
+        - provider (ProviderResponse): Provider holding the API key.
+
+        Returns
+        -------
+        - Dict[str, str]: Request headers.
+
+        """
+
+    def filter_models(self, models: List[str]) -> List[str]:
+        """
+        Filter model listing of provider down to models that can chat.
+
+        Params
+        ------
+        - models (List[str]): Listed model name(s).
+
+        Returns
+        -------
+        - List[str]: Chat model name(s).
+
+        """
+
+        return models
+
+    @abstractmethod
+    def build_payload(
+        self,
+        provider: schemas.ProviderResponse,
+        assistant: schemas.AssistantResponse,
+        messages: List[schemas.MessageResponse],
+    ) -> Tuple[Dict[str, str], Dict[str, Any]]:
+        """
+        Build request headers and body.
+
+        Params
+        ------
+        - provider (ProviderResponse): Provider holding the API key.
+        - assistant (AssistantResponse): Assistant holding the model name.
+        - messages (List[MessageResponse]): Messages to send.
+
+        Returns
+        -------
+        - Tuple[Dict[str, str], Dict[str, Any]]: (headers, data).
+
+        """
+
+    @abstractmethod
+    def parse(self, event: ServerSentEvent) -> Iterator[Chunk]:
+        """
+        Translate stream event into chunks.
+
+        Params
+        ------
+        - event (ServerSentEvent): Decoded event.
+
+        Returns
+        -------
+        - Iterator[Chunk]: Chunk(s) carried by the event.
+
+        """
+
+    def stream(self, lines: Iterable[str]) -> Iterator[Chunk]:
+        """
+        Decode lines of a streamed response into chunks.
+
+        Params
+        ------
+        - lines (Iterable[str]): Lines of the response body.
+
+        Returns
+        -------
+        - Iterator[Chunk]: Chunk(s) in order of arrival.
+
+        """
+
+        decoder = ServerSentEventDecoder()
+
+        for line in lines:
+            event = decoder.decode(line)
+
+            if event is not None:
+                yield from self.parse(event)
+
+        event = decoder.flush()
+
+        if event is not None:
+            yield from self.parse(event)
+
+    async def astream(self, lines: AsyncIterable[str]) -> AsyncIterator[Chunk]:
+        """
+        Decode lines of an asynchronously streamed response into chunks.
+
+        Params
+        ------
+        - lines (AsyncIterable[str]): Lines of the response body.
+
+        Returns
+        -------
+        - AsyncIterator[Chunk]: Chunk(s) in order of arrival.
+
+        """
+
+        decoder = ServerSentEventDecoder()
+
+        async for line in lines:
+            event = decoder.decode(line)
+
+            if event is not None:
+                for chunk in self.parse(event):
+                    yield chunk
+
+        event = decoder.flush()
+
+        if event is not None:
+            for chunk in self.parse(event):
+                yield chunk
+
+
+class OpenAIAdapter(Adapter):
+    # The model listing includes embedding, audio and image models as well
+    chat_prefixes = ("gpt-", "chatgpt-", "o1", "o3", "o4")
+    excluded_terms = ("audio", "realtime", "transcribe", "tts", "image", "search")
+
+    def build_headers(self, provider: schemas.ProviderResponse) -> Dict[str, str]:
+        return {
+            "Content-Type": "application/json",
+            "Authorization": f"Bearer {provider.api_key}",
+        }
+
+    def filter_models(self, models: List[str]) -> List[str]:
+        return [
+            model
+            for model in models
+            if model.startswith(self.chat_prefixes)
+            and not any(term in model for term in self.excluded_terms)
+        ]
+
+    def build_payload(
+        self,
+        provider: schemas.ProviderResponse,
+        assistant: schemas.AssistantResponse,
+        messages: List[schemas.MessageResponse],
+    ) -> Tuple[Dict[str, str], Dict[str, Any]]:
+        headers = self.build_headers(provider)
+        data: Dict[str, Any] = {
+            "model": assistant.model_name,
+            "messages": [
+                {
+                    "role": message.role.value,
+                    "content": message.content,
+                }
+                for message in messages
+            ],
+            "stream": True,
+            "stream_options": {"include_usage": True},
+        }
+        return (headers, data)
+
+    def parse(self, event: ServerSentEvent) -> Iterator[Chunk]:
+        if event.data == "[DONE]":
+            return
+
+        data = json.loads(event.data)
+
+        if "error" in data:
+            raise ProviderError(data["error"].get("message", "Unknown error"))
+
+        for choice in data.get("choices") or []:
+            content = choice.get("delta", {}).get("content")
+
+            if content:
+                yield TextChunk(content)
+
+            if choice.get("finish_reason"):
+                yield StopChunk(choice["finish_reason"])
+
+        usage = data.get("usage")
+
+        if usage:
+            yield UsageChunk(
+                input_tokens=usage.get("prompt_tokens", 0),
+                output_tokens=usage.get("completion_tokens", 0),
+            )
+
+
+class AnthropicAdapter(Adapter):
+    version = "2023-06-01"
+    max_tokens = 8192
+
+    def build_headers(self, provider: schemas.ProviderResponse) -> Dict[str, str]:
+        return {
+            "Content-Type": "application/json",
+            "x-api-key": provider.api_key,
+            "anthropic-version": self.version,
+        }
+
+    def build_payload(
+        self,
+        provider: schemas.ProviderResponse,
+        assistant: schemas.AssistantResponse,
+        messages: List[schemas.MessageResponse],
+    ) -> Tuple[Dict[str, str], Dict[str, Any]]:
+        headers = self.build_headers(provider)
+        data: Dict[str, Any] = {
+            "model": assistant.model_name,
+            "max_tokens": self.max_tokens,
+            "messages": [
+                {
+                    "role": message.role.value,
+                    "content": message.content,
+                }
+                for message in messages
+                if message.role != schemas.Role.SYSTEM
+            ],
+            "stream": True,
+        }
+
+        # Anthropic does not accept system messages in the message list, these
+        # are passed as top-level system prompt instead
+        system = [
+            message.content
+            for message in messages
+            if message.role == schemas.Role.SYSTEM
+        ]
+
+        if system:
+            data["system"] = "\n\n".join(system)
+
+        return (headers, data)
+
+    def parse(self, event: ServerSentEvent) -> Iterator[Chunk]:
+        if event.event == "ping":
+            return
+
+        data = json.loads(event.data)
+        event_type = data.get("type", event.event)
+
+        if event_type == "content_block_delta":
+            text = data["delta"].get("text")
+
+            if text:
+                yield TextChunk(text)
+
+        elif event_type == "message_start":
+            usage = data["message"].get("usage", {})
+            yield UsageChunk(
+                input_tokens=usage.get("input_tokens", 0),
+                output_tokens=usage.get("output_tokens", 0),
+            )
+
+        elif event_type == "message_delta":
+            usage = data.get("usage", {})
+            yield UsageChunk(
+                input_tokens=0,
+                output_tokens=usage.get("output_tokens", 0),
+            )
+            yield StopChunk(data.get("delta", {}).get("stop_reason"))
+
+        elif event_type == "error":
+            raise ProviderError(data["error"].get("message", "Unknown error"))
+
+
+adapters: Dict[schemas.ProviderName, Adapter] = {
+    schemas.ProviderName.ANTHROPIC: AnthropicAdapter(),
+    schemas.ProviderName.OPENAI: OpenAIAdapter(),
+}
+
+
+def get_adapter(name: schemas.ProviderName) -> Adapter:
+    """
+    Return adapter of provider.
+
+    Params
+    ------
+    - name (ProviderName): Provider name.
+
+    Returns
+    -------
+    - Adapter: Provider adapter.
+
+    """
+
+    if name not in adapters:
+        raise ValueError(f"No adapter available for provider {name}")
+
+    return adapters[name]
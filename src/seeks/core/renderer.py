@@ -0,0 +1,395 @@
+import asyncio
+import re
+import shutil
+import sys
+import textwrap
+from typing import AsyncIterator, List, Optional, TextIO
+
+from seeks.core.providers import Chunk, TextChunk
+
+BOLD = "\033[1m"
+CODE = "\033[36m"
+DIM = "\033[2m"
+RESET = "\033[0m"
+
+HEADING = re.compile(r"#{1,6} ")
+HEADING_PREFIX = re.compile(r"#{1,6}")
+FENCE = "```"
+
+
+async def coalesce(
+    chunks: AsyncIterator[Chunk],
+    interval: float,
+    size: int,
+) -> AsyncIterator[Chunk]:
+    """
+    Coalesce text chunks into frames. Text is passed on at most once per
+    interval, or as soon as the pending text reaches the frame size. A chunk
+    arriving after the stream was idle for an interval is passed on right away,
+    so coalescing adds no latency to the first token. Other chunks flush the
+    pending text and are passed on as is.
+
+    Params
+    ------
+    - chunks (AsyncIterator[Chunk]): Chunk(s) in order of arrival.
+    - interval (float): Minimum time between frames in seconds.
+    - size (int): Number of characters that completes a frame early.
+
+    Returns
+    -------
+    - AsyncIterator[Chunk]: Chunk(s) with consecutive text merged into frames.
+
+    """
+
+    loop = asyncio.get_running_loop()
+    iterator = chunks.__aiter__()
+    parts: List[str] = []
+    pending = 0
+    framed_at = float("-inf")
+    next_chunk = asyncio.ensure_future(iterator.__anext__())
+
+    try:
+        while True:
+            timeout = None
+
+            if parts:
+                timeout = max(framed_at + interval - loop.time(), 0.0)
+
+            done, _ = await asyncio.wait({next_chunk}, timeout=timeout)
+
+            # Interval passed while waiting for the next chunk
+            if not done:
+                yield TextChunk("".join(parts))
+                parts = []
+                pending = 0
+                framed_at = loop.time()
+                continue
+
+            try:
+                chunk = next_chunk.result()
+
+            except StopAsyncIteration:
+                break
+
+            next_chunk = asyncio.ensure_future(iterator.__anext__())
+
+            if isinstance(chunk, TextChunk):
+                parts.append(chunk.text)
+                pending += len(chunk.text)
+
+                if pending >= size or loop.time() - framed_at >= interval:
+                    yield TextChunk("".join(parts))
+                    parts = []
+                    pending = 0
+                    framed_at = loop.time()
+
+                continue
+
+            if parts:
+                yield TextChunk("".join(parts))
+                parts = []
+                pending = 0
+                framed_at = loop.time()
+
+            yield chunk
+
+        if parts:
+            yield TextChunk("".join(parts))
+
+    finally:
+        # Release the source, ie. the request it streams, also when the frames
+        # are closed early
+        next_chunk.cancel()
+        await asyncio.gather(next_chunk, return_exceptions=True)
+        await iterator.aclose()  # type: ignore[attr-defined]
+
+
+class MarkdownFormatter:
+    """
+    Incremental formatter styling markdown with ANSI escape codes while it is
+    streamed. Headings are printed bold, code blocks in color with dimmed
+    fences, and the markers of inline code and bold text are replaced by their
+    style. Text is never rewritten once printed: the only characters held back
+    are an undecided line prefix (ie. "##" or "``") and a trailing "*", so the
+    cost of a frame is linear in its own length.
+
+    """
+
+    def __init__(self) -> None:
+        self._held = ""
+        self._line: Optional[str] = None
+        self._code_block = False
+        self._inline_code = False
+        self._bold = False
+
+    def _style(self) -> str:
+        if self._line == "code":
+            return CODE
+
+        if self._line == "fence":
+            return DIM
+
+        return (BOLD if self._bold or self._line == "heading" else "") + (
+            CODE if self._inline_code else ""
+        )
+
+    def _decide(self, prefix: str, final: bool) -> Optional[str]:
+        """
+        Decide kind of line from its prefix.
+
+        Params
+        ------
+        - prefix (str): Start of line received so far.
+        - final (bool): Whether no more text follows.
+
+        Returns
+        -------
+        - Optional[str]: "fence", "code", "heading" or "text", or None if the
+          prefix is not decisive yet.
+
+        """
+
+        if prefix.startswith(FENCE):
+            return "fence"
+
+        undecided = not final and "\n" not in prefix
+
+        if undecided and FENCE.startswith(prefix):
+            return None
+
+        if self._code_block:
+            return "code"
+
+        if HEADING.match(prefix):
+            return "heading"
+
+        if undecided and HEADING_PREFIX.fullmatch(prefix):
+            return None
+
+        return "text"
+
+    def feed(self, text: str, final: bool = False) -> str:
+        """
+        Format text.
+
+        Params
+        ------
+        - text (str): Text received since the previous call.
+        - final (bool): Whether no more text follows.
+
+        Returns
+        -------
+        - str: Formatted text that can be printed.
+
+        """
+
+        text = self._held + text
+        self._held = ""
+        output: List[str] = []
+        index = 0
+
+        while index < len(text):
+            if self._line is None:
+                line = self._decide(text[index : index + 7], final)
+
+                if line is None:
+                    self._held = text[index:]
+                    break
+
+                self._line = line
+                output.append(self._style())
+
+            char = text[index]
+
+            if char == "\n":
+                if self._line == "fence":
+                    self._code_block = not self._code_block
+
+                # Inline styles do not carry over to the next line
+                self._line = None
+                self._inline_code = False
+                self._bold = False
+                output.append(RESET + "\n")
+                index += 1
+                continue
+
+            if self._line == "text" and char == "`":
+                self._inline_code = not self._inline_code
+                output.append(RESET + self._style())
+                index += 1
+                continue
+
+            if self._line == "text" and char == "*" and not self._inline_code:
+                if index + 1 == len(text) and not final:
+                    self._held = char
+                    break
+
+                if text[index + 1 : index + 2] == "*":
+                    self._bold = not self._bold
+                    output.append(RESET + self._style())
+                    index += 2
+                    continue
+
+            output.append(char)
+            index += 1
+
+        if final and self._line is not None:
+            output.append(RESET)
+            self._line = None
+
+        return "".join(output)
+
+
+class Renderer:
+    """
+    Terminal renderer of streamed text. Every frame is written with a single
+    write and flush, instead of a write and flush per token.
+
+    """
+
+    def __init__(
+        self,
+        stream: TextIO = sys.stdout,
+        formatter: Optional[MarkdownFormatter] = None,
+    ) -> None:
+        self._stream = stream
+        self._formatter = formatter
+
+    def write(self, text: str) -> None:
+        """
+        Write frame of text.
+
+        Params
+        ------
+        - text (str): Frame of text.
+
+        """
+
+        if self._formatter is not None:
+            text = self._formatter.feed(text)
+
+        if text:
+            self._stream.write(text)
+            self._stream.flush()
+
+    def close(self) -> None:
+        """
+        Write text held back by the formatter and reset styles.
+
+        """
+
+        if self._formatter is not None:
+            text = self._formatter.feed("", final=True)
+
+            if text:
+                self._stream.write(text)
+                self._stream.flush()
+
+
+class Panes:
+    """
+    Renderer of several streams side by side, one column per stream. On a
+    terminal the last lines of every column are redrawn in place as frames
+    arrive, and the complete columns are printed once all streams are done.
+    The redrawn region never exceeds the terminal height, as the cursor cannot
+    move back to lines that scrolled off.
+    Elsewhere the texts are printed one after the other when done.
+
+    """
+
+    gap = " │ "
+
+    def __init__(
+        self,
+        titles: List[str],
+        stream: TextIO = sys.stdout,
+        live: bool = False,
+        height: int = 12,
+    ) -> None:
+        columns, lines = shutil.get_terminal_size()
+        self._titles = titles
+        self._stream = stream
+        self._live = live
+        # Two lines are taken by the header and one by the cursor below
+        self._height = max(min(height, lines - 3), 1)
+        self._width = max(
+            (columns - len(self.gap) * (len(titles) - 1)) // max(len(titles), 1),
+            12,
+        )
+        self._texts = ["" for _ in titles]
+        self._drawn = 0
+
+    def _wrap(self, text: str, tail: Optional[int]) -> List[str]:
+        # Only the end of the text is wrapped while streaming, so the cost of a
+        # frame does not grow with the length of the reply. Twice the visible
+        # amount is kept, so a line cut off at the start is never visible.
+        if tail is not None:
+            text = text[-2 * tail * self._width :]
+
+        lines = [
+            line
+            for paragraph in text.split("\n")
+            for line in textwrap.wrap(paragraph, self._width) or [""]
+        ]
+
+        if tail is not None:
+            return lines[-tail:]
+
+        return lines
+
+    def _render(self, tail: Optional[int]) -> List[str]:
+        columns = [self._wrap(text, tail) for text in self._texts]
+        rows = max((len(column) for column in columns), default=0)
+        header = [title[: self._width].ljust(self._width) for title in self._titles]
+        lines = [
+            self.gap.join(header).rstrip(),
+            self.gap.join("─" * self._width for _ in self._titles),
+        ]
+
+        for row in range(rows):
+            cells = [
+                (column[row] if row < len(column) else "").ljust(self._width)
+                for column in columns
+            ]
+            lines.append(self.gap.join(cells).rstrip())
+
+        return lines
+
+    def _draw(self, lines: List[str]) -> None:
+        # Move to the start of the previous drawing and clear it, so the
+        # update is a single write
+        prefix = f"\033[{self._drawn}F\033[J" if self._drawn else ""
+        self._stream.write(prefix + "\n".join(lines) + "\n")
+        self._stream.flush()
+        self._drawn = len(lines)
+
+    def write(self, index: int, text: str) -> None:
+        """
+        Write frame of text to column.
+
+        Params
+        ------
+        - index (int): Column index.
+        - text (str): Frame of text.
+
+        """
+
+        self._texts[index] += text
+
+        if self._live:
+            self._draw(self._render(self._height))
+
+    def close(self) -> None:
+        """
+        Print the complete texts.
+
+        """
+
+        if self._live:
+            self._draw(self._render(None))
+            return None
+
+        for title, text in zip(self._titles, self._texts):
+            self._stream.write(f"{title}\n\n{text.strip()}\n\n")
+
+        self._stream.flush()
@@ -1,3 +1,4 @@
+from datetime import datetime
 from enum import Enum
 from typing import List, Optional, Union
 
@@ -62,6 +63,7 @@ class AssistantBase(BaseModel):
     name: str
     model_name: str
     description: str
+    fallback_model_names: List[str] = []
 
 
 class AssistantCreate(AssistantBase):
@@ -91,15 +93,31 @@ class ThreadResponse(ThreadBase):
         from_attributes = True
 
 
+class ThreadSummaryResponse(BaseModel):
+    id: int
+    summary: Union[str, None]
+    summary_until_id: Union[int, None]
+    summary_token_count: int
+
+    class Config:
+        from_attributes = True
+
+
 class ThreadVerboseResponse(BaseModel):
     id: int
     assistant_name: str
     subject: str
+    updated_at: Union[datetime, None] = None
 
     class Config:
         from_attributes = True
 
 
+class ThreadPage(BaseModel):
+    threads: List[ThreadVerboseResponse]
+    cursor: Union[str, None]
+
+
 class Role(str, Enum):
     SYSTEM = "system"
     ASSISTANT = "assistant"
@@ -110,6 +128,7 @@ class MessageBase(BaseModel):
     thread_id: int
     role: Role
     content: str
+    partial: bool = False
 
 
 class MessageCreate(MessageBase):
@@ -118,11 +137,17 @@ class MessageCreate(MessageBase):
 
 class MessageResponse(MessageBase):
     id: int
+    token_count: int = 0
 
     class Config:
         from_attributes = True
 
 
+class MessagePage(BaseModel):
+    messages: List[MessageResponse]
+    cursor: Union[int, None]
+
+
 class SettingsResponse(BaseModel):
     id: int
     assistant_id: int
@@ -139,3 +164,101 @@ class SettingsVerboseResponse(BaseModel):
 
     class Config:
         from_attributes = True
+
+
+class CacheStats(BaseModel):
+    hits: int
+    misses: int
+    size: int
+
+
+class PragmaResponse(BaseModel):
+    name: str
+    value: str
+
+
+class SearchResult(BaseModel):
+    message_id: int
+    thread_id: int
+    subject: str
+    role: Role
+    snippet: str
+
+
+class ExportScope(str, Enum):
+    THREAD = "thread"
+    ASSISTANT = "assistant"
+    ALL = "all"
+
+
+class ExportFormat(str, Enum):
+    JSONL = "jsonl"
+    MARKDOWN = "markdown"
+
+
+class ExportOptions(BaseModel):
+    scope: ExportScope
+    format: ExportFormat
+    path: str
+
+
+class ExportMessage(BaseModel):
+    thread_id: int
+    subject: str
+    assistant_name: str
+    message_id: int
+    role: Role
+    content: str
+    partial: bool
+    created_at: Union[datetime, None] = None
+
+
+class TimingCreate(BaseModel):
+    message_id: Optional[int] = None
+    thread_id: int
+    model_name: str
+    phase: str
+    duration: float
+
+
+class ModelResponse(BaseModel):
+    provider_name: str
+    model_name: str
+    context_window: Union[int, None]
+    max_output_tokens: Union[int, None]
+    input_price: Union[float, None]
+    output_price: Union[float, None]
+
+
+class CompareResult(BaseModel):
+    assistant_name: str
+    model_name: str
+    ttft_ms: Union[float, None]
+    total_ms: float
+    tokens: int
+    tokens_per_second: Union[float, None]
+    error: Union[str, None] = None
+
+
+class TimingStats(BaseModel):
+    model_name: str
+    phase: str
+    count: int
+    p50_ms: float
+    p95_ms: float
+    p99_ms: float
+
+
+class BatchPrompt(BaseModel):
+    assistant: str
+    thread: Optional[int] = None
+    content: str
+
+
+class BatchResult(BaseModel):
+    index: int
+    assistant: str
+    thread_id: Union[int, None] = None
+    message_id: Union[int, None] = None
+    content: Union[str, None] = None
+    error: Union[str, None] = None
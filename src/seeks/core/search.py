@@ -0,0 +1,160 @@
+from sqlalchemy import Connection, text
+
+# Full-text index over message content and thread subject. The index is an
+# external-content FTS5 table on top of a view, so the text itself is stored
+# only once in the message and thread tables. Triggers keep the index in sync
+# with every insert, update and delete.
+statements = [
+    """
+    CREATE VIEW IF NOT EXISTS message_search_content AS
+    SELECT message.id AS id, message.content AS content, thread.subject AS subject
+    FROM message
+    JOIN thread ON thread.id = message.thread_id
+    """,
+    """
+    CREATE VIRTUAL TABLE IF NOT EXISTS message_search USING fts5(
+        content,
+        subject,
+        content='message_search_content',
+        content_rowid='id',
+        tokenize='unicode61 remove_diacritics 2'
+    )
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS message_search_insert AFTER INSERT ON message
+    BEGIN
+        INSERT INTO message_search(rowid, content, subject)
+        VALUES (
+            new.id,
+            new.content,
+            (SELECT subject FROM thread WHERE id = new.thread_id)
+        );
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS message_search_delete AFTER DELETE ON message
+    BEGIN
+        INSERT INTO message_search(message_search, rowid, content, subject)
+        VALUES (
+            'delete',
+            old.id,
+            old.content,
+            (SELECT subject FROM thread WHERE id = old.thread_id)
+        );
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS message_search_update
+    AFTER UPDATE OF content ON message
+    BEGIN
+        INSERT INTO message_search(message_search, rowid, content, subject)
+        VALUES (
+            'delete',
+            old.id,
+            old.content,
+            (SELECT subject FROM thread WHERE id = old.thread_id)
+        );
+        INSERT INTO message_search(rowid, content, subject)
+        VALUES (
+            new.id,
+            new.content,
+            (SELECT subject FROM thread WHERE id = new.thread_id)
+        );
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS thread_search_update
+    AFTER UPDATE OF subject ON thread
+    BEGIN
+        INSERT INTO message_search(message_search, rowid, content, subject)
+        SELECT 'delete', id, content, old.subject
+        FROM message
+        WHERE thread_id = old.id;
+        INSERT INTO message_search(rowid, content, subject)
+        SELECT id, content, new.subject
+        FROM message
+        WHERE thread_id = new.id;
+    END
+    """,
+]
+
+
+def create_search_index(connection: Connection) -> None:
+    """
+    Create full-text search index and its triggers if these do not exist yet.
+    The index is rebuilt when it is created for a database that already holds
+    messages.
+
+    Params
+    ------
+    - connection (Connection): Database connection.
+
+    """
+
+    exists = connection.scalar(
+        text("SELECT 1 FROM sqlite_master WHERE name = 'message_search'")
+    )
+
+    for statement in statements:
+        connection.execute(text(statement))
+
+    if not exists:
+        rebuild_search_index(connection)
+
+
+def rebuild_search_index(connection: Connection) -> None:
+    """
+    Rebuild full-text search index from the message and thread tables.
+
+    Params
+    ------
+    - connection (Connection): Database connection.
+
+    """
+
+    connection.execute(
+        text("INSERT INTO message_search(message_search) VALUES ('rebuild')")
+    )
+
+
+def drop_search_index(connection: Connection) -> None:
+    """
+    Drop full-text search index. Its triggers are dropped along with the
+    message and thread tables.
+
+    Params
+    ------
+    - connection (Connection): Database connection.
+
+    """
+
+    connection.execute(text("DROP TABLE IF EXISTS message_search"))
+    connection.execute(text("DROP VIEW IF EXISTS message_search_content"))
+
+
+def to_match_query(query: str) -> str:
+    """
+    Convert user input into an FTS5 match expression. Every term is quoted, so
+    punctuation in the input is matched literally instead of being parsed as
+    query syntax. A trailing asterisk is kept to allow prefix searches.
+
+    Params
+    ------
+    - query (str): User input.
+
+    Returns
+    -------
+    - str: Match expression.
+
+    """
+
+    terms = []
+
+    for term in query.split():
+        prefix = term.endswith("*") and len(term) > 1
+        term = term.rstrip("*").replace('"', '""')
+
+        if term:
+            terms.append(f'"{term}"*' if prefix else f'"{term}"')
+
+    return " ".join(terms)
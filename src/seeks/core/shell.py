@@ -1,36 +1,47 @@
 import atexit
 import cmd
-import json
 import os
-import re
 import readline
-
-import httpx
+import sys
+from functools import cached_property
+from pathlib import Path
+from time import time
+from typing import TYPE_CHECKING, Optional
 
 from seeks.common.config import Config
 from seeks.core import schemas
+from seeks.core.buffers import MessageBuffer
 from seeks.core.commands import Commands
-from seeks.core.prompts import Prompts
+from seeks.core.database import profile, profiles
+from seeks.core.providers import ProviderError, TextChunk
+from seeks.core.spans import PHASES, Spans, write_spans_log
+from seeks.utils.clear_screen import clear_screen
 from seeks.utils.ellipse import ellipse
 from seeks.utils.get_home_dir import get_home_dir
 from seeks.utils.get_project_version import get_project_version
 from seeks.utils.mask_api_key import mask_api_key
 from seeks.utils.print import print_alert, print_table
 
+if TYPE_CHECKING:
+    from seeks.core.cache import ResponseCache
+    from seeks.core.clients import Clients
+    from seeks.core.compaction import Compactor
+    from seeks.core.engine import Bridge, Engine
+    from seeks.core.prompts import Prompts
+    from seeks.core.renderer import Renderer
+
 
 class Shell(cmd.Cmd):
     def __init__(
         self,
         commands: Commands,
         config: Config,
-        prompts: Prompts,
     ) -> None:
         super().__init__()
 
         self._commands = commands
         self._config = config
         self._history_file = os.path.expanduser(get_home_dir() / "history")
-        self._prompts = prompts
         self._init_history()
 
         self.intro = "{}\n{}\n".format(
@@ -39,6 +50,71 @@ class Shell(cmd.Cmd):
         )
         self.prompt = ">>> "
 
+    # The components below pull in heavy dependencies (httpx, questionary), so
+    # these are created on first use instead of on startup
+
+    @cached_property
+    def _prompts(self) -> "Prompts":
+        from seeks.core.prompts import Prompts
+
+        return Prompts(config=self._config)
+
+    @cached_property
+    def _clients(self) -> "Clients":
+        from seeks.core.clients import Clients
+
+        return Clients(settings=self._config.client)
+
+    @cached_property
+    def _bridge(self) -> "Bridge":
+        from seeks.core.engine import Bridge
+
+        return Bridge()
+
+    @cached_property
+    def _cache(self) -> Optional["ResponseCache"]:
+        from seeks.core.cache import ResponseCache
+
+        if not self._config.cache.enabled:
+            return None
+
+        return ResponseCache(
+            database_file=get_home_dir() / "cache.db",
+            settings=self._config.cache,
+        )
+
+    @cached_property
+    def _engine(self) -> "Engine":
+        from seeks.core.engine import Engine
+
+        return Engine(clients=self._clients, cache=self._cache)
+
+    @cached_property
+    def _compactor(self) -> "Compactor":
+        from seeks.core.compaction import Compactor
+
+        return Compactor(
+            bridge=self._bridge,
+            commands=self._commands,
+            engine=self._engine,
+            settings=self._config.compaction,
+        )
+
+    def close(self) -> None:
+        """
+        Close connections and stop event loop, if these have been created.
+
+        """
+
+        if "_bridge" in self.__dict__:
+            if "_clients" in self.__dict__:
+                self._bridge.run(self._clients.aclose())
+
+            self._bridge.close()
+
+        if "_cache" in self.__dict__ and self._cache is not None:
+            self._cache.close()
+
     def _init_history(self) -> None:
         """
         Initialize history file and set history length to 1000 lines to store
@@ -71,12 +147,19 @@ class Shell(cmd.Cmd):
         # Clear thread setting before running the shell to ensure a clean start.
         self._commands.delete_thread_setting()
 
+        # Expire timings once per session rather than after every turn, so
+        # turns do not pay for the extra delete and commit
+        self._commands.delete_timings(self._config.timing.retention_days)
+
         try:
             self.cmdloop()
 
         except KeyboardInterrupt:
             print("Exiting...")
 
+        finally:
+            self.close()
+
     def emptyline(self) -> bool:
         """
         Do nothing on empty input line
@@ -84,6 +167,22 @@ class Shell(cmd.Cmd):
         """
         return False
 
+    def _renderer(self) -> "Renderer":
+        """
+        Create renderer for a reply. Markdown is only formatted when enabled
+        and printing to a terminal.
+
+        """
+
+        from seeks.core.renderer import MarkdownFormatter, Renderer
+
+        formatter = None
+
+        if self._config.render.markdown and sys.stdout.isatty():
+            formatter = MarkdownFormatter()
+
+        return Renderer(sys.stdout, formatter)
+
     def default(self, prompt: str) -> None:
         """
         Everything which is not a command, is considered to be input for the
@@ -95,11 +194,15 @@ class Shell(cmd.Cmd):
         3. Check if settings are available.
         4. Create thread if not available.
         5. Create message with user input.
-        6. Print user input.
-        7. ...
+        6. Stream response of assistant, falling back on its fallback models.
+        7. Store response of assistant.
+        8. Compact thread if enabled and its history exceeds the threshold.
+        9. Record time spent in each phase.
 
         """
 
+        spans = Spans()
+
         providers = self._commands.read_providers()
 
         if not providers:
@@ -147,43 +250,189 @@ class Shell(cmd.Cmd):
             )
         )
 
-        messages = self._commands.read_messages(thread_id)
         assistant = self._commands.read_assistant_by_id(settings.assistant_id)
-        provider_profile = self._config.find_provider_by_model(assistant.model_name)
-        provider = self._commands.read_provider_by_name(provider_profile.name)
+        model_names = [assistant.model_name, *assistant.fallback_model_names]
+
+        # Context has to fit every model the reply may come from
+        messages = self._commands.read_context(
+            thread_id,
+            budget=min(map(self._config.context_budget, model_names)),
+        )
+        spans.mark("read")
+
+        from seeks.core.failover import Failover, Route
+        from seeks.core.renderer import coalesce
+
+        providers_by_name = {provider.name: provider for provider in providers}
+        provider_profiles_by_name = {}
+        routes = []
+
+        for model_name in model_names:
+            provider_profile = self._config.find_provider_by_model(model_name)
+
+            # Models without a created provider are left out of the chain
+            if (
+                provider_profile is None
+                or provider_profile.name not in providers_by_name
+            ):
+                continue
+
+            provider_profiles_by_name[provider_profile.name] = provider_profile
+            headers, data = self._config.generate_payload(
+                provider=providers_by_name[provider_profile.name],
+                assistant=assistant.model_copy(update={"model_name": model_name}),
+                messages=messages,
+            )
+            routes.append(
+                Route(
+                    model_name=model_name,
+                    provider_name=provider_profile.name,
+                    endpoint=provider_profile.endpoint,
+                    headers=headers,
+                    data=data,
+                )
+            )
+
+        if not routes:
+            print_alert(
+                f"No provider created for model {assistant.model_name}",
+                type="error",
+            )
+            return None
+
+        spans.mark("payload")
+
+        failover = Failover(
+            self._engine,
+            routes,
+            hedge_after=self._config.fallback.hedge_after,
+        )
+
+        # Deltas are merged into frames, so the terminal is written and flushed
+        # once per frame instead of once per token
+        chunks = coalesce(
+            failover.stream(spans=spans),
+            interval=self._config.render.frame_interval,
+            size=self._config.render.frame_size,
+        )
+        renderer = self._renderer()
+
+        try:
+            with MessageBuffer(self._commands, thread_id) as buffer:
+                for chunk in self._bridge.iterate(chunks):
+                    if isinstance(chunk, TextChunk):
+                        with spans.span("write"):
+                            buffer.append(chunk.text)
+
+                        with spans.span("render"):
+                            renderer.write(chunk.text)
+
+                with spans.span("write"):
+                    message = buffer.close()
+
+        except ProviderError as error:
+            renderer.close()
+            print()
+
+            for route, route_error in failover.errors or [(routes[0], error)]:
+                print_alert(
+                    f"Request to {route.model_name} failed: {route_error}",
+                    type="error",
+                    clear=False,
+                )
+
+            return None
+
+        renderer.close()
+        print("\n")
 
-        headers, data = self._config.generate_payload(
-            provider=provider,
-            assistant=assistant,
-            messages=messages,
+        # The reply may come from a fallback model, which is used for the rest
+        # of the turn as well
+        route = failover.route or routes[0]
+
+        if route.model_name != assistant.model_name:
+            print_alert(
+                f"Answered by fallback model {route.model_name}",
+                type="info",
+                clear=False,
+            )
+
+        assistant = assistant.model_copy(update={"model_name": route.model_name})
+        provider = providers_by_name[route.provider_name]
+        provider_profile = provider_profiles_by_name[route.provider_name]
+
+        # Fold older messages into the thread summary once the reply is stored,
+        # so the next turn sends summary and recent tail only
+        try:
+            with spans.span("compact"):
+                self._compactor.compact(
+                    thread_id,
+                    provider=provider,
+                    provider_profile=provider_profile,
+                    assistant=assistant,
+                )
+
+        except ProviderError as error:
+            print_alert(
+                f"Compaction of thread failed: {error}",
+                type="warning",
+                clear=False,
+            )
+
+        self._record_spans(
+            spans,
+            thread_id=thread_id,
+            message_id=message.id if message else None,
+            model_name=assistant.model_name,
         )
 
-        # Todo: Abstract this to a separate function in order to choose between:
-        # - httpx vs requests
-        # - different providers/models (ie. GPT-4, Claude, etc.)
-        # - apply pydantic validation on response
-
-        with httpx.stream(
-            "POST",
-            provider_profile.endpoint,
-            headers=headers,
-            json=data,
-        ) as response:
-            for line in response.iter_lines():
-
-                if not re.search(r"\{.*\}", line):
-                    continue
-
-                data = json.loads(line[len("data: ") :])
-                content = data["choices"][0]["delta"].get("content", "")
-
-                print(
-                    content,
-                    end="",
-                    flush=True,
+    def _record_spans(
+        self,
+        spans: Spans,
+        thread_id: int,
+        message_id: Optional[int],
+        model_name: str,
+    ) -> None:
+        """
+        Store durations of the phases of a turn, and append them to the JSON
+        lines log if configured.
+
+        Params
+        ------
+        - spans (Spans): Spans of turn.
+        - thread_id (int): Thread id.
+        - message_id (Optional[int]): Id of reply, if any was received.
+        - model_name (str): Model name of assistant.
+
+        """
+
+        if not self._config.timing.enabled:
+            return None
+
+        durations = spans.finish()
+        self._commands.create_timings(
+            [
+                schemas.TimingCreate(
+                    message_id=message_id,
+                    thread_id=thread_id,
+                    model_name=model_name,
+                    phase=phase,
+                    duration=duration,
                 )
+                for phase, duration in durations.items()
+            ]
+        )
 
-            print("\n")
+        if self._config.timing.log is not None:
+            write_spans_log(
+                self._config.timing.log,
+                {
+                    "message_id": message_id,
+                    "thread_id": thread_id,
+                    "model_name": model_name,
+                    **durations,
+                },
+            )
 
     def do_quit(self, _: str) -> bool:
         """
@@ -222,15 +471,15 @@ class Shell(cmd.Cmd):
                 print_alert("No providers created", type="warning")
                 return None
 
-            providers = [
+            verbose_providers = [
                 schemas.ProviderVerboseResponse(
                     id=provider.id,
-                    name=self._config.find_provider_by_name(provider.name).display_name,
+                    name=self._config.find_display_name(provider.name),
                     api_key=mask_api_key(provider.api_key),
                 )
                 for provider in providers
             ]
-            print_table(providers)
+            print_table(verbose_providers)
 
         if component.component == schemas.Component.ASSISTANT:
             assistants = self._commands.read_assistants()
@@ -251,21 +500,32 @@ class Shell(cmd.Cmd):
             print_table(assistants)
 
         if component.component == schemas.Component.THREAD:
-            threads = self._commands.read_threads(verbose=True)
+            # Threads are listed a page at a time, most recently active first
+            page = self._commands.read_threads_page()
 
-            if not threads:
+            if not page.threads:
                 print_alert("No threads created", type="warning")
                 return None
 
-            threads = [
-                schemas.ThreadVerboseResponse(
-                    id=thread.id,
-                    assistant_name=thread.assistant_name,
-                    subject=ellipse(thread.subject),
-                )
-                for thread in threads
-            ]
-            print_table(threads)
+            clear = True
+
+            while True:
+                threads = [
+                    schemas.ThreadVerboseResponse(
+                        id=thread.id,
+                        assistant_name=thread.assistant_name,
+                        subject=ellipse(thread.subject),
+                        updated_at=thread.updated_at,
+                    )
+                    for thread in page.threads
+                ]
+                print_table(threads, clear=clear)
+                clear = False
+
+                if page.cursor is None or not self._prompts.confirm_next_page():
+                    break
+
+                page = self._commands.read_threads_page(cursor=page.cursor)
 
         if component.component == schemas.Component.SETTINGS:
             settings = self._commands.read_settings(verbose=True)
@@ -274,14 +534,405 @@ class Shell(cmd.Cmd):
                 print_alert("No settings created", type="warning")
                 return None
 
-            settings = [
-                schemas.SettingsVerboseResponse(
-                    id=settings.id,
-                    assistant_name=settings.assistant_name,
-                    thread_subject=ellipse(settings.thread_subject),
+            print_table(
+                [
+                    schemas.SettingsVerboseResponse(
+                        id=settings.id,
+                        assistant_name=settings.assistant_name,
+                        thread_subject=ellipse(settings.thread_subject),
+                    )
+                ]
+            )
+
+    def do_search(self, query: str) -> None:
+        """
+        Shell command to search messages of all threads, ie. `search sqlite
+        pragma*`. Results are ranked by relevance and show highlighted
+        snippets.
+
+        """
+
+        if not query.strip():
+            print_alert("Search query required, ie. search <terms>", type="warning")
+            return None
+
+        results = self._commands.search_messages(query)
+
+        if not results:
+            print_alert("No messages found", type="warning")
+            return None
+
+        results = [
+            schemas.SearchResult(
+                message_id=result.message_id,
+                thread_id=result.thread_id,
+                subject=ellipse(result.subject),
+                role=result.role,
+                snippet=result.snippet,
+            )
+            for result in results
+        ]
+        print_table(results)
+
+    def do_compare(self, prompt: str) -> None:
+        """
+        Shell command to send one prompt to several assistants at once, ie.
+        `compare What is a monad?`. Replies stream side by side and are stored
+        in a new thread per assistant, followed by the time to first token,
+        total time and tokens per second of every model.
+
+        """
+
+        prompt = prompt.strip()
+
+        if not prompt:
+            print_alert("Pass a prompt, ie. `compare What is a monad?`", type="warning")
+            return None
+
+        providers = self._commands.read_providers()
+        assistants = self._commands.read_assistants()
+
+        if not providers or not assistants:
+            print_alert(
+                "Providers and assistants are required to compare",
+                type="error",
+            )
+            return None
+
+        selected = self._prompts.select_assistants(assistants)
+
+        if not selected:
+            print_alert("Assistant selection cancelled", type="warning")
+            return None
+
+        from seeks.core.compare import Contender, merge
+        from seeks.core.failover import Route
+        from seeks.core.renderer import Panes, coalesce
+
+        providers_by_name = {provider.name: provider for provider in providers}
+        contenders = []
+        clear_screen()
+
+        for assistant in selected:
+            provider_profile = self._config.find_provider_by_model(assistant.model_name)
+
+            if (
+                provider_profile is None
+                or provider_profile.name not in providers_by_name
+            ):
+                print_alert(
+                    f"No provider created for model {assistant.model_name}",
+                    type="warning",
+                    clear=False,
+                )
+                continue
+
+            thread = self._commands.create_thread(
+                schemas.ThreadCreate(subject=prompt, assistant_id=assistant.id)
+            )
+            message = self._commands.create_message(
+                schemas.MessageCreate(
+                    thread_id=thread.id,
+                    role=schemas.Role.USER,
+                    content=prompt,
+                )
+            )
+            headers, data = self._config.generate_payload(
+                provider=providers_by_name[provider_profile.name],
+                assistant=assistant,
+                messages=[message],
+            )
+            contenders.append(
+                Contender(
+                    assistant_name=assistant.name,
+                    thread_id=thread.id,
+                    route=Route(
+                        model_name=assistant.model_name,
+                        provider_name=provider_profile.name,
+                        endpoint=provider_profile.endpoint,
+                        headers=headers,
+                        data=data,
+                    ),
+                )
+            )
+
+        if not contenders:
+            return None
+
+        panes = Panes(
+            [
+                f"{contender.assistant_name} ({contender.route.model_name})"
+                for contender in contenders
+            ],
+            live=sys.stdout.isatty(),
+        )
+        chunks = merge(
+            [
+                coalesce(
+                    contender.stream(self._engine),
+                    interval=self._config.render.frame_interval,
+                    size=self._config.render.frame_size,
                 )
+                for contender in contenders
             ]
-            print_table(settings)
+        )
+
+        try:
+            for index, chunk in self._bridge.iterate(chunks):
+                if isinstance(chunk, TextChunk):
+                    panes.write(index, chunk.text)
+
+        finally:
+            panes.close()
+
+        for contender in contenders:
+            reply = None
+
+            if contender.parts:
+                reply = self._commands.create_message(
+                    schemas.MessageCreate(
+                        thread_id=contender.thread_id,
+                        role=schemas.Role.ASSISTANT,
+                        content=contender.text,
+                        partial=contender.error is not None,
+                    )
+                )
+
+            # Failed requests are not timed, as in a regular turn
+            if contender.error is None:
+                self._record_spans(
+                    contender.spans,
+                    thread_id=contender.thread_id,
+                    message_id=reply.id if reply else None,
+                    model_name=contender.route.model_name,
+                )
+
+        print_table([contender.result() for contender in contenders], clear=False)
+
+    def do_stats(self, model_name: str) -> None:
+        """
+        Shell command to show percentiles of the time spent in each phase of a
+        turn per model, ie. `stats` or `stats gpt-4o`. Times of the last 30
+        days are kept, set with the SEEKS_TIMINGS_RETENTION_DAYS environment
+        variable.
+
+        """
+
+        stats = self._commands.read_timing_stats(model_name.strip() or None)
+
+        if not stats:
+            print_alert("No timings recorded yet", type="warning")
+            return None
+
+        stats.sort(key=lambda item: (item.model_name, PHASES.index(item.phase)))
+        print_table(stats)
+
+    def do_models(self, argument: str) -> None:
+        """
+        Shell command to list the models of the catalog, or to refresh the
+        models discovered from the model listings of the created providers
+        with `models refresh`. Listings are cached for a day, set with the
+        SEEKS_MODELS_CACHE_TTL environment variable, and `models refresh force`
+        refreshes them regardless.
+
+        """
+
+        arguments = argument.split()
+
+        if arguments and arguments[0] == "refresh":
+            self._refresh_models(force="force" in arguments[1:])
+            return None
+
+        providers = {provider.name for provider in self._commands.read_providers()}
+        models = [
+            schemas.ModelResponse(
+                provider_name=provider_profile.display_name,
+                model_name=model.name,
+                context_window=model.context_window,
+                max_output_tokens=model.max_output_tokens,
+                input_price=model.input_price,
+                output_price=model.output_price,
+            )
+            for provider_profile in self._config.providers
+            if provider_profile.name in providers
+            for model in provider_profile.models
+        ]
+
+        if not models:
+            print_alert("No models available, create a provider first", type="warning")
+            return None
+
+        print_table(models)
+
+    def _refresh_models(self, force: bool) -> None:
+        from seeks.core.catalog import read_listings, write_listings
+        from seeks.core.discovery import discover_models
+
+        path = self._config.catalog.listings
+        listings = read_listings(path)
+        expires_at = time() - self._config.catalog.listings_ttl
+        targets = []
+
+        for provider in self._commands.read_providers():
+            provider_profile = self._config.find_provider_by_name(provider.name)
+            listing = listings.get(provider.name.value)
+
+            if provider_profile is None or provider_profile.models_endpoint is None:
+                continue
+
+            if force or listing is None or listing.fetched_at < expires_at:
+                targets.append((provider_profile, provider))
+
+        if not targets:
+            print_alert(
+                "Models are up to date, use `models refresh force` to refresh",
+                type="info",
+            )
+            return None
+
+        known = set(self._config.list_models(list(schemas.ProviderName)))
+        results = self._bridge.run(discover_models(self._clients, targets))
+        clear = True
+
+        for name, result in results.items():
+            if isinstance(result, ProviderError):
+                print_alert(
+                    f"Refreshing {name} models failed: {result}",
+                    type="error",
+                    clear=clear,
+                )
+
+            else:
+                listings[name] = result
+                added = len(set(result.models) - known)
+                print_alert(
+                    f"Found {len(result.models)} {name} models, {added} new",
+                    type="success",
+                    clear=clear,
+                )
+
+            clear = False
+
+        write_listings(path, listings)
+        self._config.reload_registry()
+
+    def do_export(self, _: str) -> None:
+        """
+        Shell command to export a thread, the threads of an assistant or all
+        threads to a JSON lines or Markdown file. Messages are streamed from
+        the database to the file, so large histories export with flat memory
+        use.
+
+        """
+
+        options = self._prompts.export_options()
+
+        if options is None:
+            print_alert("Export cancelled", type="warning")
+            return None
+
+        thread_id = None
+        assistant_id = None
+
+        if options.scope == schemas.ExportScope.THREAD:
+            threads = self._commands.read_threads()
+
+            if not threads:
+                print_alert("No threads available", type="warning")
+                return None
+
+            thread = self._prompts.select_thread(threads)
+
+            if thread is None:
+                print_alert("Thread selection cancelled", type="warning")
+                return None
+
+            thread_id = thread.id
+
+        if options.scope == schemas.ExportScope.ASSISTANT:
+            assistants = self._commands.read_assistants()
+
+            if not assistants:
+                print_alert("No assistants available", type="warning")
+                return None
+
+            assistant = self._prompts.select_assistant(assistants)
+
+            if assistant is None:
+                print_alert("Assistant selection cancelled", type="warning")
+                return None
+
+            assistant_id = assistant.id
+
+        from seeks.core.export import export_messages
+
+        path = Path(options.path).expanduser()
+
+        if not path.suffix:
+            path = path.with_suffix(
+                ".jsonl" if options.format == schemas.ExportFormat.JSONL else ".md"
+            )
+
+        total = self._commands.count_export_messages(thread_id, assistant_id)
+
+        def progress(count: int) -> None:
+            print(f"\rExported {count:,} of {total:,} messages", end="", flush=True)
+
+        # The export is written next to the target and moved in place once it
+        # is complete, so a failed export never leaves a partial file behind
+        temporary = path.with_name(f"{path.name}.tmp")
+
+        try:
+            with open(temporary, "w", encoding="utf-8") as file:
+                count = export_messages(
+                    self._commands.export_messages(thread_id, assistant_id),
+                    file,
+                    format=options.format,
+                    progress=progress,
+                )
+
+            temporary.replace(path)
+
+        except OSError as error:
+            print()
+            print_alert(f"Export to {path} failed: {error}", type="error", clear=False)
+            return None
+
+        finally:
+            temporary.unlink(missing_ok=True)
+
+        print()
+        print_alert(
+            f"Exported {count:,} messages to {path}",
+            type="success",
+            clear=False,
+        )
+
+    def do_reindex(self, _: str) -> None:
+        """
+        Shell command to rebuild the search index of messages.
+
+        """
+
+        self._commands.rebuild_search_index()
+        print_alert("Search index rebuilt", type="success")
+
+    def do_database(self, _: str) -> None:
+        """
+        Shell command to show the database profile, the pragmas in effect and
+        the hit rate of the cache of providers, assistants and settings. The
+        profile is set with the SEEKS_DATABASE_PROFILE environment variable:
+
+        - performance (default)
+        - durable
+
+        """
+
+        names = list(dict.fromkeys(name for item in profiles.values() for name in item))
+        pragmas = self._commands.read_pragmas(names)
+        print_alert(f"Database profile: {profile}", type="info")
+        print_table(pragmas, clear=False)
+        print_table([self._commands.cache_stats], clear=False)
 
     def do_create(self, _: str) -> None:
         """
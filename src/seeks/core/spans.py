@@ -0,0 +1,124 @@
+import json
+from contextlib import contextmanager
+from datetime import UTC, datetime
+from pathlib import Path
+from time import perf_counter
+from typing import Any, Dict, Iterator
+
+# Phases of a turn in order of occurrence:
+#
+# - read: database reads of settings, assistant, provider and context
+# - payload: building the request payload
+# - connect: from sending the request until the response headers are received,
+#   including rate limiting, retries, connect and TLS handshake
+# - ttft: from the response headers until the first token
+# - stream: from the first token until the end of the stream
+# - render: writing frames to the terminal
+# - write: storing the reply in the database
+# - compact: compacting the thread
+# - total: the turn as a whole
+PHASES = (
+    "read",
+    "payload",
+    "connect",
+    "ttft",
+    "stream",
+    "render",
+    "write",
+    "compact",
+    "total",
+)
+
+
+class Spans:
+    """
+    Durations of the phases of a single turn. Time spent in the same phase
+    several times, ie. rendering every frame, is summed.
+
+    """
+
+    def __init__(self) -> None:
+        self.durations: Dict[str, float] = {}
+        self._started_at = perf_counter()
+        self._marked_at = self._started_at
+
+    def mark(self, phase: str) -> None:
+        """
+        Add time since the previous mark, or since the start of the turn, to
+        phase.
+
+        Params
+        ------
+        - phase (str): Phase name.
+
+        """
+
+        marked_at = perf_counter()
+        self.add(phase, marked_at - self._marked_at)
+        self._marked_at = marked_at
+
+    @contextmanager
+    def span(self, phase: str) -> Iterator[None]:
+        """
+        Measure time spent in phase.
+
+        Params
+        ------
+        - phase (str): Phase name.
+
+        """
+
+        started_at = perf_counter()
+
+        try:
+            yield None
+
+        finally:
+            self.add(phase, perf_counter() - started_at)
+
+    def add(self, phase: str, seconds: float) -> None:
+        """
+        Add time spent in phase.
+
+        Params
+        ------
+        - phase (str): Phase name.
+        - seconds (float): Duration in seconds.
+
+        """
+
+        self.durations[phase] = self.durations.get(phase, 0.0) + seconds
+
+    def finish(self) -> Dict[str, float]:
+        """
+        Record total duration of turn, unless already recorded, and return
+        durations by phase.
+
+        Returns
+        -------
+        - Dict[str, float]: Duration in seconds by phase.
+
+        """
+
+        self.durations.setdefault("total", perf_counter() - self._started_at)
+        return self.durations
+
+
+def write_spans_log(path: Path, record: Dict[str, Any]) -> None:
+    """
+    Append spans of a turn to a JSON lines log.
+
+    Params
+    ------
+    - path (Path): Path to log file.
+    - record (Dict[str, Any]): Turn details and durations.
+
+    """
+
+    line = json.dumps(
+        {"timestamp": datetime.now(UTC).isoformat(), **record},
+        ensure_ascii=False,
+    )
+
+    with open(path, "a", encoding="utf-8") as file:
+        file.write(line + "\n")
@@ -1,37 +1,73 @@
 import click
 
-from seeks.common.config import Config
-from seeks.core.commands import Commands
-from seeks.core.database import engine, get_session
-from seeks.core.models import Base
-from seeks.core.prompts import Prompts
-from seeks.core.shell import Shell
+from seeks.batch import batch
 from seeks.utils.clear_screen import clear_screen
+from seeks.utils.startup_profile import StartupProfile
 
 
-@click.command()
+@click.group(invoke_without_command=True)
 @click.option("--debug", is_flag=True)
-def main(debug: bool = False) -> None:
+@click.option(
+    "--startup-profile",
+    is_flag=True,
+    help="Report time and imports per startup phase.",
+)
+@click.pass_context
+def main(
+    context: click.Context,
+    debug: bool = False,
+    startup_profile: bool = False,
+) -> None:
+    """
+    Start interactive shell, unless a subcommand is given.
+
+    """
+
+    if context.invoked_subcommand is not None:
+        return None
+
+    profile = StartupProfile(enabled=startup_profile)
+
     # Do not clear screen if in debug mode as it will clear the debugger output
-    if not debug:
+    if not debug and not startup_profile:
         clear_screen()
 
-    # Initialize database and tables
-    Base.metadata.create_all(bind=engine)
+    # Modules are imported here instead of at the top of the file, so the
+    # startup profile can attribute their cost. Heavier dependencies, like
+    # httpx, questionary and tabulate, are only imported on first use.
+    with profile.phase("database"):
+        from seeks.core.database import engine, get_session
+        from seeks.core.migrations import migrate
+
+        # Initialize or upgrade database schema
+        migrate(engine)
+
+    with profile.phase("config"):
+        from seeks.common.config import Config
 
-    config = Config()
-    session = next(get_session())
-    commands = Commands(session=session)
-    prompts = Prompts(config=config)
+        config = Config()
 
-    # Create and run REPL instance
-    shell = Shell(
-        commands=commands,
-        config=config,
-        prompts=prompts,
-    )
+    with profile.phase("commands"):
+        from seeks.core.commands import Commands
+
+        session = next(get_session())
+        commands = Commands(session=session)
+
+    with profile.phase("shell"):
+        from seeks.core.shell import Shell
+
+        # Create REPL instance
+        shell = Shell(
+            commands=commands,
+            config=config,
+        )
+
+    profile.report()
     shell.run()
 
 
+main.add_command(batch)
+
+
 if __name__ == "__main__":
     main()
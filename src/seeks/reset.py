@@ -5,15 +5,20 @@ from dotenv import find_dotenv, load_dotenv
 from seeks.core import schemas
 from seeks.core.commands import Commands
 from seeks.core.database import engine, get_session
+from seeks.core.migrations import migrate
 from seeks.core.models import Base
+from seeks.core.search import drop_search_index
 from seeks.utils.print import print_alert
 
 
 def reset() -> None:
     # Drop all tables if initialized
+    with engine.begin() as connection:
+        drop_search_index(connection)
+
     Base.metadata.drop_all(engine)
-    # Initialize database and tables
-    Base.metadata.create_all(bind=engine)
+    # Initialize database schema
+    migrate(engine)
 
     # Initialize commands
     session = next(get_session())
@@ -23,7 +28,7 @@ def reset() -> None:
     commands.create_provider(
         schemas.ProviderCreate(
             name=schemas.ProviderName.OPENAI,
-            api_key=getenv("OPENAI_API_KEY"),
+            api_key=getenv("OPENAI_API_KEY", ""),
         )
     )
     commands.create_assistant(
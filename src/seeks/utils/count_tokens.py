@@ -0,0 +1,17 @@
+def count_tokens(text: str) -> int:
+    """
+    Estimate number of tokens of text. Uses the common approximation of four
+    characters per token, which is close enough for budgeting purposes and
+    avoids shipping a tokenizer per provider.
+
+    Params
+    ------
+    - text (str): Text to count tokens of.
+
+    Returns
+    -------
+    - int: Estimated number of tokens.
+
+    """
+
+    return (len(text) + 3) // 4
@@ -1,4 +1,12 @@
-from typing import Union
+from typing import Union, overload
+
+
+@overload
+def ellipse(value: str, length: int = 40) -> str: ...
+
+
+@overload
+def ellipse(value: None, length: int = 40) -> None: ...
 
 
 def ellipse(value: Union[str, None], length: int = 40) -> Union[str, None]:
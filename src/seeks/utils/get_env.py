@@ -0,0 +1,78 @@
+from os import getenv
+from typing import Callable, Dict, TypeVar
+
+T = TypeVar("T")
+
+
+def get_env(name: str, default: T, cast: Callable[[str], T]) -> T:
+    """
+    Get environment variable casted to the type of the default value. Falls
+    back on the default value if the variable is not set or cannot be casted.
+
+    Params
+    ------
+    - name (str): Name of the environment variable.
+    - default (T): Default value.
+    - cast (Callable[[str], T]): Function to cast the raw value.
+
+    Returns
+    -------
+    - T: Casted value or default value.
+
+    """
+
+    value = getenv(name)
+
+    if value is None or value == "":
+        return default
+
+    try:
+        return cast(value)
+
+    except ValueError:
+        return default
+
+
+def to_bool(value: str) -> bool:
+    """
+    Cast string value to boolean. Accepts common truthy values such as "1",
+    "true", "yes" and "on".
+
+    Params
+    ------
+    - value (str): Value to cast.
+
+    Returns
+    -------
+    - bool: Casted value.
+
+    """
+
+    return value.strip().lower() in ("1", "true", "yes", "on")
+
+
+def to_limits(value: str) -> Dict[str, int]:
+    """
+    Cast comma separated `name=count` pairs to dictionary, ie.
+    "openai=500,anthropic=50".
+
+    Params
+    ------
+    - value (str): Value to cast.
+
+    Returns
+    -------
+    - Dict[str, int]: Count by lowercase name.
+
+    """
+
+    limits: Dict[str, int] = {}
+
+    for pair in value.split(","):
+        if not pair.strip():
+            continue
+
+        name, _, count = pair.partition("=")
+        limits[name.strip().lower()] = int(count)
+
+    return limits
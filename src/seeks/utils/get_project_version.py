@@ -1,14 +1,21 @@
-import re
+from functools import cache
+from importlib.metadata import PackageNotFoundError, version
 
 
+@cache
 def get_project_version() -> str:
-    version_pattern = r'^version\s*=\s*"(\d+\.\d+\.\d+)"'
+    """
+    Get version of the installed package from its metadata, which is read once
+    per process instead of parsing `pyproject.toml` on every launch.
 
-    with open("pyproject.toml", "r") as file:
-        content = file.read()
-        match = re.search(version_pattern, content, re.MULTILINE)
+    Returns
+    -------
+    - str: Project version, or "0.0.0" if the package is not installed.
 
-        if match:
-            return match.group(1)
+    """
 
-    return "0.0.0"
+    try:
+        return version("seeks")
+
+    except PackageNotFoundError:
+        return "0.0.0"
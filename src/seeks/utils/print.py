@@ -1,7 +1,5 @@
 from typing import List, Literal, Union
 
-from tabulate import tabulate
-
 from seeks.core import schemas
 from seeks.utils.clear_screen import clear_screen
 
@@ -60,9 +58,18 @@ def print_message(
 def print_table(
     data: Union[
         List[schemas.ProviderResponse],
+        List[schemas.ProviderVerboseResponse],
         List[schemas.AssistantResponse],
         List[schemas.ThreadResponse],
+        List[schemas.ThreadVerboseResponse],
         List[schemas.SettingsResponse],
+        List[schemas.SettingsVerboseResponse],
+        List[schemas.PragmaResponse],
+        List[schemas.CacheStats],
+        List[schemas.SearchResult],
+        List[schemas.TimingStats],
+        List[schemas.ModelResponse],
+        List[schemas.CompareResult],
     ],
     clear: bool = True,
 ) -> None:
@@ -71,5 +78,8 @@ def print_table(
     if clear:
         clear_screen()
 
+    # Imported on first use to keep it out of the startup path
+    from tabulate import tabulate
+
     table = tabulate([item.model_dump() for item in data], headers="keys")
     print(f"{table}\n")
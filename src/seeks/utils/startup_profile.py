@@ -0,0 +1,61 @@
+import sys
+from contextlib import contextmanager
+from time import perf_counter
+from typing import Iterator, List, Tuple
+
+
+class StartupProfile:
+    """
+    Record time spent and modules imported per phase of startup, in order to
+    keep an eye on the startup-time budget.
+
+    """
+
+    def __init__(self, enabled: bool) -> None:
+        self._enabled = enabled
+        self._phases: List[Tuple[str, float, int]] = []
+        self._started_at = perf_counter()
+
+    @contextmanager
+    def phase(self, name: str) -> Iterator[None]:
+        """
+        Measure phase of startup.
+
+        Params
+        ------
+        - name (str): Name of phase.
+
+        """
+
+        if not self._enabled:
+            yield
+            return
+
+        modules = len(sys.modules)
+        started_at = perf_counter()
+
+        try:
+            yield
+
+        finally:
+            self._phases.append(
+                (name, perf_counter() - started_at, len(sys.modules) - modules)
+            )
+
+    def report(self) -> None:
+        """
+        Print time and number of imported modules per phase.
+
+        """
+
+        if not self._enabled:
+            return None
+
+        width = max([len(name) for name, _, _ in self._phases] + [len("total")])
+        print(f"{'phase':<{width}}  {'ms':>8}  {'modules':>7}")
+
+        for name, seconds, modules in self._phases:
+            print(f"{name:<{width}}  {seconds * 1000:>8.1f}  {modules:>7}")
+
+        total = (perf_counter() - self._started_at) * 1000
+        print(f"{'total':<{width}}  {total:>8.1f}  {len(sys.modules):>7}\n")
@@ -0,0 +1,33 @@
+from functools import cache
+from typing import Any, Iterable, List, Type, TypeVar
+
+from pydantic import BaseModel, TypeAdapter
+
+T = TypeVar("T", bound=BaseModel)
+
+
+@cache
+def _get_adapter(schema: Type[BaseModel]) -> TypeAdapter[Any]:
+    return TypeAdapter(List[schema])  # type: ignore[valid-type]
+
+
+def validate_rows(schema: Type[T], rows: Iterable[Any]) -> List[T]:
+    """
+    Validate rows into schemas in a single call. The adapter of each schema is
+    built once and cached, and a whole list is validated per call instead of
+    one row at a time. Fields are read as attributes, so both Core rows and
+    ORM records are accepted.
+
+    Params
+    ------
+    - schema (Type[T]): Schema to validate rows into.
+    - rows (Iterable[Any]): Rows with an attribute per field of the schema.
+
+    Returns
+    -------
+    - List[T]: Validated schema(s) in order of rows.
+
+    """
+
+    adapter: TypeAdapter[List[T]] = _get_adapter(schema)
+    return adapter.validate_python(list(rows), from_attributes=True)
@@ -0,0 +1,83 @@
+import os
+import tempfile
+from typing import AsyncIterator, Callable, Iterable, Iterator
+
+import httpx
+import pytest
+
+# Settings and the database live in the home directory, which is replaced
+# before seeks is imported so tests never touch the real one
+os.environ["HOME"] = tempfile.mkdtemp(prefix="seeks-tests-")
+
+from seeks.common.config import ClientSettings  # noqa: E402
+from seeks.core.clients import Clients  # noqa: E402
+from seeks.core.commands import Commands  # noqa: E402
+from seeks.core.database import engine, get_session  # noqa: E402
+from seeks.core.migrations import migrate  # noqa: E402
+
+ORIGIN = "http://provider.test"
+ENDPOINT = f"{ORIGIN}/openai"
+
+Handler = Callable[[httpx.Request], httpx.Response]
+
+
+class BrokenStream(httpx.AsyncByteStream):
+    """
+    Response body sending the given parts and then raising the given error, ie.
+    a connection that drops in the middle of a reply.
+
+    """
+
+    def __init__(self, parts: Iterable[bytes], error: Exception) -> None:
+        self._parts = list(parts)
+        self._error = error
+
+    async def __aiter__(self) -> AsyncIterator[bytes]:
+        for part in self._parts:
+            yield part
+
+        raise self._error
+
+
+def event(text: str) -> bytes:
+    return f'data: {{"choices":[{{"delta":{{"content":"{text}"}}}}]}}\n\n'.encode()
+
+
+@pytest.fixture
+def make_clients() -> Callable[[Handler], Clients]:
+    """
+    Return factory of client registries sending every request to handler.
+
+    """
+
+    def factory(handler: Handler) -> Clients:
+        clients = Clients(
+            ClientSettings(
+                max_retries=0,
+                backoff_base=0.0,
+                breaker_threshold=1,
+                breaker_reset=60.0,
+                requests_per_minute={},
+                tokens_per_minute={},
+            )
+        )
+        clients._async_clients[ORIGIN] = httpx.AsyncClient(
+            base_url=ORIGIN,
+            transport=httpx.MockTransport(handler),
+        )
+        return clients
+
+    return factory
+
+
+@pytest.fixture
+def commands() -> Iterator[Commands]:
+    """
+    Return commands bound to a session of the test database.
+
+    """
+
+    migrate(engine)
+
+    for session in get_session():
+        yield Commands(session)
@@ -0,0 +1,79 @@
+import asyncio
+import io
+import json
+from typing import Callable, List
+from uuid import uuid4
+
+import httpx
+
+from seeks.batch import Batch
+from seeks.common.config import Config
+from seeks.core import schemas
+from seeks.core.clients import Clients
+from seeks.core.commands import Commands
+from seeks.core.engine import Engine
+from tests.conftest import Handler, event
+
+
+def create_assistant(commands: Commands) -> schemas.AssistantResponse:
+    name = f"assistant-{uuid4()}"
+    commands.create_assistant(
+        schemas.AssistantCreate(
+            name=name,
+            model_name="gpt-4o",
+            description="Test assistant",
+        )
+    )
+    return next(
+        assistant for assistant in commands.read_assistants() if assistant.name == name
+    )
+
+
+def test_prompt_for_unknown_or_foreign_thread_fails_its_row(
+    commands: Commands,
+    make_clients: Callable[[Handler], Clients],
+) -> None:
+    def handler(request: httpx.Request) -> httpx.Response:
+        return httpx.Response(200, content=event("Hello"))
+
+    if not any(
+        provider.name == schemas.ProviderName.OPENAI
+        for provider in commands.read_providers()
+    ):
+        commands.create_provider(
+            schemas.ProviderCreate(name=schemas.ProviderName.OPENAI, api_key="key")
+        )
+
+    assistant = create_assistant(commands)
+    other = create_assistant(commands)
+    foreign = commands.create_thread(
+        schemas.ThreadCreate(subject="Foreign", assistant_id=other.id)
+    )
+    prompts = [
+        (1, schemas.BatchPrompt(assistant=assistant.name, thread=999999, content="A")),
+        (
+            2,
+            schemas.BatchPrompt(
+                assistant=assistant.name, thread=foreign.id, content="B"
+            ),
+        ),
+    ]
+    output = io.StringIO()
+    batch = Batch(
+        commands=commands,
+        config=Config(),
+        engine=Engine(make_clients(handler)),
+        workers={},
+        default_workers=1,
+    )
+
+    failed = asyncio.run(batch.run(prompts, output))
+    results: List[schemas.BatchResult] = [
+        schemas.BatchResult.model_validate(json.loads(line))
+        for line in output.getvalue().splitlines()
+    ]
+
+    assert failed == 2
+    assert sorted(result.index for result in results if result.error) == [1, 2]
+    assert commands.read_messages(999999) == []
+    assert commands.read_messages(foreign.id) == []
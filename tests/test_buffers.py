@@ -0,0 +1,37 @@
+from uuid import uuid4
+
+from seeks.core import schemas
+from seeks.core.buffers import MessageBuffer
+from seeks.core.commands import Commands
+
+
+def test_first_chunk_is_stored_as_partial_message(commands: Commands) -> None:
+    name = f"assistant-{uuid4()}"
+    commands.create_assistant(
+        schemas.AssistantCreate(
+            name=name,
+            model_name="gpt-4o",
+            description="Test assistant",
+        )
+    )
+    assistant = next(
+        assistant for assistant in commands.read_assistants() if assistant.name == name
+    )
+    thread = commands.create_thread(
+        schemas.ThreadCreate(subject="Test", assistant_id=assistant.id)
+    )
+
+    buffer = MessageBuffer(commands, thread.id, flush_interval=60.0)
+    buffer.append("")
+    assert commands.read_messages(thread.id) == []
+
+    buffer.append("Hello")
+    buffer.append(" world")
+    [message] = commands.read_messages(thread.id)
+    assert message.content == "Hello"
+    assert message.partial
+
+    buffer.close()
+    [message] = commands.read_messages(thread.id)
+    assert message.content == "Hello world"
+    assert not message.partial
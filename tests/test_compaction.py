@@ -0,0 +1,146 @@
+from typing import Callable, Tuple
+from uuid import uuid4
+
+import httpx
+import pytest
+
+from seeks.common.config import CompactionSettings
+from seeks.core import schemas
+from seeks.core.catalog import ProviderProfile
+from seeks.core.clients import Clients
+from seeks.core.commands import Commands
+from seeks.core.compaction import Compactor
+from seeks.core.engine import Bridge, Engine
+from seeks.core.providers import ProviderError
+from tests.conftest import ENDPOINT, BrokenStream, Handler, event
+
+PROVIDER = schemas.ProviderResponse(
+    id=1, name=schemas.ProviderName.OPENAI, api_key="key"
+)
+PROVIDER_PROFILE = ProviderProfile(
+    name=schemas.ProviderName.OPENAI,
+    display_name="OpenAI",
+    endpoint=ENDPOINT,
+    models=[],
+)
+
+
+def create_thread(
+    commands: Commands,
+    count: int,
+    content: Callable[[int], str],
+) -> Tuple[schemas.AssistantResponse, schemas.ThreadResponse]:
+    """
+    Create assistant and thread with count messages alternating between user
+    and assistant turns, starting with a user turn.
+
+    """
+
+    name = f"assistant-{uuid4()}"
+    commands.create_assistant(
+        schemas.AssistantCreate(
+            name=name,
+            model_name="gpt-4o",
+            description="Test assistant",
+        )
+    )
+    assistant = next(
+        assistant for assistant in commands.read_assistants() if assistant.name == name
+    )
+    thread = commands.create_thread(
+        schemas.ThreadCreate(subject="Test", assistant_id=assistant.id)
+    )
+
+    for index in range(count):
+        commands.create_message(
+            schemas.MessageCreate(
+                thread_id=thread.id,
+                role=schemas.Role.ASSISTANT if index % 2 else schemas.Role.USER,
+                content=content(index),
+            )
+        )
+
+    return assistant, thread
+
+
+def test_failed_summary_leaves_thread_as_is(
+    commands: Commands,
+    make_clients: Callable[[Handler], Clients],
+) -> None:
+    def handler(request: httpx.Request) -> httpx.Response:
+        return httpx.Response(
+            200, stream=BrokenStream([event("Summary")], httpx.ReadError("Reset"))
+        )
+
+    assistant, thread = create_thread(
+        commands, count=4, content=lambda index: f"Message {index} " * 50
+    )
+
+    bridge = Bridge()
+    compactor = Compactor(
+        bridge=bridge,
+        commands=commands,
+        engine=Engine(make_clients(handler)),
+        settings=CompactionSettings(enabled=True, threshold=300, keep_tokens=125),
+    )
+
+    try:
+        with pytest.raises(ProviderError, match="Reset"):
+            compactor.compact(
+                thread.id,
+                provider=PROVIDER,
+                provider_profile=PROVIDER_PROFILE,
+                assistant=assistant,
+            )
+
+    finally:
+        bridge.close()
+
+    summary = commands.read_thread_summary(thread.id)
+    assert summary.summary is None
+    assert summary.summary_until_id is None
+
+
+def test_summary_ends_on_assistant_turn(
+    commands: Commands,
+    make_clients: Callable[[Handler], Clients],
+) -> None:
+    def handler(request: httpx.Request) -> httpx.Response:
+        return httpx.Response(200, content=event("Summary"))
+
+    # Budget of 350 tokens covers three messages of 100 tokens, ending on a
+    # user turn
+    assistant, thread = create_thread(
+        commands, count=6, content=lambda index: str(index) * 400
+    )
+    ids = [message.id for message in commands.read_messages(thread.id)]
+
+    bridge = Bridge()
+    compactor = Compactor(
+        bridge=bridge,
+        commands=commands,
+        engine=Engine(make_clients(handler)),
+        settings=CompactionSettings(enabled=True, threshold=350, keep_tokens=200),
+    )
+
+    try:
+        assert compactor.compact(
+            thread.id,
+            provider=PROVIDER,
+            provider_profile=PROVIDER_PROFILE,
+            assistant=assistant,
+        )
+
+    finally:
+        bridge.close()
+
+    summary = commands.read_thread_summary(thread.id)
+    assert summary.summary_until_id == ids[1]
+
+    context = [
+        message
+        for message in commands.read_context(thread.id, budget=10_000)
+        if message.role != schemas.Role.SYSTEM
+    ]
+    assert context[0].role == schemas.Role.USER
+    assert ids[:2] + [message.id for message in context] == ids
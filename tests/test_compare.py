@@ -0,0 +1,83 @@
+import asyncio
+from typing import AsyncIterator, Callable, List, Tuple
+
+import httpx
+import pytest
+
+from seeks.core import schemas
+from seeks.core.clients import Clients
+from seeks.core.compare import Contender, merge
+from seeks.core.engine import Engine
+from seeks.core.failover import Route
+from seeks.core.providers import Chunk
+from tests.conftest import ORIGIN, BrokenStream, Handler, event
+
+
+def contender(name: str, provider_name: schemas.ProviderName) -> Contender:
+    return Contender(
+        assistant_name=name,
+        thread_id=1,
+        route=Route(
+            model_name=name,
+            provider_name=provider_name,
+            endpoint=f"{ORIGIN}/{name}",
+            headers={},
+            data={},
+        ),
+    )
+
+
+def test_failing_contender_only_fails_its_own_column(
+    make_clients: Callable[[Handler], Clients],
+) -> None:
+    def handler(request: httpx.Request) -> httpx.Response:
+        if request.url.path == "/broken":
+            return httpx.Response(
+                200, stream=BrokenStream([], httpx.RemoteProtocolError("Reset"))
+            )
+
+        return httpx.Response(200, content=event("Hello") + event(" world"))
+
+    engine = Engine(make_clients(handler))
+    contenders = [
+        contender("broken", schemas.ProviderName.ANTHROPIC),
+        contender("working", schemas.ProviderName.OPENAI),
+    ]
+
+    async def collect() -> List[Tuple[int, Chunk]]:
+        chunks = merge([contender.stream(engine) for contender in contenders])
+        return [item async for item in chunks]
+
+    items = asyncio.run(collect())
+
+    assert [index for index, _ in items] == [1, 1]
+    assert contenders[0].error is not None
+    assert contenders[0].result().error is not None
+    assert contenders[1].error is None
+    assert contenders[1].text == "Hello world"
+
+
+def test_merge_closes_pending_iterators_on_error() -> None:
+    closed: List[str] = []
+
+    async def failing() -> AsyncIterator[str]:
+        await asyncio.sleep(0)
+        raise RuntimeError("Failed")
+        yield ""
+
+    async def pending() -> AsyncIterator[str]:
+        try:
+            await asyncio.sleep(60)
+            yield ""
+
+        finally:
+            closed.append("pending")
+
+    async def collect() -> None:
+        async for _ in merge([failing(), pending()]):
+            pass
+
+    with pytest.raises(RuntimeError):
+        asyncio.run(collect())
+
+    assert closed == ["pending"]
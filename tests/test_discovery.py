@@ -0,0 +1,108 @@
+import asyncio
+from typing import Any, Callable, Dict, List, Tuple, Union
+
+import httpx
+
+from seeks.core import schemas
+from seeks.core.catalog import ModelListing, ProviderProfile
+from seeks.core.clients import Clients
+from seeks.core.discovery import discover_models
+from seeks.core.providers import ProviderError
+from tests.conftest import ORIGIN, Handler
+
+ANTHROPIC_PAGES: Dict[str, Dict[str, Any]] = {
+    "": {
+        "data": [{"id": "claude-sonnet-4-0"}],
+        "has_more": True,
+        "last_id": "claude-sonnet-4-0",
+    },
+    "claude-sonnet-4-0": {
+        "data": [{"id": "claude-3-5-haiku-20241022"}],
+        "has_more": False,
+        "last_id": "claude-3-5-haiku-20241022",
+    },
+}
+OPENAI_LISTING = {
+    "data": [
+        {"id": "gpt-4.1"},
+        {"id": "gpt-4o-realtime-preview"},
+        {"id": "o3-mini"},
+        {"id": "text-embedding-3-small"},
+        {"id": "tts-1"},
+    ]
+}
+
+
+def targets() -> List[Tuple[ProviderProfile, schemas.ProviderResponse]]:
+    return [
+        (
+            ProviderProfile(
+                name=name,
+                display_name=name.value,
+                endpoint=f"{ORIGIN}/{name.value}/messages",
+                models_endpoint=f"{ORIGIN}/{name.value}/models",
+                models=[],
+            ),
+            schemas.ProviderResponse(id=index, name=name, api_key="key"),
+        )
+        for index, name in enumerate(
+            [schemas.ProviderName.ANTHROPIC, schemas.ProviderName.OPENAI], start=1
+        )
+    ]
+
+
+def discover(
+    make_clients: Callable[[Handler], Clients],
+    handler: Handler,
+) -> Dict[str, Union[ModelListing, ProviderError]]:
+    async def run() -> Dict[str, Union[ModelListing, ProviderError]]:
+        clients = make_clients(handler)
+
+        try:
+            return await discover_models(clients, targets())
+
+        finally:
+            await clients.aclose()
+
+    return asyncio.run(run())
+
+
+def test_discovery_follows_pages_and_filters_chat_models(
+    make_clients: Callable[[Handler], Clients],
+) -> None:
+    def handler(request: httpx.Request) -> httpx.Response:
+        if request.url.path == "/anthropic/models":
+            after_id = request.url.params.get("after_id", "")
+            return httpx.Response(200, json=ANTHROPIC_PAGES[after_id])
+
+        return httpx.Response(200, json=OPENAI_LISTING)
+
+    listings = discover(make_clients, handler)
+
+    anthropic = listings[schemas.ProviderName.ANTHROPIC.value]
+    openai = listings[schemas.ProviderName.OPENAI.value]
+    assert isinstance(anthropic, ModelListing)
+    assert anthropic.models == ["claude-sonnet-4-0", "claude-3-5-haiku-20241022"]
+    assert isinstance(openai, ModelListing)
+    assert openai.models == ["gpt-4.1", "o3-mini"]
+
+
+def test_failing_provider_does_not_affect_others(
+    make_clients: Callable[[Handler], Clients],
+) -> None:
+    def handler(request: httpx.Request) -> httpx.Response:
+        if request.url.path == "/anthropic/models":
+            return httpx.Response(
+                500, json={"error": {"message": "Internal server error"}}
+            )
+
+        return httpx.Response(200, json=OPENAI_LISTING)
+
+    listings = discover(make_clients, handler)
+
+    anthropic = listings[schemas.ProviderName.ANTHROPIC.value]
+    openai = listings[schemas.ProviderName.OPENAI.value]
+    assert isinstance(anthropic, ProviderError)
+    assert anthropic.status_code == 500
+    assert isinstance(openai, ModelListing)
+    assert openai.models == ["gpt-4.1", "o3-mini"]
@@ -0,0 +1,53 @@
+import asyncio
+from typing import Callable, List
+
+import httpx
+import pytest
+
+from seeks.core import schemas
+from seeks.core.clients import Clients
+from seeks.core.engine import Engine
+from seeks.core.providers import Chunk, ProviderError, TextChunk
+from tests.conftest import ENDPOINT, BrokenStream, Handler, event
+
+
+async def collect(engine: Engine, chunks: List[Chunk]) -> None:
+    async for chunk in engine.stream(
+        schemas.ProviderName.OPENAI, ENDPOINT, headers={}, data={}
+    ):
+        chunks.append(chunk)
+
+
+def test_stream_broken_mid_body_raises_provider_error(
+    make_clients: Callable[[Handler], Clients],
+) -> None:
+    def handler(request: httpx.Request) -> httpx.Response:
+        return httpx.Response(
+            200,
+            stream=BrokenStream([event("Hello")], httpx.ReadError("Connection reset")),
+        )
+
+    clients = make_clients(handler)
+    chunks: List[Chunk] = []
+
+    with pytest.raises(ProviderError, match="Connection reset"):
+        asyncio.run(collect(Engine(clients), chunks))
+
+    assert chunks == [TextChunk("Hello")]
+    assert clients.breaker(schemas.ProviderName.OPENAI.value).is_open
+
+
+def test_stream_with_invalid_event_raises_provider_error(
+    make_clients: Callable[[Handler], Clients],
+) -> None:
+    def handler(request: httpx.Request) -> httpx.Response:
+        return httpx.Response(200, content=event("Hello") + b"data: {invalid\n\n")
+
+    clients = make_clients(handler)
+    chunks: List[Chunk] = []
+
+    with pytest.raises(ProviderError, match="Invalid stream event"):
+        asyncio.run(collect(Engine(clients), chunks))
+
+    assert chunks == [TextChunk("Hello")]
+    assert clients.breaker(schemas.ProviderName.OPENAI.value).is_open
@@ -0,0 +1,65 @@
+import asyncio
+from typing import Callable, List
+
+import httpx
+
+from seeks.core import schemas
+from seeks.core.clients import Clients
+from seeks.core.engine import Engine
+from seeks.core.failover import Failover, Route
+from seeks.core.providers import Chunk, TextChunk
+from tests.conftest import ORIGIN, BrokenStream, Handler, event
+
+primary = Route(
+    model_name="claude-3-5-haiku-20241022",
+    provider_name=schemas.ProviderName.ANTHROPIC,
+    endpoint=f"{ORIGIN}/anthropic",
+    headers={},
+    data={},
+)
+fallback = Route(
+    model_name="gpt-4o",
+    provider_name=schemas.ProviderName.OPENAI,
+    endpoint=f"{ORIGIN}/openai",
+    headers={},
+    data={},
+)
+
+
+async def collect(failover: Failover) -> List[Chunk]:
+    return [chunk async for chunk in failover.stream()]
+
+
+def test_failover_on_transport_error_before_first_token(
+    make_clients: Callable[[Handler], Clients],
+) -> None:
+    def handler(request: httpx.Request) -> httpx.Response:
+        if request.url.path == "/anthropic":
+            return httpx.Response(
+                200, stream=BrokenStream([], httpx.ReadTimeout("Timed out"))
+            )
+
+        return httpx.Response(200, content=event("Hello"))
+
+    failover = Failover(Engine(make_clients(handler)), [primary, fallback])
+    chunks = asyncio.run(collect(failover))
+
+    assert chunks == [TextChunk("Hello")]
+    assert failover.route == fallback
+    assert [route for route, _ in failover.errors] == [primary]
+
+
+def test_failover_on_connection_error(
+    make_clients: Callable[[Handler], Clients],
+) -> None:
+    def handler(request: httpx.Request) -> httpx.Response:
+        if request.url.path == "/anthropic":
+            raise httpx.ConnectError("Connection refused")
+
+        return httpx.Response(200, content=event("Hello"))
+
+    failover = Failover(Engine(make_clients(handler)), [primary, fallback])
+    chunks = asyncio.run(collect(failover))
+
+    assert chunks == [TextChunk("Hello")]
+    assert failover.route == fallback
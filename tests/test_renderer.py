@@ -0,0 +1,54 @@
+import asyncio
+import io
+import os
+import shutil
+from typing import AsyncIterator, List
+
+import pytest
+
+from seeks.core.providers import Chunk, TextChunk
+from seeks.core.renderer import Panes, coalesce
+
+
+def test_closing_frames_closes_source() -> None:
+    closed: List[str] = []
+
+    async def source() -> AsyncIterator[Chunk]:
+        try:
+            yield TextChunk("Hello")
+            await asyncio.sleep(60)
+            yield TextChunk(" world")
+
+        finally:
+            closed.append("source")
+
+    async def consume() -> List[str]:
+        frames = coalesce(source(), interval=0.05, size=1024)
+        assert await frames.__anext__() == TextChunk("Hello")
+        await frames.aclose()  # type: ignore[attr-defined]
+        # Copied before the event loop shuts down, which would close the
+        # source anyway
+        return list(closed)
+
+    assert asyncio.run(consume()) == ["source"]
+
+
+def test_live_panes_fit_terminal_height(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr(
+        shutil, "get_terminal_size", lambda *args, **kwargs: os.terminal_size((80, 8))
+    )
+    stream = io.StringIO()
+    panes = Panes(["First", "Second"], stream=stream, live=True, height=12)
+
+    for index in range(20):
+        panes.write(0, f"Line {index}\n")
+        panes.write(1, f"Line {index}\n")
+
+        # Redrawn region, ie. header and tail of the panes, fits the terminal
+        assert panes._drawn <= 7
+
+    assert "Line 19" in stream.getvalue().splitlines()[-2]
+
+    panes.close()
+
+    assert panes._drawn > 8